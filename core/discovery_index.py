@@ -0,0 +1,143 @@
+"""
+This component maintains an on-disk index of the discovered test
+modules. Every entry is keyed by the test module path and validated
+against the mtime and size of the file, so that the test list builder
+only re-parses the modules which changed since the last run.
+"""
+import os
+import json
+import tokenize
+
+
+DEFAULT_INDEX_PATH = "~/.cache/redant/discovery_index.json"
+
+
+class DiscoveryIndex:
+    """
+    The discovery index stores the flags ( tcNature, volType, timeout, tags
+    and resources ) and the name of the test class of every test module
+    seen so far.
+    """
+    INDEX_VERSION = 2
+
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH):
+        """
+        Loads the index from the disk if present.
+        Args:
+            index_path (str): Path of the index file.
+        """
+        self.index_path = os.path.expanduser(index_path)
+        self.entries = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        """
+        Loads the entries from the index file. A missing, corrupted or
+        outdated index is simply treated as an empty one.
+        """
+        try:
+            with open(self.index_path, 'r') as index_fd:
+                index_data = json.load(index_fd)
+        except (OSError, ValueError):
+            return
+        if (not isinstance(index_data, dict)
+           or index_data.get("version") != self.INDEX_VERSION):
+            return
+        self.entries = index_data.get("entries", {})
+
+    def _get_fresh_entry(self, tc_path: str) -> tuple:
+        """
+        Method to obtain the index entry of a test module if it is still
+        valid.
+        Args:
+            tc_path (str): The path of the test case.
+        Returns:
+            tuple of the entry ( None if missing or stale ) and the stat
+            of the file.
+        """
+        stat = os.stat(tc_path)
+        entry = self.entries.get(os.path.abspath(tc_path))
+        if (entry is not None and entry["mtime"] == stat.st_mtime_ns
+           and entry["size"] == stat.st_size):
+            return (entry, stat)
+        return (None, stat)
+
+    def _set_entry(self, tc_path: str, stat, info: dict):
+        """
+        Method to add or replace the index entry of a test module.
+        """
+        self.entries[os.path.abspath(tc_path)] = {
+            "mtime": stat.st_mtime_ns, "size": stat.st_size, "info": info}
+        self.dirty = True
+
+    def lookup(self, tc_path: str, parse_fn) -> dict:
+        """
+        Method to obtain the test module info from the index. In case the
+        entry is missing or stale, the module is parsed again using the
+        parse_fn and the index is updated.
+        Args:
+            tc_path (str): The path of the test case.
+            parse_fn: Callable taking the path and returning the info dict.
+        Returns:
+            dict containing the test module info.
+        """
+        entry, stat = self._get_fresh_entry(tc_path)
+        if entry is not None:
+            return entry["info"]
+
+        info = parse_fn(tc_path)
+        self._set_entry(tc_path, stat, info)
+        return info
+
+    def refresh(self, tc_paths: list, parse_fn):
+        """
+        Method to parse all the missing or stale test modules so that the
+        following lookups are served from the index. Only the module
+        headers are parsed, which is cheap enough to be done serially.
+        Args:
+            tc_paths (list): The paths of the test cases.
+            parse_fn: Callable taking the path and returning the info dict.
+        """
+        for tc_path in tc_paths:
+            entry, stat = self._get_fresh_entry(tc_path)
+            if entry is None:
+                self._set_entry(tc_path, stat, parse_fn(tc_path))
+
+    def save(self):
+        """
+        Writes the index back to the disk if it was modified. Entries of
+        removed test modules are dropped in the process.
+        """
+        if not self.dirty:
+            return
+        self.entries = {path: entry for (path, entry) in self.entries.items()
+                        if os.path.isfile(path)}
+        index_dir = os.path.dirname(self.index_path)
+        if index_dir and not os.path.isdir(index_dir):
+            os.makedirs(index_dir)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as index_fd:
+            json.dump({"version": self.INDEX_VERSION,
+                       "entries": self.entries}, index_fd)
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+
+    @staticmethod
+    def get_test_class_name(tc_path: str) -> str:
+        """
+        Method to statically find the test class defined in a module
+        without importing it. The module is tokenized only till the
+        first top level class definition.
+        Args:
+            tc_path (str): The path of the test case.
+        Returns:
+            Name of the first class defined in the module or None.
+        """
+        with tokenize.open(tc_path) as tc_fd:
+            tokens = tokenize.generate_tokens(tc_fd.readline)
+            for token in tokens:
+                if (token.type == tokenize.NAME and token.string == 'class'
+                   and token.start[1] == 0):
+                    return next(tokens).string
+        return None
@@ -1,7 +1,12 @@
 import os
 import sys
+import time
 from socket import timeout
 import copy
+import json
+import functools
+import contextlib
+import threading
 import traceback
 import paramiko
 from halo import Halo
@@ -227,13 +232,163 @@ class environ:
             self.spinner.fail("Environment Teardown failed.")
 
 
+def _volume_locked(method):
+    """
+    Decorator serializing the FrameworkEnv methods working on a single
+    volume with the lock of that volume, so that the operations on
+    different volumes don't block each other.
+    """
+    @functools.wraps(method)
+    def wrapper(self, volname, *args, **kwargs):
+        with self._get_volume_lock(volname):
+            return method(self, volname, *args, **kwargs)
+    return wrapper
+
+
+def _env_locked(method):
+    """
+    Decorator serializing the FrameworkEnv methods adding, removing or
+    walking over all the volumes.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.env_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _volume_or_all_locked(method):
+    """
+    Decorator serializing the FrameworkEnv methods working on a single
+    volume, or on all of them when the volname is "all", wherein all the
+    volume locks are held along with the env_lock and the data_lock.
+    """
+    @functools.wraps(method)
+    def wrapper(self, volname, *args, **kwargs):
+        if volname != "all":
+            with self._get_volume_lock(volname):
+                return method(self, volname, *args, **kwargs)
+        with self.env_lock, contextlib.ExitStack() as locks:
+            for vol_name in sorted(self.volds):
+                locks.enter_context(self._get_volume_lock(vol_name))
+            with self.data_lock:
+                return method(self, volname, *args, **kwargs)
+    return wrapper
+
+
+def _data_locked(method):
+    """
+    Decorator serializing the FrameworkEnv methods working on the cluster
+    options, snapshot mounts, journal and the cluster health.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.data_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+_PERSISTED_METHODS = set()
+
+
+def _persisted(method):
+    """
+    Decorator appending the calls of a FrameworkEnv mutator to the state
+    journal, once the persistence of the env is enabled. It has to be
+    applied under the lock decorator, so that the calls are journaled in
+    the order they were made.
+    """
+    _PERSISTED_METHODS.add(method.__name__)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        ret = method(self, *args, **kwargs)
+        if self.state_path is not None:
+            self._append_to_state_journal(method.__name__, args, kwargs)
+        return ret
+    return wrapper
+
+
+class FrozenDict(dict):
+    """
+    A read-only dict, used for the snapshots of the FrameworkEnv. A deep
+    copy of it is a regular, mutable dict.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("FrameworkEnv snapshots are read-only, use "
+                        "copy.deepcopy for a mutable copy")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(val, memo) for (key, val) in self.items()}
+
+
+class FrozenList(list):
+    """
+    A read-only list, used for the snapshots of the FrameworkEnv. A deep
+    copy of it is a regular, mutable list.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("FrameworkEnv snapshots are read-only, use "
+                        "copy.deepcopy for a mutable copy")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = remove = pop = clear = _read_only
+    sort = reverse = _read_only
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(val, memo) for val in self]
+
+
+def _freeze(obj):
+    """
+    Helper function to create a read-only copy of the env data.
+    """
+    if isinstance(obj, dict):
+        return FrozenDict({key: _freeze(val) for (key, val) in obj.items()})
+    if isinstance(obj, list):
+        return FrozenList(_freeze(val) for val in obj)
+    return obj
+
+
+class EnvSnapshot:
+    """
+    A read-only snapshot of the FrameworkEnv. The snapshots share the
+    frozen data of the volumes, options and snapshot mounts which didn't
+    change in between them, hence taking one costs in the order of the
+    changes since the previous one.
+    """
+    __slots__ = ('volds', 'clusteropt', 'snapm')
+
+    def __init__(self, volds: dict, clusteropt: dict, snapm: dict):
+        self.volds = volds
+        self.clusteropt = clusteropt
+        self.snapm = snapm
+
+
 class FrameworkEnv:
     """
     A class for handling the framework environemnt details. This won't
     affect the environment directly. It is more of a data store.
+
+    The store can be shared by the worker processes through the
+    EnvManager, wherein the calls from the workers are served by
+    concurrent threads. Hence the locks are always taken in the order,
+    env_lock, the volume lock and then the data_lock.
     """
 
     __instance = None
+    STATE_VERSION = 1
 
     @staticmethod
     def getInstance():
@@ -248,15 +403,74 @@ class FrameworkEnv:
             raise Exception("Singleton class can have only one Instance.")
         else:
             FrameworkEnv.__instance = self
+        self.env_lock = threading.RLock()
+        self.data_lock = threading.RLock()
+        self.vol_locks_guard = threading.Lock()
+        self.vol_locks = {}
+        # Name of the test on whose behalf the current thread calls in,
+        # when served by the EnvManager.
+        self.caller = threading.local()
+        self.state_path = None
+        self.state_pid = None
+        self.state_journal_fd = None
+        self.state_journal_pid = None
+        # Header of the state journal of a forked worker, holding the
+        # state of the env at the fork.
+        self.state_fork_header = None
+        self.fork_hook_set = False
+
+    def _get_volume_lock(self, volname: str):
+        """
+        Method to obtain the lock of a volume, creating it if needed.
+        Arg:
+            volname (str)
+        Returns:
+            The RLock of the volume.
+        """
+        with self.vol_locks_guard:
+            if volname not in self.vol_locks:
+                self.vol_locks[volname] = threading.RLock()
+            return self.vol_locks[volname]
+
+    def call_as(self, owner: str, method_name: str, args: tuple,
+                kwargs: dict):
+        """
+        Method to call a method on behalf of a test, so that the changes
+        it makes are recorded in the journal of that test alone. It is
+        used by the EnvProxy of the worker processes.
+        Args:
+            owner (str): Name of the test running in the calling process,
+                         None if no test is running.
+            method_name (str)
+            args (tuple)
+            kwargs (dict)
+        """
+        self.caller.owner = owner
+        try:
+            return getattr(self, method_name)(*args, **kwargs)
+        finally:
+            self.caller.owner = None
 
+    @_env_locked
+    @_persisted
     def init_ds(self):
         """
         Method to handle the creation of data structures to store the
         current state of the environment used to run the framework.
         """
-        self.volds = {}
-        self.clusteropt = {}
-        self.snapm = {}
+        with self.data_lock:
+            self.volds = {}
+            self.clusteropt = {}
+            self.snapm = {}
+            self.journal = {}
+            self.cluster_health = None
+            self.brick_index = {}
+            self.brick_list_cache = {}
+            self.mount_index = {}
+            self.snap_mnt_index = {}
+            self.frozen_vols = {}
+            self.frozen_opts = None
+            self.frozen_snaps = {}
 
     def _validate_volname(self, volname: str):
         """
@@ -265,9 +479,87 @@ class FrameworkEnv:
         Arg:
             volname (str)
         """
-        if volname not in self.volds.keys():
+        if volname not in self.volds:
             raise Exception(f"No such volume called {volname}")
 
+    def _index_bricks(self, volname: str, brick_dict: dict,
+                      remove: bool = False):
+        """
+        Helper function to maintain the brick to volume index as the
+        bricks of a volume are added or removed, dropping the cached brick
+        list of the volume.
+        Args:
+            volname (str)
+            brick_dict (dict) : A dictionary with keys of node ip and values
+                                being list of bricks under that node.
+            remove (bool): True if the bricks are being removed.
+        """
+        with self.data_lock:
+            for (node, bricks) in brick_dict.items():
+                for brick in bricks:
+                    if remove:
+                        self.brick_index.pop(f"{node}:{brick}", None)
+                    else:
+                        self.brick_index[f"{node}:{brick}"] = volname
+            self.brick_list_cache.pop(volname, None)
+
+    def _index_mount(self, volname: str, node: str, path: str = None,
+                     remove: bool = False):
+        """
+        Helper function to maintain the node to mountpoints index, kept
+        per node as the mountpaths of every volume mounted on it.
+        Args:
+            volname (str)
+            node (str) : Client node.
+            path (str) : Mountpath. None, when removing, implies all the
+                         mountpaths of the volume on the node.
+            remove (bool): True if the mountpath is being removed.
+        """
+        with self.data_lock:
+            node_mounts = self.mount_index.setdefault(node, {})
+            if not remove:
+                node_mounts.setdefault(volname, []).append(path)
+                return
+            if path is None or node_mounts.get(volname) == [path]:
+                node_mounts.pop(volname, None)
+            elif path in node_mounts.get(volname, []):
+                node_mounts[volname].remove(path)
+            if not node_mounts:
+                del self.mount_index[node]
+
+    def _index_volume(self, volname: str, remove: bool = False):
+        """
+        Helper function to index or unindex all the bricks and the
+        mountpaths of a volume.
+        Args:
+            volname (str)
+            remove (bool): True if the volume is being removed.
+        """
+        vol_data = self.volds[volname]
+        self._index_bricks(volname, vol_data['brickdata'], remove)
+        for (node, mnts) in vol_data['mountpath'].items():
+            if remove:
+                self._index_mount(volname, node, remove=True)
+                continue
+            for mnt in mnts:
+                self._index_mount(volname, node, mnt)
+
+    def _index_snap_mounts(self, snapname: str):
+        """
+        Helper function to rebuild the index of the client:path mounts
+        of a snapshot.
+        Arg:
+            snapname (str)
+        """
+        if snapname not in self.snapm:
+            self.snap_mnt_index.pop(snapname, None)
+            return
+        self.snap_mnt_index[snapname] = [
+            f"{client}:{mnt}" for (client, mnts) in
+            self.snapm[snapname].items() for mnt in mnts]
+
+    @_env_locked
+    @_persisted
     def set_new_volume(self, volname: str, brickdata: dict):
         """
         Add a new volume when created to volds.
@@ -285,15 +577,398 @@ class FrameworkEnv:
                                            "arbiter_count": 0,
                                            "redundancy_count": 0,
                                            "transport": ""}}
+        self._index_bricks(volname, brickdata)
+        self.record_change('volumes', volname)
 
+    @_env_locked
+    @_persisted
     def reset_ds(self):
         """
         Method to reset the DSs.
         """
-        self.volds = {}
-        self.clusteropt = {}
-        self.snapm = {}
+        with self.data_lock:
+            self.volds = {}
+            self.clusteropt = {}
+            self.snapm = {}
+            self.journal = {}
+            self.cluster_health = None
+            self.brick_index = {}
+            self.brick_list_cache = {}
+            self.mount_index = {}
+            self.snap_mnt_index = {}
+            self.frozen_vols = {}
+            self.frozen_opts = None
+            self.frozen_snaps = {}
+
+    @_data_locked
+    def start_journal(self, owner: str = None):
+        """
+        Method to start a fresh change journal. It is called at the start
+        of a test, so that the journal reflects what the test changed and
+        the teardown can repair only that. As the tests running
+        concurrently can share the store, every test has a journal of its
+        own.
+        Arg:
+            owner (str): Name of the test owning the journal.
+        """
+        self.journal[owner] = {}
 
+    @_data_locked
+    def end_journal(self, owner: str = None):
+        """
+        Method to drop the change journal of a test.
+        Arg:
+            owner (str): Name of the test owning the journal.
+        """
+        self.journal.pop(owner, None)
+
+    @_data_locked
+    def record_change(self, category: str, target: str):
+        """
+        Method to record a change to the environment in the journal. The
+        changes to the volumes and options are recorded by the setters
+        themselves and the node reboots by Rexe.reboot_node, under
+        'nodes'.
+        Args:
+            category (str): Kind of change, i.e. 'volumes', 'voltype',
+                            'bricks', 'mounts', 'state', 'options',
+                            'cluster_options', 'snap_mounts' or 'nodes'.
+            target (str): The volume, option, snapshot or node changed.
+        When the env is shared, the change is recorded only in the journal
+        of the test on whose behalf the call is made.
+        """
+        owner = getattr(self.caller, "owner", None)
+        if owner in self.journal:
+            journals = [self.journal[owner]]
+        else:
+            # Not called on behalf of a test, i.e. in the process running
+            # the test or by the framework.
+            journals = self.journal.values()
+        for changes in journals:
+            changes.setdefault(category, set()).add(target)
+        if category == 'nodes':
+            self.invalidate_cluster_health()
+        elif category == 'cluster_options':
+            self.frozen_opts = None
+        elif category == 'snap_mounts':
+            self.frozen_snaps.pop(target, None)
+        else:
+            self.frozen_vols.pop(target, None)
+
+    @_data_locked
+    def get_journal(self, owner: str = None) -> dict:
+        """
+        Method to obtain the changes recorded since the journal started.
+        Arg:
+            owner (str): Name of the test owning the journal.
+        Returns:
+            dict of the change category and the set of changed targets.
+        """
+        return {category: set(targets) for (category, targets)
+                in self.journal.get(owner, {}).items()}
+
+    @_data_locked
+    def set_cluster_health(self, health: dict):
+        """
+        Method to cache the result of a cluster health probe.
+        Arg:
+            health (dict)
+        """
+        self.cluster_health = (time.monotonic(), health)
+
+    @_data_locked
+    def get_cluster_health(self, ttl: int) -> dict:
+        """
+        Method to obtain the cached cluster health, if it isn't older
+        than the ttl.
+        Arg:
+            ttl (int): Validity of the cached health in seconds.
+        Returns:
+            dict of the cluster health or None if it has to be probed.
+        """
+        if self.cluster_health is None:
+            return None
+        (probe_time, health) = self.cluster_health
+        if time.monotonic() - probe_time > ttl:
+            return None
+        return copy.deepcopy(health)
+
+    @_data_locked
+    def invalidate_cluster_health(self):
+        """
+        Method to drop the cached cluster health, once the cluster might
+        have been disrupted.
+        """
+        self.cluster_health = None
+
+    @_data_locked
+    def is_volume_changed(self, volname: str, owner: str = None) -> bool:
+        """
+        Method to check if the journal has any change to the volume.
+        Args:
+            volname (str)
+            owner (str): Name of the test owning the journal.
+        Returns:
+            bool
+        """
+        changes = self.journal.get(owner, {})
+        return any(volname in changes.get(category, ())
+                   for category in ('volumes', 'voltype', 'bricks',
+                                    'mounts', 'state', 'options'))
+
+    def _get_frozen_volume(self, volname: str) -> dict:
+        """
+        Helper function to obtain the read-only data of a volume, which is
+        shared by the snapshots till the volume changes.
+        Arg:
+            volname (str)
+        Returns:
+            FrozenDict of the volume data.
+        """
+        with self._get_volume_lock(volname):
+            frozen = self.frozen_vols.get(volname)
+            if frozen is None:
+                frozen = _freeze(self.volds[volname])
+                with self.data_lock:
+                    self.frozen_vols[volname] = frozen
+            return frozen
+
+    def _get_frozen_snap(self, snapname: str) -> dict:
+        """
+        Helper function to obtain the read-only mount data of a snapshot.
+        Has to be called with the data_lock held.
+        Arg:
+            snapname (str)
+        Returns:
+            FrozenDict of the snapshot mounts.
+        """
+        frozen = self.frozen_snaps.get(snapname)
+        if frozen is None:
+            frozen = _freeze(self.snapm[snapname])
+            self.frozen_snaps[snapname] = frozen
+        return frozen
+
+    @_env_locked
+    def snapshot(self) -> EnvSnapshot:
+        """
+        Method to take a read-only snapshot of the env, e.g. before and
+        after a test step, to be compared with diff.
+        Returns:
+            EnvSnapshot
+        """
+        volds = FrozenDict({volname: self._get_frozen_volume(volname)
+                            for volname in self.volds})
+        with self.data_lock:
+            if self.frozen_opts is None:
+                self.frozen_opts = _freeze(self.clusteropt)
+            snapm = FrozenDict({snap: self._get_frozen_snap(snap)
+                                for snap in self.snapm})
+            return EnvSnapshot(volds, self.frozen_opts, snapm)
+
+    @staticmethod
+    def diff(snap_a: EnvSnapshot, snap_b: EnvSnapshot) -> dict:
+        """
+        Method to find the changes between two snapshots. The parts shared
+        by the snapshots are skipped without being compared.
+        Args:
+            snap_a (EnvSnapshot): The older snapshot.
+            snap_b (EnvSnapshot): The newer snapshot.
+        Returns:
+            dict with the following keys,
+            - volumes_added : list of the volumes created in between.
+            - volumes_removed : list of the volumes deleted in between.
+            - volumes_changed : dict of volume name to a dict of the changed
+                                fields ( e.g. options, brickdata ) and the
+                                tuple of their old and new values.
+            - cluster_options : dict of the changed cluster options and
+                                the tuple of their old and new values.
+            - snap_mounts : dict of the snapshots whose mounts changed and
+                            the tuple of their old and new mounts.
+        """
+        changes = {"volumes_added": [], "volumes_removed": [],
+                   "volumes_changed": {}, "cluster_options": {},
+                   "snap_mounts": {}}
+        for (volname, vol_b) in snap_b.volds.items():
+            vol_a = snap_a.volds.get(volname)
+            if vol_a is None:
+                changes["volumes_added"].append(volname)
+            elif vol_a is not vol_b:
+                fields = {field: (vol_a.get(field), val)
+                          for (field, val) in vol_b.items()
+                          if vol_a.get(field) != val}
+                if fields:
+                    changes["volumes_changed"][volname] = fields
+        changes["volumes_removed"] = [volname for volname in snap_a.volds
+                                      if volname not in snap_b.volds]
+        if snap_a.clusteropt is not snap_b.clusteropt:
+            for opt in set(snap_a.clusteropt) | set(snap_b.clusteropt):
+                (old, new) = (snap_a.clusteropt.get(opt),
+                              snap_b.clusteropt.get(opt))
+                if old != new:
+                    changes["cluster_options"][opt] = (old, new)
+        for snap in set(snap_a.snapm) | set(snap_b.snapm):
+            (old, new) = (snap_a.snapm.get(snap), snap_b.snapm.get(snap))
+            if old is not new and old != new:
+                changes["snap_mounts"][snap] = (old, new)
+        return changes
+
+    def _get_state_journal_path(self, pid: int = None) -> str:
+        """
+        Helper function to obtain the path of the state journal. The
+        forked worker processes journal their own copy of the env into a
+        journal of their own.
+        Arg:
+            pid (int): Pid of the worker. None for the calling process.
+        """
+        if pid is None:
+            pid = os.getpid()
+        if pid == self.state_pid:
+            return f"{self.state_path}.journal"
+        return f"{self.state_path}.{pid}.journal"
+
+    def _note_fork(self):
+        """
+        Helper function run in a forked worker, to note the state of its
+        copy of the env, which its state journal starts from.
+        """
+        if self.state_path is None:
+            return
+        state = {"version": self.STATE_VERSION, "volds": self.volds,
+                 "clusteropt": self.clusteropt, "snapm": self.snapm}
+        self.state_fork_header = json.dumps(["#fork", [state], {}])
+
+    def _append_to_state_journal(self, method_name: str, args: tuple,
+                                 kwargs: dict):
+        """
+        Helper function to append a mutator call to the state journal.
+        """
+        with self.data_lock:
+            if self.state_journal_pid != os.getpid():
+                self.state_journal_fd = open(self._get_state_journal_path(),
+                                             'a')
+                self.state_journal_pid = os.getpid()
+                if os.getpid() != self.state_pid:
+                    self.state_journal_fd.write(
+                        f"{self.state_fork_header}\n")
+            self.state_journal_fd.write(json.dumps([method_name, args,
+                                                    kwargs]) + "\n")
+            self.state_journal_fd.flush()
+
+    @_env_locked
+    def enable_persistence(self, state_path: str):
+        """
+        Method to start persisting the env to the disk. The state is saved
+        as versioned JSON and every mutation from then on is appended to
+        a journal alongside, i.e. `<state_path>.journal`.
+        Arg:
+            state_path (str): Path of the state file.
+        """
+        self.state_path = state_path
+        self.state_pid = os.getpid()
+        if not self.fork_hook_set:
+            os.register_at_fork(after_in_child=self._note_fork)
+            self.fork_hook_set = True
+        self.save_state()
+
+    @_env_locked
+    def save_state(self):
+        """
+        Method to save the whole state of the env and truncate the
+        journal, as it is already part of the saved state. It is to be
+        called by the process which enabled the persistence.
+        """
+        if self.state_path is None:
+            raise Exception("Persistence of the env isn't enabled")
+        with contextlib.ExitStack() as locks:
+            for volname in sorted(self.volds):
+                locks.enter_context(self._get_volume_lock(volname))
+            with self.data_lock:
+                state = {"version": self.STATE_VERSION,
+                         "volds": self.volds, "clusteropt": self.clusteropt,
+                         "snapm": self.snapm}
+                tmp_path = f"{self.state_path}.tmp"
+                with open(tmp_path, 'w') as state_fd:
+                    json.dump(state, state_fd)
+                os.replace(tmp_path, self.state_path)
+                if self.state_journal_fd is not None:
+                    self.state_journal_fd.close()
+                self.state_journal_fd = open(self._get_state_journal_path(),
+                                             'w')
+                self.state_journal_pid = os.getpid()
+
+    def _replay_state_journal(self, journal_path: str) -> int:
+        """
+        Helper function to replay the mutations of a state journal.
+        Arg:
+            journal_path (str)
+        Returns:
+            int: Number of the mutations replayed.
+        """
+        replayed = 0
+        with open(journal_path, 'r') as journal_fd:
+            for line in journal_fd:
+                try:
+                    (method_name, args, kwargs) = json.loads(line)
+                except ValueError:
+                    # The last write was torn by a crash.
+                    break
+                if method_name == "#fork":
+                    continue
+                if method_name not in _PERSISTED_METHODS:
+                    raise Exception(f"Unknown mutation {method_name} in "
+                                    f"{journal_path}")
+                getattr(self, method_name)(*args, **kwargs)
+                replayed += 1
+        return replayed
+
+    @_env_locked
+    def load_state(self, state_path: str, worker_pid: int = None) -> int:
+        """
+        Method to restore the env from a saved state and replay the
+        mutations journaled after it. The persistence stays disabled
+        after the restore, till it is enabled again.
+        The forked workers work on copies of the env, which are journaled
+        into `<state_path>.<pid>.journal` along with the state of the env
+        at the fork, so that the env as seen by a worker can be restored
+        as well.
+        Args:
+            state_path (str): Path of the state file.
+            worker_pid (int): Pid of the worker whose env is to be
+                              restored. None restores the env of the main
+                              process.
+        Returns:
+            int: Number of the journaled mutations replayed.
+        """
+        journal_path = f"{state_path}.journal"
+        if worker_pid is None:
+            with open(state_path, 'r') as state_fd:
+                state = json.load(state_fd)
+        else:
+            journal_path = f"{state_path}.{worker_pid}.journal"
+            with open(journal_path, 'r') as journal_fd:
+                header = json.loads(journal_fd.readline())
+            if header[0] != "#fork":
+                raise Exception(f"{journal_path} isn't a worker journal")
+            state = header[1][0]
+        if state.get("version") != self.STATE_VERSION:
+            raise Exception(f"{state_path} has env state version "
+                            f"{state.get('version')}, expected "
+                            f"{self.STATE_VERSION}")
+        self.state_path = None
+        self.init_ds()
+        self.volds = state["volds"]
+        self.clusteropt = state["clusteropt"]
+        self.snapm = state["snapm"]
+        for volname in self.volds:
+            self._index_volume(volname)
+        for snapname in self.snapm:
+            self._index_snap_mounts(snapname)
+
+        if not os.path.isfile(journal_path):
+            return 0
+        return self._replay_state_journal(journal_path)
+
+    @_env_locked
     def get_volnames(self) -> list:
         """
         Method returns a list of existing volume names
@@ -310,38 +985,52 @@ class FrameworkEnv:
         Returns:
             True: If volume exists, else False
         """
-        if volname in list(self.volds.keys()):
-            return True
-        return False
+        return volname in self.volds
 
+    @_env_locked
+    @_persisted
     def remove_volume_data(self, volname: str):
         """
         Removing a volume's data from the volds.
         Arg:
             volname (str)
         """
-        self._validate_volname(volname)
-        del self.volds[volname]
+        with self._get_volume_lock(volname):
+            self._validate_volname(volname)
+            self._index_volume(volname, True)
+            del self.volds[volname]
+            with self.vol_locks_guard:
+                self.vol_locks.pop(volname, None)
+        self.record_change('volumes', volname)
 
+    @_volume_locked
     def get_volume_dict(self, volname: str) -> dict:
         """
         Get the volume dictionary for requested volume.
         Arg:
             volname (str)
         Returns:
-            volds dictionary specific to given volume.
+            read-only view of the volds dictionary specific to given
+            volume, shared with the snapshots till the volume changes.
+            The changes are to be made through the setters, copy.deepcopy
+            gives a mutable copy.
         """
         self._validate_volname(volname)
-        return self.volds[volname]
+        return self._get_frozen_volume(volname)
 
+    @_env_locked
     def get_volds(self) -> dict:
         """
-        Get the volds.
+        Get the volds. The snapshot method gives a read-only view without
+        the cost of the copy.
         Returns:
-            volds dictionary as a whole.
+            copy of the volds dictionary as a whole.
         """
-        return copy.deepcopy(self.volds)
+        return {volname: copy.deepcopy(self._get_frozen_volume(volname))
+                for volname in self.volds}
 
+    @_volume_locked
+    @_persisted
     def set_vol_type(self, volname: str, voltype_dict: dict):
         """
         Modify volds voltype based on voltype_dict.
@@ -352,7 +1041,10 @@ class FrameworkEnv:
         self._validate_volname(volname)
         for (volt_key, volt_val) in list(voltype_dict.items()):
             self.volds[volname]['voltype'][volt_key] = volt_val
+        self.record_change('voltype', volname)
 
+    @_volume_locked
+    @_persisted
     def set_vol_type_param(self, volname: str, voltype_key: str,
                            delta_value: int):
         """
@@ -369,7 +1061,9 @@ class FrameworkEnv:
         if voltype_key not in self.volds[volname]['voltype']:
             self.volds[volname]['voltype'][voltype_key] = 0
         self.volds[volname]['voltype'][voltype_key] += delta_value
+        self.record_change('voltype', volname)
 
+    @_volume_locked
     def get_vol_type_param(self, volname: str, voltype_key: str):
         """
         Method to obtain a specific voltype param in volds.
@@ -385,6 +1079,7 @@ class FrameworkEnv:
             return None
         return self.volds[volname]['voltype'][voltype_key]
 
+    @_volume_locked
     def get_vol_type_changes(self, volname: str, pre_voltype: dict) -> dict:
         """
         Method to identify if there are any changes to the volume type
@@ -406,6 +1101,8 @@ class FrameworkEnv:
                 return True
         return False
 
+    @_volume_locked
+    @_persisted
     def add_new_mountpath(self, volname: str, node: str, path: str):
         """
         Add a new mountpath for given volume and client node.
@@ -420,7 +1117,11 @@ class FrameworkEnv:
             self.volds[volname]['mountpath'][node] = []
         if path not in list(self.volds[volname]['mountpath'][node]):
             self.volds[volname]['mountpath'][node].append(path)
+            self._index_mount(volname, node, path)
+        self.record_change('mounts', volname)
 
+    @_data_locked
+    @_persisted
     def add_new_snap_mountpath(self, snapname: str, node: str, path: str):
         """
         Add a new mountpath for given snapshot.
@@ -436,7 +1137,11 @@ class FrameworkEnv:
             self.snapm[snapname][node] = []
 
         self.snapm[snapname][node].append(path)
+        self._index_snap_mounts(snapname)
+        self.record_change('snap_mounts', snapname)
 
+    @_volume_locked
+    @_persisted
     def remove_mountpath(self, volname: str, node: str, path: str):
         """
         Removes the mountpath entries under a client node for a
@@ -449,9 +1154,14 @@ class FrameworkEnv:
         self._validate_volname(volname)
         if len(self.volds[volname]['mountpath'][node]) == 1:
             del self.volds[volname]['mountpath'][node]
+            self._index_mount(volname, node, remove=True)
         else:
             self.volds[volname]['mountpath'][node].remove(path)
+            self._index_mount(volname, node, path, True)
+        self.record_change('mounts', volname)
 
+    @_data_locked
+    @_persisted
     def remove_snap_mountpath(self, snapname: str = None, node: str = None,
                               path: str = None):
         """
@@ -466,15 +1176,22 @@ class FrameworkEnv:
             path (str): Optional parameter with default value None. The
             mountpath. If None, the data under all clients is purged.
         """
+        for snap in ([snapname] if snapname is not None
+                     else list(self.snapm)):
+            self.record_change('snap_mounts', snap)
         if snapname is None:
             self.snapm = {}
+            self.snap_mnt_index = {}
+            return
         elif node is None:
             self.snapm[snapname] = {}
         elif path is None:
             self.snapm[snapname][node] = []
         else:
             self.snapm[snapname][node].remove(path)
+        self._index_snap_mounts(snapname)
 
+    @_volume_locked
     def get_mnt_pts_dict(self, volname: str) -> dict:
         """
         Method to obtain the mountpath dictionary.
@@ -486,6 +1203,7 @@ class FrameworkEnv:
         self._validate_volname(volname)
         return list(self.volds[volname]['mountpath'])
 
+    @_data_locked
     def get_snap_mnt_dict(self, snapname: str = None) -> dict:
         """
         Method to obtain the mountpath directory
@@ -494,14 +1212,17 @@ class FrameworkEnv:
             snapname (str): optional parameter with default value None.
             None implies snap data for all snapshots.
         Returns:
-            dictionary of mountpoints for a given snap(s) or empty dict.
+            copy of the dictionary of mountpoints for a given snap(s) or
+            empty dict.
         """
         if snapname is None:
-            return copy.deepcopy(self.snapm)
+            return {snap: copy.deepcopy(self._get_frozen_snap(snap))
+                    for snap in self.snapm}
         if snapname not in self.snapm.keys():
             return {}
-        return copy.deepcopy(self.snapm[snapname])
+        return copy.deepcopy(self._get_frozen_snap(snapname))
 
+    @_data_locked
     def get_snap_mnt_dict_simplified(self, snapname: str = None) -> list:
         """
         Method to obtain the snap data as a dictionary wherein keys
@@ -514,26 +1235,14 @@ class FrameworkEnv:
         Returns:
             dictionary of snapname-> list of string of client:path relation.
         """
-        temp_dict = {}
         if snapname is not None:
-            if snapname not in self.snapm.keys():
-                return temp_dict
-            temp_list = []
-            for (client, mnts) in self.snapm[snapname].items():
-                for mnt in mnts:
-                    val = f"{client}:{mnt}"
-                    temp_list.appen(val)
-            temp_dict[snapname] = temp_list
-            return temp_dict
-        for snap in self.snapm.keys():
-            temp_list = []
-            for (client, mnts) in self.snapm[snap].items():
-                for mnt in mnts:
-                    val = f"{client}:{mnt}"
-                    temp_list.append(val)
-            temp_dict[snapname] = temp_list
-        return temp_dict
+            if snapname not in self.snap_mnt_index:
+                return {}
+            return {snapname: list(self.snap_mnt_index[snapname])}
+        return {snap: list(mnts)
+                for (snap, mnts) in self.snap_mnt_index.items()}
 
+    @_volume_locked
     def get_mnt_pts_dict_in_list(self, volname: str) -> list:
         """
         Method to return a modified list of mountpath which contains
@@ -556,6 +1265,7 @@ class FrameworkEnv:
 
         return mnt_list
 
+    @_volume_locked
     def get_mnt_pts_list(self, volname: str, node: str = None) -> list:
         """
         Method to obtain the list of mountpaths.
@@ -568,15 +1278,16 @@ class FrameworkEnv:
         """
         self._validate_volname(volname)
         if node is None:
-            mount_point_list = []
-            for (_, mnt_pts) in list(self.volds[volname]['mountpath'].items()):
-                mount_point_list.append(mnt_pts)
-            return mount_point_list
-        elif node not in self.volds[volname]['mountpath'].keys():
-            raise KeyError
-        else:
-            return self.volds[volname]['mountpath'][node]
-
+            return [list(mnt_pts) for mnt_pts
+                    in self.volds[volname]['mountpath'].values()]
+        with self.data_lock:
+            mnt_pts = self.mount_index.get(node, {}).get(volname)
+            if mnt_pts is None:
+                raise KeyError(node)
+            return list(mnt_pts)
+
+    @_volume_locked
+    @_persisted
     def add_bricks_to_brickdata(self, volname: str, brick_dict: dict):
         """
         Method to add new set of bricks into the existing brick
@@ -591,7 +1302,11 @@ class FrameworkEnv:
             if node not in self.volds[volname]['brickdata'].keys():
                 self.volds[volname]['brickdata'][node] = []
             self.volds[volname]['brickdata'][node].extend(brick_dict[node])
+        self._index_bricks(volname, brick_dict)
+        self.record_change('bricks', volname)
 
+    @_volume_locked
+    @_persisted
     def set_brickdata(self, volname: str, brick_dict: dict):
         """
         Method will replace the existing brickdict of a volume with
@@ -602,8 +1317,13 @@ class FrameworkEnv:
                                 being list of bricks under that node.
         """
         self._validate_volname(volname)
+        self._index_bricks(volname, self.volds[volname]['brickdata'], True)
         self.volds[volname]['brickdata'] = brick_dict
+        self._index_bricks(volname, brick_dict)
+        self.record_change('bricks', volname)
 
+    @_volume_locked
+    @_persisted
     def remove_bricks_from_brickdata(self, volname: str, brick_data: dict):
         """
         Method to remove the brick brickdata
@@ -613,7 +1333,11 @@ class FrameworkEnv:
         for node in brick_data:
             for brick in brick_data[node]:
                 self.volds[volname]["brickdata"][node].remove(brick)
+        self._index_bricks(volname, brick_data, True)
+        self.record_change('bricks', volname)
 
+    @_volume_locked
+    @_persisted
     def replace_brick_from_brickdata(self, volname: str, src_brick: str,
                                      dest_brick: str):
         """
@@ -629,18 +1353,24 @@ class FrameworkEnv:
 
         self.volds[volname]["brickdata"][d_node].append(d_path)
         self.volds[volname]["brickdata"][s_node].remove(s_path)
+        self._index_bricks(volname, {s_node: [s_path]}, True)
+        self._index_bricks(volname, {d_node: [d_path]})
+        self.record_change('bricks', volname)
 
+    @_volume_locked
     def get_brickdata(self, volname: str) -> dict:
         """
         Method to obtain brick dictionary
         Args:
             volname (str)
         Return:
-            dictionary of nodes and their list of bricks.
+            copy of the dictionary of nodes and their list of bricks.
         """
         self._validate_volname(volname)
-        return self.volds[volname]['brickdata']
+        return {node: list(bricks) for (node, bricks)
+                in self.volds[volname]['brickdata'].items()}
 
+    @_volume_locked
     def get_all_bricks_list(self, volname: str) -> list:
         """
         This function creates a list of
@@ -651,15 +1381,44 @@ class FrameworkEnv:
         Returns:
             List of bricks
         """
-        brick_dict = self.get_brickdata(volname)
-        brick_list = []
-        for server in brick_dict:
-            for brick in brick_dict[server]:
-                brick = f"{server}:{brick}"
-                brick_list.append(brick)
+        brick_list = self.brick_list_cache.get(volname)
+        if brick_list is None:
+            self._validate_volname(volname)
+            brick_dict = self.volds[volname]['brickdata']
+            brick_list = [f"{server}:{brick}" for server in brick_dict
+                          for brick in brick_dict[server]]
+            with self.data_lock:
+                self.brick_list_cache[volname] = brick_list
+        return list(brick_list)
 
-        return brick_list
+    @_data_locked
+    def get_brick_owner(self, brick: str) -> tuple:
+        """
+        Method to obtain the volume and the node a brick belongs to.
+        Arg:
+            brick (str): Brick in the node:path form.
+        Returns:
+            tuple of volume name and node, or (None, None) if the brick
+            isn't part of any volume.
+        """
+        volname = self.brick_index.get(brick)
+        if volname is None:
+            return (None, None)
+        return (volname, brick.split(":")[0])
 
+    @_data_locked
+    def get_node_mountpoints(self, node: str) -> list:
+        """
+        Method to obtain all the volume mountpoints of a client node.
+        Arg:
+            node (str)
+        Returns:
+            list of dictionaries with the volname and the mountpath.
+        """
+        return [{"volname": volname, "mountpath": path} for (volname, mnts)
+                in self.mount_index.get(node, {}).items() for path in mnts]
+
+    @_volume_locked
     def get_brick_list(self, volname: str, node: str) -> list:
         """
         Method to obtain brick list
@@ -667,7 +1426,7 @@ class FrameworkEnv:
             volname (str)
             node (str)
         Returns:
-            List of bricks for the given node.
+            copy of the list of bricks for the given node.
         """
         self._validate_volname(volname)
         if node is None:
@@ -675,8 +1434,10 @@ class FrameworkEnv:
         if node not in self.volds[volname]['brickdata'].keys():
             raise KeyError
         else:
-            return self.volds[volname]['brickdata'][node]
+            return list(self.volds[volname]['brickdata'][node])
 
+    @_volume_locked
+    @_persisted
     def set_volume_start_status(self, volname: str, state: bool):
         """
         Method to set the volume start status to true or false.
@@ -686,7 +1447,9 @@ class FrameworkEnv:
         """
         self._validate_volname(volname)
         self.volds[volname]['started'] = state
+        self.record_change('state', volname)
 
+    @_volume_locked
     def get_volume_start_status(self, volname: str) -> bool:
         """
         Method to get the volume start status.
@@ -698,6 +1461,8 @@ class FrameworkEnv:
         self._validate_volname(volname)
         return self.volds[volname]['started']
 
+    @_volume_locked
+    @_persisted
     def set_vol_option(self, volname: str, options_dict: dict):
         """
         Method to set a volume option for said volume
@@ -711,7 +1476,10 @@ class FrameworkEnv:
             self.volds[volname]['options'] = {}
         for (opt, opt_val) in list(options_dict.items()):
             self.volds[volname]['options'][opt] = opt_val
+        self.record_change('options', volname)
 
+    @_data_locked
+    @_persisted
     def set_vol_options_all(self, option_dict: dict):
         """
         Method to set a said cluster options.
@@ -720,7 +1488,10 @@ class FrameworkEnv:
         """
         for (key, value) in option_dict.items():
             self.clusteropt[key] = value
+            self.record_change('cluster_options', key)
 
+    @_data_locked
+    @_persisted
     def reset_vol_options_all(self, option_list: list):
         """
         Method to remove a cluster option.
@@ -729,26 +1500,30 @@ class FrameworkEnv:
         """
         for opt in option_list:
             del self.clusteropt[opt]
+            self.record_change('cluster_options', opt)
 
+    @_volume_locked
     def get_vol_option(self, volname: str) -> dict:
         """
         Method to obtain the volume options changed during the TC run.
         Arg:
             volname (str)
         Returns:
-            Dictionary
+            copy of the options dictionary
         """
         self._validate_volname(volname)
-        return copy.deepcopy(self.volds[volname]['options'])
+        return dict(self.volds[volname]['options'])
 
+    @_data_locked
     def get_vol_options_all(self) -> dict:
         """
         Method to return the cluster options dict.
         Returns:
-            dict
+            copy of the cluster options dict.
         """
-        return self.clusteropt
+        return dict(self.clusteropt)
 
+    @_volume_locked
     def is_volume_options_populated(self, volname: str) -> bool:
         """
         Method to reflect if the volume options are
@@ -774,25 +1549,30 @@ class FrameworkEnv:
             for opt in list(self.volds[volname]['options']):
                 del self.volds[volname]['options'][opt]
 
+    @_volume_or_all_locked
+    @_persisted
     def reset_volume_option(self, volname: str, option: str):
         """
         Method to handle the reseting of the volume options
         populated inside the volds.
         """
-        if volname == "all" and option == "all":
-            self.clusteropt = {}
-            for vol_name in list(self.volds):
-                self._reset_all_options_in_a_vol(vol_name)
-        elif volname == "all":
+        if volname == "all":
+            if option == "all":
+                for vol_name in self.volds:
+                    self._reset_all_options_in_a_vol(vol_name)
+                    self.record_change('options', vol_name)
+            for opt in self.clusteropt:
+                self.record_change('cluster_options', opt)
             self.clusteropt = {}
-        elif option == "all":
-            if self.volds[volname]['options'] != {}:
-                for opt in list(self.volds[volname]['options']):
-                    del self.volds[volname]['options'][opt]
+            return
+        if option == "all":
+            self._reset_all_options_in_a_vol(volname)
         elif self.volds[volname]['options'] != {} and \
                 option in self.volds[volname]['options']:
             del self.volds[volname]['options'][option]
+        self.record_change('options', volname)
 
+    @_volume_locked
     def get_volume_nodes(self, volname: str):
         """
         Function to get all the nodes whose bricks are
@@ -0,0 +1,293 @@
+"""
+This component selects the tests impacted by the changes made since a
+given git revision, so that quick gate runs only execute the tests which
+touch the changed code paths.
+
+A test is considered impacted if,
+1. The test module or any local module it imports ( transitively, e.g. the
+   parent test classes ) has changed,
+2. It calls a `redant.<op>` whose definition was touched by the change,
+   or which calls, directly or not, a library function touched by it,
+3. Any framework file ( under core/ ) has changed, as that can affect
+   every test.
+
+The ops called and the local imports of every module, as well as the
+calls made by the library functions, are found statically and cached in
+discovery indexes of their own. The library calls are matched by name,
+hence a change might select a few tests more than needed, but never
+less.
+"""
+import os
+import re
+import ast
+import subprocess
+from discovery_index import DiscoveryIndex
+
+
+DEFAULT_IMPACT_INDEX_PATH = "~/.cache/redant/impact_index.json"
+DEFAULT_CALL_INDEX_PATH = "~/.cache/redant/call_index.json"
+
+
+class ImpactAnalyzer:
+    """
+    The impact analyzer maps the diff since a revision to the changed ops
+    and checks the tests against it.
+    """
+    framework_dirs = ['core']
+    # Dirs of the library the ops come from.
+    library_dirs = ['common', 'utility']
+    hunk_regex = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+    def __init__(self, rev: str,
+                 index_path: str = DEFAULT_IMPACT_INDEX_PATH,
+                 call_index_path: str = DEFAULT_CALL_INDEX_PATH):
+        """
+        Computes the changed files and the changed ops since the revision.
+        Args:
+            rev (str): The git revision to compare the working tree with.
+            index_path (str): Path of the on-disk index of the test
+                              dependencies.
+            call_index_path (str): Path of the on-disk index of the calls
+                                   made by the library functions.
+        """
+        self.rev = rev
+        self.dep_index = DiscoveryIndex(index_path)
+        self.call_index = DiscoveryIndex(call_index_path)
+        # git reports the paths relative to the top of the repo, whereas
+        # the test paths are relative to the current dir.
+        toplevel = self._git("rev-parse", "--show-toplevel").strip()
+        changed = self._git("-C", toplevel, "diff", "--name-only",
+                            rev).splitlines()
+        untracked = self._git("-C", toplevel, "ls-files", "--others",
+                              "--exclude-standard").splitlines()
+        self.untracked_files = {os.path.relpath(os.path.join(toplevel, path))
+                                for path in untracked}
+        self.changed_files = {os.path.relpath(os.path.join(toplevel, path))
+                              for path in changed} | self.untracked_files
+        self.select_all = any(
+            path.split("/")[0] in self.framework_dirs
+            for path in self.changed_files)
+        self.changed_ops = set()
+        for path in self.changed_files:
+            if path.endswith(".py") and \
+               not path.split("/")[-1].startswith("test"):
+                self.changed_ops.update(self._get_changed_functions(path))
+        if self.changed_ops and not self.select_all:
+            self._add_library_callers()
+        self.deps_cache = {}
+
+    def _git(self, *git_args) -> str:
+        """
+        Runs a git command and returns its output.
+        """
+        ret = subprocess.run(["git", *git_args], stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE, universal_newlines=True)
+        if ret.returncode != 0:
+            raise Exception(f"git {' '.join(git_args)} failed : "
+                            f"{ret.stderr.strip()}")
+        return ret.stdout
+
+    @staticmethod
+    def _get_function_ranges(source: str) -> list:
+        """
+        Method to obtain the line ranges of all the functions and methods
+        defined in the source.
+        Returns:
+            list of tuples of function name, start line and end line.
+        """
+        ranges = []
+        for node in ast.walk(ast.parse(source)):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                start = min([node.lineno] + [dec.lineno for dec in
+                                             node.decorator_list])
+                ranges.append((node.name, start, node.end_lineno))
+        return ranges
+
+    def _get_changed_functions(self, path: str) -> set:
+        """
+        Method to obtain the names of the functions touched by the diff
+        of a library file. In case a change lies outside of any function,
+        or the file is new, all the functions of the file are treated as
+        changed.
+        Args:
+            path (str): Path of the changed file.
+        Returns:
+            set of function names.
+        """
+        if not os.path.isfile(path):
+            # Removed file, all the functions it had are gone.
+            source = self._git("show", f"{self.rev}:./{path}")
+            return {name for (name, _, _) in
+                    self._get_function_ranges(source)}
+
+        with open(path, 'r') as src_fd:
+            ranges = self._get_function_ranges(src_fd.read())
+        if path in self.untracked_files:
+            return {name for (name, _, _) in ranges}
+        changed = set()
+        diff = self._git("diff", "-U0", self.rev, "--", path)
+        for line in diff.splitlines():
+            match = self.hunk_regex.match(line)
+            if match is None:
+                continue
+            start = int(match.group(1))
+            count = 1 if match.group(2) is None else int(match.group(2))
+            if count == 0:
+                # A pure deletion is reported after the given line.
+                end = start + 1
+            else:
+                end = start + count - 1
+            touched = {name for (name, fstart, fend) in ranges
+                       if fstart <= end and start <= fend}
+            if not touched:
+                return {name for (name, _, _) in ranges}
+            changed.update(touched)
+        return changed
+
+    @staticmethod
+    def get_module_calls(path: str) -> dict:
+        """
+        Method to statically find the names of the functions called by
+        every function defined in a module.
+        Args:
+            path (str): The path of the module.
+        Returns:
+            dict of function name to the list of the called names.
+        """
+        with open(path, 'r') as src_fd:
+            tree = ast.parse(src_fd.read(), filename=path)
+        calls = {}
+        for node in ast.walk(tree):
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            called = calls.setdefault(node.name, set())
+            for sub in ast.walk(node):
+                if not isinstance(sub, ast.Call):
+                    continue
+                if isinstance(sub.func, ast.Attribute):
+                    called.add(sub.func.attr)
+                elif isinstance(sub.func, ast.Name):
+                    called.add(sub.func.id)
+        return {name: sorted(called) for (name, called) in calls.items()}
+
+    def _add_library_callers(self):
+        """
+        Method to add the library functions calling a changed function,
+        directly or through other library functions, to the changed ops,
+        so that a change to a helper, e.g. in utility/rexe.py, selects
+        the tests using the ops built on it.
+        """
+        callers = {}
+        for lib_dir in self.library_dirs:
+            for (root, _, files) in os.walk(lib_dir):
+                for file_name in files:
+                    if not file_name.endswith(".py"):
+                        continue
+                    calls = self.call_index.lookup(
+                        os.path.join(root, file_name), self.get_module_calls)
+                    for (func, called) in calls.items():
+                        for name in called:
+                            callers.setdefault(name, set()).add(func)
+        pending = list(self.changed_ops)
+        while pending:
+            for caller in callers.get(pending.pop(), ()):
+                if caller not in self.changed_ops:
+                    self.changed_ops.add(caller)
+                    pending.append(caller)
+
+    @staticmethod
+    def _resolve_module(module: str, level: int, tc_path: str) -> str:
+        """
+        Method to resolve an imported module to a local file path.
+        Returns:
+            The path of the module or None if it isn't a local module.
+        """
+        if level > 0:
+            base = os.path.dirname(tc_path)
+            for _ in range(level - 1):
+                base = os.path.dirname(base)
+            parts = [base] + (module.split(".") if module else [])
+        else:
+            parts = module.split(".")
+        mod_path = os.path.join(*parts)
+        for candidate in (f"{mod_path}.py",
+                          os.path.join(mod_path, "__init__.py")):
+            if os.path.isfile(candidate):
+                return os.path.normpath(candidate)
+        return None
+
+    @classmethod
+    def get_module_deps(cls, tc_path: str) -> dict:
+        """
+        Method to statically find the redant ops called and the local
+        modules imported by a module.
+        Args:
+            tc_path (str): The path of the module.
+        Returns:
+            dict with the list of ops and the list of imported paths.
+        """
+        with open(tc_path, 'r') as tc_fd:
+            tree = ast.parse(tc_fd.read(), filename=tc_path)
+        ops = set()
+        imports = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call) and \
+               isinstance(node.func, ast.Attribute):
+                owner = node.func.value
+                if ((isinstance(owner, ast.Name) and owner.id == "redant")
+                   or (isinstance(owner, ast.Attribute)
+                       and owner.attr == "redant")):
+                    ops.add(node.func.attr)
+            elif isinstance(node, ast.ImportFrom):
+                imp_path = cls._resolve_module(node.module, node.level,
+                                               tc_path)
+                if imp_path is not None:
+                    imports.add(imp_path)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    imp_path = cls._resolve_module(alias.name, 0, tc_path)
+                    if imp_path is not None:
+                        imports.add(imp_path)
+        return {"ops": sorted(ops), "imports": sorted(imports)}
+
+    def _get_transitive_deps(self, tc_path: str) -> tuple:
+        """
+        Method to obtain the ops and files a module depends on, including
+        those of the local modules it imports.
+        Returns:
+            tuple of set of ops and set of file paths.
+        """
+        tc_path = os.path.normpath(tc_path)
+        if tc_path in self.deps_cache:
+            return self.deps_cache[tc_path]
+        # Guard against import cycles.
+        self.deps_cache[tc_path] = (set(), {tc_path})
+        deps = self.dep_index.lookup(tc_path, self.get_module_deps)
+        ops = set(deps["ops"])
+        files = {tc_path}
+        for imp_path in deps["imports"]:
+            imp_ops, imp_files = self._get_transitive_deps(imp_path)
+            ops |= imp_ops
+            files |= imp_files
+        self.deps_cache[tc_path] = (ops, files)
+        return (ops, files)
+
+    def is_test_impacted(self, tc_path: str) -> bool:
+        """
+        Method to check if the test is impacted by the changes.
+        Args:
+            tc_path (str): The path of the test case.
+        Returns:
+            bool
+        """
+        if self.select_all:
+            return True
+        ops, files = self._get_transitive_deps(tc_path)
+        return bool(files & self.changed_files or ops & self.changed_ops)
+
+    def save(self):
+        """
+        Persists the dependency and the call indexes.
+        """
+        self.dep_index.save()
+        self.call_index.save()
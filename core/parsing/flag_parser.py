@@ -0,0 +1,86 @@
+"""
+This module consists a single class - FlagParser, which
+parses the flag line present in the header of a test module.
+"""
+import tokenize
+
+
+class FlagParser:
+    """
+    The flag line is the first comment of a test module. It holds the test
+    nature and the volume types, optionally followed by key=value flags.
+    For example,
+        # disruptive;rep,dist-rep;timeout=1800;tags=snap,heal;servers=4
+
+    Only the module header is read, i.e. the tokenizer stops at the flag
+    comment or at the first class or function definition, whichever
+    comes first. Hence the cost of parsing doesn't depend on the length
+    of the test itself.
+    """
+    resource_keys = ['servers', 'clients']
+
+    @staticmethod
+    def read_flag_line(tc_path: str) -> str:
+        """
+        Function to read the flag line of a test module.
+        Args:
+            tc_path (str): The path of the test case.
+        Returns:
+            str: The flag comment without the leading '#'.
+        """
+        with tokenize.open(tc_path) as tc_fd:
+            for token in tokenize.generate_tokens(tc_fd.readline):
+                if token.type == tokenize.COMMENT:
+                    return token.string[1:].strip()
+                if (token.type == tokenize.NAME and token.start[1] == 0
+                   and token.string in ('class', 'def', 'async')):
+                    break
+        raise Exception(f"{tc_path} has no flags in its header")
+
+    @classmethod
+    def parse(cls, tc_path: str) -> dict:
+        """
+        Function to parse the flags of a test module.
+        Args:
+            tc_path (str): The path of the test case.
+        Returns:
+            dict: The test flags, i.e.
+                  {
+                    "tcNature" : "disruptive",
+                    "volType" : ["rep", "dist-rep"],
+                    "timeout" : 1800,
+                    "tags" : ["snap", "heal"],
+                    "resources" : {"servers": 4}
+                  }
+        """
+        flags = cls.read_flag_line(tc_path).split(';')
+        if len(flags) < 2:
+            raise Exception(f"{tc_path} has invalid flags "
+                            f"{';'.join(flags)}")
+
+        tc_flags = {}
+        tc_flags["tcNature"] = flags[0].strip()
+        tc_flags["volType"] = [vol_type.strip()
+                               for vol_type in flags[1].split(',')]
+        if tc_flags["volType"] == ['']:
+            tc_flags["volType"] = ["Generic"]
+        tc_flags["timeout"] = None
+        tc_flags["tags"] = []
+        tc_flags["resources"] = {}
+
+        for flag in flags[2:]:
+            if flag.strip() == '':
+                continue
+            if '=' not in flag:
+                raise Exception(f"{tc_path} has invalid flag {flag}")
+            key, value = (val.strip() for val in flag.split('=', 1))
+            if key == "timeout":
+                tc_flags["timeout"] = int(value)
+            elif key == "tags":
+                tc_flags["tags"] = [tag.strip() for tag in value.split(',')
+                                    if tag.strip() != '']
+            elif key in cls.resource_keys:
+                tc_flags["resources"][key] = int(value)
+            else:
+                raise Exception(f"{tc_path} has unknown flag {key}")
+        return tc_flags
@@ -21,6 +21,7 @@ class ParamsHandler:
         self.run_config = self.config_hashmap['RUN']
         self.env_config = self.config_hashmap['ENV_DATA']
         self.dep_config = self.config_hashmap['DEPLOYMENT']
+        self.volume_types = self.config_hashmap.get('volume_types', {})
 
     # def get_server_ip_list(self) -> list:
     #     """
@@ -54,13 +55,13 @@ class ParamsHandler:
     #     """
     #     return list(self.client_config.keys())
 
-    # def get_volume_types(self) -> dict:
-    #     """
-    #     Getter for volume information.
-    #     Retuns:
-    #         Dict
-    #     """
-    #     return self.volume_types
+    def get_volume_types(self) -> dict:
+        """
+        Getter for volume information.
+        Retuns:
+            Dict
+        """
+        return self.volume_types
 
     def get_config_hashmap(self) -> dict:
         """
@@ -160,17 +161,17 @@ class ParamsHandler:
     #         brick_roots[server] = self.server_config[server]['brick_root']
     #     return brick_roots
 
-    # def get_excluded_tests(self) -> tuple:
-    #     """
-    #     Gets a list of exluded tests from the config file.
-    #     Returns:
-    #         tuple: With first value being the list of paths and second
-    #         value being boolean which indicates whether the exclude list
-    #         is valid or not.
-    #     """
-    #     ret = self.config_hashmap.get("excluded_tests", [])
-    #     for paths in ret:
-    #         if not os.path.isfile(paths) and not os.path.isdir(paths):
-    #             return ([], False)
+    def get_excluded_tests(self) -> tuple:
+        """
+        Gets a list of exluded tests from the config file.
+        Returns:
+            tuple: With first value being the list of paths and second
+            value being boolean which indicates whether the exclude list
+            is valid or not.
+        """
+        ret = self.config_hashmap.get("excluded_tests", [])
+        for paths in ret:
+            if not os.path.isfile(paths) and not os.path.isdir(paths):
+                return ([], False)
 
-    #     return (ret, True)
+        return (ret, True)
@@ -3,6 +3,11 @@ This module takes care of:
 1) Config file parsing (by gluster_test_parser).
 2) Tests-to-run list preparation (by test_list_builder).
 3) Invocation of the test_runner.
+
+The heavy dependencies, i.e. the ssh, spreadsheet, table and spinner
+libraries, are imported only when the run needs them, so that `--help`
+and the argument errors return instantly. Check the startup cost with
+tools/benchmarks/startup_bench.py after adding imports here.
 """
 import os
 import sys
@@ -10,16 +15,14 @@ import time
 import datetime
 import traceback
 import argparse
-import pyfiglet
-from halo import Halo
-from environ import environ, FrameworkEnv
 from parsing.params_handler import ParamsHandler
-from test_list_builder import TestListBuilder
-from test_runner import TestRunner
-from result_handler import handle_results
-from common.relog import Logger
+from test_list_builder import TestListBuilder, valid_vol_types
+from test_selector import TestSelector
+from impact_analyzer import ImpactAnalyzer
+from run_planner import DurationHistory, build_plan, format_plan
 sys.path.insert(1, ".")
 sys.path.insert(1, "./common")
+from utility.tracing import enable_tracing, export_trace
 
 
 def pars_args():
@@ -34,30 +37,159 @@ def pars_args():
                         action="store", dest="config_file",
                         default=None, type=str, required=True)
     parser.add_argument("-p", "--cluster-path",
-                        help="Cluster details path",
-                        dest="cluster_path", default=None, type=str, required=True)
+                        help="Cluster details path. Not needed with "
+                        "--plan.",
+                        dest="cluster_path", default=None, type=str)
+    parser.add_argument("-t", "--test-dir",
+                        help="The test directory where TC(s) exist",
+                        dest="test_dir", default=None, type=str,
+                        required=True)
+    parser.add_argument("-k", "--keyword",
+                        help="Run only the TCs matching the keyword "
+                        "expression, e.g. \"snap and not scheduler\". "
+                        "Keywords are matched against the module name, "
+                        "component, test type and tags of a TC.",
+                        dest="keyword_expr", default=None, type=str)
+    parser.add_argument("--voltype",
+                        help="Comma separated volume types to run the TCs "
+                        "on, e.g. rep,arb. Use Generic for the TCs not "
+                        "needing a volume.",
+                        dest="sel_vol_types", default=None, type=str)
+    parser.add_argument("--component",
+                        help="Comma separated components whose TCs are "
+                        "to be run, e.g. heal,snapshot",
+                        dest="sel_components", default=None, type=str)
+    parser.add_argument("--changed-since",
+                        help="Run only the TCs impacted by the changes "
+                        "made since the given git revision.",
+                        dest="changed_since", default=None, type=str)
+    parser.add_argument("--volume-pool",
+                        help="Prepare the volumes of the disruptive TCs in "
+                        "the background while the previous TC runs.",
+                        dest="volume_pool", action='store_true')
+    parser.add_argument("--shared-env",
+                        help="Share a single framework environment store "
+                        "between the concurrent TC runs.",
+                        dest="shared_env", action='store_true')
+    parser.add_argument("--trace",
+                        help="Record the spans of the runner stages, tests, "
+                        "test phases and remote commands into trace.json "
+                        "in the log dir, viewable in chrome://tracing or "
+                        "Perfetto.",
+                        dest="trace", action='store_true')
+    parser.add_argument("--metrics-file",
+                        help="Textfile to export the live run metrics to, "
+                        "in the Prometheus format.",
+                        dest="metrics_file", default=None, type=str)
+    parser.add_argument("--metrics-port",
+                        help="Port on localhost to serve the live run "
+                        "metrics on, in the Prometheus format.",
+                        dest="metrics_port", default=None, type=int)
+    parser.add_argument("--sample-resources",
+                        help="Sample the CPU and memory usage of the "
+                        "gluster processes on all the nodes during every "
+                        "TC, every given number of seconds, and report "
+                        "their peak and mean in the results.",
+                        dest="resource_interval", default=None, type=int)
+    parser.add_argument("--plan",
+                        help="Print the TCs to be run and the schedule of "
+                        "every worker, with the durations predicted from "
+                        "the earlier runs, and exit without connecting to "
+                        "the cluster.",
+                        dest="plan", action='store_true')
     parser.add_argument("-l", "--log-dir",
                         help="The directory wherein log will be stored.",
                         dest="log_dir", default="/var/log/redant",
                         type=str)
-    # parser.add_argument("-ll", "--log-level",
-    #                     help="The log level. Default log level is Info",
-    #                     dest="log_level", default="I", type=str)
-    # parser.add_argument("-cc", "--concurrency-count",
-    #                     help="Number of concurrent test runs. Default is 2.",
-    #                     dest="concur_count", default=2, type=int)
-    # parser.add_argument("-xls", "--excel-sheet",
-    #                     help="Spreadsheet for result. Default value is NULL",
-    #                     dest="excel_sheet", default=None, type=str)
-    # parser.add_argument("--show-backtrace",
-    #                     help="Show full backtrace on error",
-    #                     dest="show_backtrace", action='store_true')
-    # parser.add_argument("-kold", "--keep-old-logs",
-    #                     help="Don't clear the old glusterfs logs directory "
-    #                     "during environment setup. Default behavior is to "
-    #                     "clear the logs directory on each run.",
-    #                     dest="keep_logs", action='store_true')
-    return parser.parse_args()
+    parser.add_argument("-ll", "--log-level",
+                        help="The log level. Default log level is Info",
+                        dest="log_level", default="I", type=str)
+    parser.add_argument("--async-logging",
+                        help="Write the logs from a background thread, so "
+                        "that the command execution never waits on the "
+                        "disk.",
+                        dest="async_logging", action='store_true')
+    parser.add_argument("--structured-logs",
+                        help="Write the logs as JSON lines, with the timing "
+                        "of every command run. Query them with "
+                        "tools/log_query.py",
+                        dest="structured_logs", action='store_true')
+    parser.add_argument("--log-size-cap",
+                        help="Cap on the size of every log file in MB. "
+                        "Beyond it only the errors are logged.",
+                        dest="log_size_cap", default=None, type=float)
+    parser.add_argument("--compress-logs",
+                        help="Gzip the log files once they are complete.",
+                        dest="compress_logs", action='store_true')
+    parser.add_argument("--index-logs",
+                        help="Write an offset index alongside every log, "
+                        "for tools/log_view.py to print the slice of a "
+                        "test.",
+                        dest="index_logs", action='store_true')
+    parser.add_argument("--keep-runs",
+                        help="Number of run log directories to retain "
+                        "under the log dir, including the current one.",
+                        dest="keep_runs", default=None, type=int)
+    parser.add_argument("--max-log-age",
+                        help="Remove the run log directories older than "
+                        "the given number of days.",
+                        dest="max_log_age", default=None, type=float)
+    parser.add_argument("-cc", "--concurrency-count",
+                        help="Number of concurrent test runs. Default is 2.",
+                        dest="concur_count", default=2, type=int)
+    parser.add_argument("-xls", "--excel-sheet",
+                        help="Spreadsheet for result. Default value is NULL",
+                        dest="excel_sheet", default=None, type=str)
+    parser.add_argument("--show-backtrace",
+                        help="Show full backtrace on error",
+                        dest="show_backtrace", action='store_true')
+    parser.add_argument("-kold", "--keep-old-logs",
+                        help="Don't clear the old glusterfs logs directory "
+                        "during environment setup. Default behavior is to "
+                        "clear the logs directory on each run.",
+                        dest="keep_logs", action='store_true')
+    args = parser.parse_args()
+    # The plan of a run doesn't touch the cluster.
+    if args.cluster_path is None and not args.plan:
+        parser.error("the following arguments are required: "
+                     "-p/--cluster-path")
+    unknown_vol_types = [vol_type for vol_type
+                         in _split_csv_arg(args.sel_vol_types) or []
+                         if vol_type not in valid_vol_types]
+    if unknown_vol_types:
+        parser.error(f"unknown volume types {', '.join(unknown_vol_types)} "
+                     f"in --voltype, valid ones are "
+                     f"{', '.join(valid_vol_types)}")
+    return args
+
+
+class _QuietSpinner:
+    """
+    Stands in for the spinner when only the plan of the run is printed,
+    so that the plan needs neither the spinner library nor the terminal
+    animations.
+    """
+
+    def start(self, text: str = None):
+        pass
+
+    def succeed(self, text: str = None):
+        pass
+
+    def fail(self, text: str = None):
+        if text:
+            print(text, file=sys.stderr)
+
+
+def _split_csv_arg(arg_val: str) -> list:
+    """
+    Function to split a comma separated command line value.
+    Returns:
+        list of values or None if the option wasn't given.
+    """
+    if arg_val is None:
+        return None
+    return [val.strip() for val in arg_val.split(",") if val.strip() != ""]
 
 
 def main():
@@ -66,7 +198,8 @@ def main():
     1. Parsing the command line arguments.
     2. Parsing the config file to get the configuration details.
     3. Invoking the test_list_builder to build the TC run order.
-    4. Passing the details to the test_runner.
+    4. Passing the details to the test_runner, unless only the plan of
+       the run is asked for.
     """
 
     start = time.time()
@@ -82,7 +215,13 @@ def main():
             print(msg.format(exc=exc), file=sys.stderr)
             sys.exit(1)
 
-    spinner = Halo(spinner='dots')
+    if args.plan:
+        spinner = _QuietSpinner()
+    else:
+        import pyfiglet
+        from halo import Halo
+        print(pyfiglet.figlet_format("REDANT", font="slant"))
+        spinner = Halo(spinner='dots')
     spinner.start("Starting param handling")
     try:
         param_obj = ParamsHandler(args.config_file)
@@ -91,35 +230,66 @@ def main():
         errer(e, "Error on loading config file: {exc}")
     spinner.succeed("Param Handling Success.")
 
-    cluster_path = args.cluster_path
-    if not cluster_path:
-        print("Cluster path not provided")
+    spinner.start("Building test list")
+    # Building the test list and obtaining the TC details.
+    excluded_result = param_obj.get_excluded_tests()
+    if not excluded_result[1]:
+        spinner.fail("Error in exclude list. Invalid path present")
         sys.exit(1)
-    cluster_path = os.path.expanduser(cluster_path)
+
+    excluded_tests = excluded_result[0]
+    spec_test = (args.test_dir.endswith(".py")
+                 and args.test_dir.split("/")[-1].startswith("test"))
+    impact_analyzer = None
+    try:
+        if args.changed_since is not None:
+            impact_analyzer = ImpactAnalyzer(args.changed_since)
+        selector = TestSelector(args.keyword_expr,
+                                _split_csv_arg(args.sel_vol_types),
+                                _split_csv_arg(args.sel_components),
+                                impact_analyzer)
+    except Exception as e:
+        spinner.fail("Invalid test selection")
+        errer(e, "Error in test selection: {exc}")
+    try:
+        TestListBuilder.create_test_dict(args.test_dir, excluded_tests,
+                                         param_obj.get_volume_types(),
+                                         spec_test, selector=selector)
+    except FileNotFoundError as e:
+        spinner.fail("FileNotFoundError in test list builder")
+        errer(e, "Error: Can't find the file")
+    if impact_analyzer is not None:
+        impact_analyzer.save()
+    spinner.succeed("Test List built")
+
+    duration_history = DurationHistory()
+    if args.plan:
+        plan = build_plan(TestListBuilder, args.concur_count, spec_test,
+                          duration_history)
+        print(format_plan(plan))
+        return
+
+    from common.relog import Logger
+    Logger.set_async_logging(args.async_logging)
+    Logger.set_structured_logging(args.structured_logs)
+    Logger.set_log_compression(args.compress_logs)
+    Logger.set_log_indexing(args.index_logs)
+    if args.log_size_cap is not None:
+        Logger.set_log_size_cap(int(args.log_size_cap * 1024 * 1024))
+
+    cluster_path = os.path.expanduser(args.cluster_path)
     if not os.path.exists(cluster_path):
         os.makedirs(cluster_path)
 
-    spinner.start("Building test list")
-    # # Building the test list and obtaining the TC details.
-    # excluded_result = param_obj.get_excluded_tests()
-    # if not excluded_result[1]:
-    #     spinner.fail("Error in exclude list. Invalid path present")
-    #     sys.exit(1)
-
-    # excluded_tests = excluded_result[0]
-    # spec_test = (args.test_dir.endswith(".py")
-    #              and args.test_dir.split("/")[-1].startswith("test"))
-    # try:
-    #     TestListBuilder.create_test_dict(args.test_dir, excluded_tests,
-    #                                      param_obj.volume_types, spec_test)
-    # except FileNotFoundError as e:
-    #     spinner.fail("FileNotFoundError in test list builder")
-    #     errer(e, "Error: Can't find the file")
-    # spinner.succeed("Test List built")
-
     spinner.start("Creating log dirs")
     # Creating log dirs.
     current_time_rep = str(datetime.datetime.now())
+    if args.keep_runs is not None or args.max_log_age is not None:
+        # The new run dir isn't created yet, make room for it.
+        keep_runs = args.keep_runs
+        if keep_runs is not None:
+            keep_runs = max(keep_runs - 1, 0)
+        Logger.prune_log_dirs(args.log_dir, keep_runs, args.max_log_age)
     log_dir_current = f"{args.log_dir}/{current_time_rep}"
     Logger.log_dir_creation(
         log_dir_current, TestListBuilder.get_test_path_list())
@@ -128,11 +298,24 @@ def main():
     os.symlink(current_time_rep, tmplink)
     os.rename(tmplink, f"{args.log_dir}/{latest}")
     spinner.succeed("Log dir creation successful.")
+    if args.trace:
+        enable_tracing(f"{log_dir_current}/trace_parts")
+
+    from environ import environ, FrameworkEnv
+    from shared_env import start_shared_env
+    from test_runner import TestRunner
+    from result_handler import handle_results
 
     # Framework Environment datastructure.
-    env_obj = FrameworkEnv()
+    env_manager = None
+    if args.shared_env:
+        (env_manager, env_obj) = start_shared_env()
+    else:
+        env_obj = FrameworkEnv()
     env_obj.set_kubeconfig(os.path.join(cluster_path, param_obj.run_config["kubeconfig_location"]))
     env_obj.init_ds()
+    # The env state is kept alongside the logs for post-mortem debugging.
+    env_obj.enable_persistence(f"{log_dir_current}/env_state.json")
 
     # Environment setup.
     env_set = environ(param_obj, env_obj, errer, f"{log_dir_current}/main.log",
@@ -144,7 +327,9 @@ def main():
     # invoke the test_runner.
     logger_obj.debug("Running the test cases.")
     TestRunner.init(TestListBuilder, param_obj, env_set, log_dir_current,
-                    args.log_level, args.concur_count, spec_test)
+                    args.log_level, args.concur_count, spec_test,
+                    args.volume_pool, args.metrics_file, args.metrics_port,
+                    args.resource_interval)
     result_queue = TestRunner.run_tests(env_obj)
     logger_obj.debug("Collected test results queue.")
 
@@ -153,17 +338,22 @@ def main():
 
     # Setup the result
     if args.excel_sheet is None:
-        handle_results(result_queue, total_time, logger_obj)
+        handle_results(result_queue, total_time, logger_obj,
+                       durationHistory=duration_history)
     else:
         handle_results(result_queue, total_time, logger_obj,
-                       args.excel_sheet)
+                       args.excel_sheet, durationHistory=duration_history)
 
+    env_obj.save_state()
     logger_obj.debug("Starting env teardown.")
     env_set.teardown_env()
+    if args.trace:
+        export_trace(f"{log_dir_current}/trace.json")
+    if env_manager is not None:
+        env_manager.shutdown()
 
 
 if __name__ == '__main__':
-    print(pyfiglet.figlet_format("REDANT", font="slant"))
     failure = False
     try:
         main()
@@ -182,3 +372,4 @@ if __name__ == '__main__':
             print(f"Traceback put into /var/log/redant/redant-{time_now}")
         except Exception as err:
             print(f"Couldn't write main exception {error_string} due to {err}")
+        sys.exit(1)
@@ -0,0 +1,166 @@
+"""
+This component samples the CPU and memory usage of the gluster processes,
+i.e. glusterd, glusterfsd and glusterfs, on the nodes while a test runs,
+so that the memory leaks and CPU regressions in gluster show up in the
+test results.
+
+A lightweight sampler loop is started in the background on every node
+before the test, reading the cumulative CPU time and the RSS of the
+processes from /proc every interval. The samples are fetched once the
+test is done and reduced to the peak, mean and growth figures per node
+and process.
+
+The figures are node-wide, i.e. they take in the processes of the tests
+running concurrently on the same nodes too. The commands of the sampler
+itself are left out of the command profile of the test.
+"""
+import contextlib
+import traceback
+
+PROCESSES = ("glusterd", "glusterfsd", "glusterfs")
+
+
+class ResourceSampler:
+    """
+    The sampler output consists of a header line with the clock ticks and
+    the page size, followed by the samples, each being a timestamp line
+    and a line per process with its pid, name, user and system CPU ticks
+    and RSS pages.
+    """
+
+    def __init__(self, redant, nodes: list, tag: str, interval: int = 5):
+        """
+        Args:
+            redant (object): The redant mixin object of the test.
+            nodes (list): Nodes to sample.
+            tag (str): Unique name of the test run, for the sample files.
+            interval (int): Seconds between the samples.
+        """
+        self.redant = redant
+        self.nodes = list(dict.fromkeys(nodes))
+        self.interval = interval
+        self.sample_path = f"/var/tmp/redant-resources-{tag}.log"
+        self.pids = {}
+
+    def _unprofiled(self):
+        """
+        Method to obtain the context in which the sampler commands are run
+        without being profiled as those of the test.
+        """
+        unprofiled = getattr(self.redant, "unprofiled", None)
+        if unprofiled is None:
+            return contextlib.nullcontext()
+        return unprofiled()
+
+    def _get_sampler_cmd(self) -> str:
+        """
+        Method to obtain the shell command starting the sampler loop in
+        the background and printing its pid.
+        """
+        procs = "|".join(PROCESSES)
+        loop = ("echo H $(getconf CLK_TCK) $(getconf PAGESIZE); "
+                "while true; do echo T $(date +%s.%N); "
+                f"for pid in $(pgrep -x \"{procs}\"); do "
+                "echo P $pid $(cut -d\" \" -f2,14,15,24 /proc/$pid/stat "
+                "2>/dev/null); done; "
+                f"sleep {self.interval}; done")
+        return (f"nohup sh -c '{loop}' > {self.sample_path} 2>&1 "
+                "< /dev/null & echo $!")
+
+    def start(self):
+        """
+        Starts the sampler on all the nodes. A node on which it can't be
+        started is left out of the figures.
+        """
+        cmd = self._get_sampler_cmd()
+        for node in self.nodes:
+            try:
+                with self._unprofiled():
+                    ret = self.redant.execute_abstract_op_node(cmd, node,
+                                                               False)
+                if ret['error_code'] == 0 and ret['msg']:
+                    self.pids[node] = ret['msg'][-1].strip()
+            except Exception as error:
+                self.redant.logger.error(f"Resource sampler start on {node}"
+                                         f" failed : {error}")
+
+    def stop(self) -> dict:
+        """
+        Stops the samplers and collects their samples.
+        Returns:
+            dict of node to the usage figures per process, as returned by
+            summarize.
+        """
+        usage = {}
+        for (node, pid) in self.pids.items():
+            try:
+                with self._unprofiled():
+                    ret = self.redant.execute_abstract_op_node(
+                        f"kill {pid}; cat {self.sample_path}; "
+                        f"rm -f {self.sample_path}", node, False)
+                usage[node] = self.summarize(ret['msg'])
+            except Exception as error:
+                tb = traceback.format_exc()
+                self.redant.logger.error(f"Resource sample collection on "
+                                         f"{node} failed : {error}")
+                self.redant.logger.error(tb)
+        self.pids = {}
+        return usage
+
+    @staticmethod
+    def summarize(lines: list) -> dict:
+        """
+        Reduces the samples of a node to the usage figures per process
+        name. The RSS of the processes with the same name, e.g. the brick
+        processes, is added up per sample and so is their CPU usage, which
+        is computed from the CPU time consumed between two samples.
+        Args:
+            lines (list): The sampler output.
+        Returns:
+            dict of process name to the samples count, the peak, mean and
+            growth of RSS in MB and the peak and mean CPU usage in percent.
+        """
+        (clk_tck, page_size) = (100, 4096)
+        samples = []
+        for line in lines:
+            fields = line.split()
+            if not fields:
+                continue
+            if fields[0] == "H" and len(fields) == 3:
+                (clk_tck, page_size) = (int(fields[1]), int(fields[2]))
+            elif fields[0] == "T" and len(fields) == 2:
+                samples.append((float(fields[1]), {}))
+            elif fields[0] == "P" and len(fields) == 6 and samples:
+                (_, pid, name, utime, stime, rss) = fields
+                samples[-1][1][pid] = (name.strip("()"),
+                                       int(utime) + int(stime), int(rss))
+
+        usage = {}
+        prev = None
+        for (ts, procs) in samples:
+            rss = {}
+            cpu = {}
+            for (pid, (name, ticks, pages)) in procs.items():
+                rss[name] = rss.get(name, 0) + pages * page_size
+                if prev is not None and pid in prev[1] and ts > prev[0]:
+                    cpu[name] = (cpu.get(name, 0)
+                                 + (ticks - prev[1][pid][1]) * 100
+                                 / clk_tck / (ts - prev[0]))
+            for (name, rss_bytes) in rss.items():
+                stats = usage.setdefault(name, {"rss": [], "cpu": []})
+                stats["rss"].append(rss_bytes / (1024 * 1024))
+                if name in cpu:
+                    stats["cpu"].append(cpu[name])
+            prev = (ts, procs)
+
+        summary = {}
+        for (name, stats) in usage.items():
+            rss = stats["rss"]
+            cpu = stats["cpu"] or [0]
+            summary[name] = {"samples": len(rss),
+                             "rss_peak_mb": round(max(rss), 2),
+                             "rss_mean_mb": round(sum(rss) / len(rss), 2),
+                             "rss_growth_mb": round(rss[-1] - rss[0], 2),
+                             "cpu_peak_pct": round(max(cpu), 2),
+                             "cpu_mean_pct": round(sum(cpu) / len(cpu), 2)}
+        return summary
@@ -5,11 +5,13 @@ results in two ways:
 1. display on the CLI
 2. store in a spreadsheet
 """
-import copy
+import sys
 import traceback
 import xlwt
 from xlwt import Workbook
 from prettytable import PrettyTable
+sys.path.insert(1, ".")
+from utility.cmd_profile import CmdProfiler
 
 
 def _sanitize_time_format(data: int) -> str:
@@ -83,7 +85,118 @@ def _time_rollover_conversion(time_in_sec: float,
     return f"{hours} hours {minutes} minutes {seconds} seconds"
 
 
-def _transform_queue_to_dict(resultQueue) -> dict:
+class TestRecord:
+    """
+    Compact record of a single test run on a given volume type. Slotted
+    so that large suites don't pay for a per-result dictionary.
+    """
+    __slots__ = ('result', 'time_taken', 'skip_reason')
+
+    def __init__(self, result: str, time_taken: float, skip_reason: str):
+        self.result = result
+        self.time_taken = time_taken
+        self.skip_reason = skip_reason
+
+
+class ResultAggregator:
+    """
+    Builds the result classification and the component-wise counters
+    incrementally as the records arrive, so that aggregation is a single
+    pass over the results without copying or re-walking nested dicts.
+    The command latency profiles of the tests are merged into the run's
+    and their resource usage figures are kept aside for the report.
+    """
+    counter_keys = ['dCount', 'ndCount', 'dSkipCount', 'ndSkipCount',
+                    'dRuns', 'ndRuns', 'dPass', 'ndPass']
+
+    def __init__(self):
+        self.resultDict = {}
+        self.counters = {}
+        self.cmdProfiler = CmdProfiler()
+        self.resourceUsage = {}
+        self.resourceScope = {}
+
+    def _account(self, counter: dict, prefix: str, result: str,
+                 delta: int):
+        """
+        Adds the contribution of a single result to the counters.
+
+        Args:
+            counter (dict): Counters of the component.
+            prefix (str): 'd' for disruptive and 'nd' for non disruptive.
+            result (str): PASS, FAIL or SKIP.
+            delta (int): 1 to add the result, -1 to take it back.
+        """
+        if result == "SKIP":
+            counter[f"{prefix}SkipCount"] += delta
+            return
+        counter[f"{prefix}Runs"] += delta
+        if result == "PASS":
+            counter[f"{prefix}Pass"] += delta
+
+    def add(self, testDict: dict):
+        """
+        Adds a result as put in the queue by the test runner.
+
+        Args:
+            testDict (dict): Dictionary with test name as key and the
+                             test stats as the value.
+        """
+        for tName, tStats in testDict.items():
+            component = tStats['component']
+            tcNature = tStats['tcNature']
+            if tStats.get('cmdProfile'):
+                self.cmdProfiler.merge(tStats['cmdProfile'])
+            if tStats.get('resourceUsage'):
+                self.resourceUsage[f"{tName}-{tStats['volType']}"] = \
+                    tStats['resourceUsage']
+                self.resourceScope[f"{tName}-{tStats['volType']}"] = \
+                    tStats.get('resourceScope', "test")
+            if tcNature == 's':
+                component = "Special"
+                tcNature = "nonDisruptive"
+
+            natureDict = self.resultDict.setdefault(component, {})
+            testsDict = natureDict.setdefault(tcNature, {})
+            counter = self.counters.get(component)
+            if counter is None:
+                counter = dict.fromkeys(self.counter_keys, 0)
+                self.counters[component] = counter
+
+            # Only the two natures are accounted in the stats.
+            prefix = {'disruptive': 'd',
+                      'nonDisruptive': 'nd'}.get(tcNature)
+            volDict = testsDict.get(tName)
+            if volDict is None:
+                volDict = {}
+                testsDict[tName] = volDict
+                if prefix is not None:
+                    counter[f"{prefix}Count"] += 1
+
+            record = TestRecord(tStats['testResult'], tStats['timeTaken'],
+                                tStats['skipReason'])
+            prevRecord = volDict.get(tStats['volType'])
+            volDict[tStats['volType']] = record
+            if prefix is None:
+                continue
+            # A rerun of the same test and volume type replaces the
+            # older result.
+            if prevRecord is not None:
+                self._account(counter, prefix, prevRecord.result, -1)
+            self._account(counter, prefix, record.result, 1)
+
+    def consume(self, resultQueue):
+        """
+        Drains the result queue into the aggregator.
+
+        Args:
+            resultQueue: It is a queue containing the test run results.
+        """
+        while not resultQueue.empty():
+            self.add(resultQueue.get())
+
+
+def _transform_queue_to_dict(resultQueue) -> ResultAggregator:
     """
     Function to transform the queue to a dictionary.
 
@@ -91,125 +204,62 @@ def _transform_queue_to_dict(resultQueue) -> dict:
         resultQueue: It is a queue containing the test run results.
 
     Returns:
-        A dictionary with classification of tests based on,
+        A ResultAggregator whose resultDict has the classification of
+        tests based on,
         1. Component,
         2. Test Nature,
         3. Test Name
     """
-    testResults = {}
-    while not resultQueue.empty():
-        testDict = resultQueue.get()
-        tName = list(testDict.keys())[0]
-        component = testDict[tName]['component']
-        tcNature = testDict[tName]['tcNature']
-        tVolT = testDict[tName]['volType']
-        if tcNature == 's':
-            component = "Special"
-            tcNature = "nonDisruptive"
-        if component not in testResults.keys():
-            testResults[component] = {}
-        if tcNature not in testResults[component].keys():
-            testResults[component][tcNature] = {}
-        if tName not in testResults[component][tcNature].keys():
-            testResults[component][tcNature][tName] = {}
-        tempDict = {}
-        tempDict['testResult'] = testDict[tName]['testResult']
-        tempDict['timeTaken'] = testDict[tName]['timeTaken']
-        tempDict['skipReason'] = testDict[tName]['skipReason']
-        testResults[component][tcNature][tName][tVolT] = copy.deepcopy(
-            tempDict)
-    return testResults
+    aggregator = ResultAggregator()
+    aggregator.consume(resultQueue)
+    return aggregator
 
 
-def _obtain_stat(resultDict: dict) -> dict:
+def _obtain_stat(counters: dict) -> dict:
     """
     Function to obtain the statistics
     about the test runs.
 
     Args:
-        stattDict (dict): Dictionary containing the stat.
+        counters (dict): Component-wise counters of the aggregator.
     """
     statDict = {}
-
-    # Create component keys inside the statDict
-    for component in resultDict.keys():
-        statDict[component] = {}
-
-    # Get component-wise data.
-    for component in resultDict:
-        dCount = 0
-        ndCount = 0
-        dSkipCount = 0
-        ndSkipCount = 0
-        dPass = 0
-        ndPass = 0
-        ndRuns = 0
-        dRuns = 0
-
-        crDict = resultDict[component]
-        # First step is to get the disruptive tests provided
-        # they exist in this component, followed by non-disruptive.
-        # Once that is done, we can simply aggregate them for
-        # total count.
-        if "disruptive" in crDict.keys():
-            disCrDict = crDict['disruptive']
-            dCount += len(list(disCrDict.keys()))
-            for test in disCrDict:
-                for volT in disCrDict[test]:
-                    if disCrDict[test][volT]['testResult'] != "SKIP":
-                        dRuns += 1
-                    if disCrDict[test][volT]['testResult'] == "PASS":
-                        dPass += 1
-                    elif disCrDict[test][volT]['testResult'] == "SKIP":
-                        dSkipCount += 1
-        if "nonDisruptive" in crDict.keys():
-            ndisCrDict = crDict['nonDisruptive']
-            ndCount += len(list(ndisCrDict.keys()))
-            for test in ndisCrDict:
-                for volT in ndisCrDict[test]:
-                    if ndisCrDict[test][volT]['testResult'] != "SKIP":
-                        ndRuns += 1
-                    if ndisCrDict[test][volT]['testResult'] == "PASS":
-                        ndPass += 1
-                    elif ndisCrDict[test][volT]['testResult'] == "SKIP":
-                        ndSkipCount += 1
-
+    for component, cnt in counters.items():
         tempDict = {}
-        tempDict['dCount'] = dCount
-        tempDict['ndCount'] = ndCount
-        tempDict['totalCount'] = dCount + ndCount
-        tempDict['dSkipCount'] = dSkipCount
-        tempDict['ndSkipCount'] = ndSkipCount
-        tempDict['dRuns'] = dRuns
-        tempDict['ndRuns'] = ndRuns
-        tempDict['totalRuns'] = dRuns + ndRuns
-        tempDict['passCount'] = dPass + ndPass
+        tempDict['dCount'] = cnt['dCount']
+        tempDict['ndCount'] = cnt['ndCount']
+        tempDict['totalCount'] = cnt['dCount'] + cnt['ndCount']
+        tempDict['dSkipCount'] = cnt['dSkipCount']
+        tempDict['ndSkipCount'] = cnt['ndSkipCount']
+        tempDict['dRuns'] = cnt['dRuns']
+        tempDict['ndRuns'] = cnt['ndRuns']
+        tempDict['totalRuns'] = cnt['dRuns'] + cnt['ndRuns']
+        tempDict['passCount'] = cnt['dPass'] + cnt['ndPass']
         tempDict['failCount'] = tempDict['totalRuns'] - tempDict['passCount']
-        tempDict['skipCount'] = dSkipCount + ndSkipCount
+        tempDict['skipCount'] = cnt['dSkipCount'] + cnt['ndSkipCount']
         if tempDict['totalRuns'] == 0:
             tempDict['runCount'] = 0
         else:
             tempDict['runCount'] = tempDict['totalRuns'] -\
                 tempDict['skipCount']
-        tempDict['dPass'] = dPass
-        tempDict['ndPass'] = ndPass
-        tempDict['Pass'] = dPass + ndPass
-        statDict[component] = copy.deepcopy(tempDict)
+        tempDict['dPass'] = cnt['dPass']
+        tempDict['ndPass'] = cnt['ndPass']
+        tempDict['Pass'] = cnt['dPass'] + cnt['ndPass']
+        statDict[component] = tempDict
 
     # Aggregating the component results in Total component.
     tempDict = {}
-    for component in statDict:
-        for key, val in statDict[component].items():
-            if key not in tempDict.keys():
-                tempDict[key] = 0
-            tempDict[key] += val
-    statDict['Total'] = copy.deepcopy(tempDict)
+    for compStat in statDict.values():
+        for key, val in compStat.items():
+            tempDict[key] = tempDict.get(key, 0) + val
+    statDict['Total'] = tempDict
     return statDict
 
 
 def _transform_to_percent(statDict: dict) -> dict:
     """
-    Function to convert the counts to percentage
+    Function to convert the counts to percentage. The conversion is done
+    in place as the statDict is owned by the result handling.
 
     Args:
         statDict (dict): Dictionary containing the stats.
@@ -218,21 +268,14 @@ def _transform_to_percent(statDict: dict) -> dict:
         dictionary now transformed to percentage.
     """
     # Go component-wise and transform the counts to percentage.
-    tStatDict = copy.deepcopy(statDict)
-    for component in statDict:
-        if statDict[component]['ndRuns'] != 0:
-            tStatDict[component]['ndPass'] =\
-                (statDict[component]['ndPass']*100) /\
-                (statDict[component]['ndRuns'])
-        if statDict[component]['dRuns'] != 0:
-            tStatDict[component]['dPass'] =\
-                (statDict[component]['dPass']*100) /\
-                (statDict[component]['dRuns'])
-        if statDict[component]['totalRuns'] != 0:
-            tStatDict[component]['Pass'] =\
-                (statDict[component]['Pass']*100) /\
-                (statDict[component]['totalRuns'])
-    return tStatDict
+    for compStat in statDict.values():
+        if compStat['ndRuns'] != 0:
+            compStat['ndPass'] = (compStat['ndPass']*100) / compStat['ndRuns']
+        if compStat['dRuns'] != 0:
+            compStat['dPass'] = (compStat['dPass']*100) / compStat['dRuns']
+        if compStat['totalRuns'] != 0:
+            compStat['Pass'] = (compStat['Pass']*100) / compStat['totalRuns']
+    return statDict
 
 
 def _adjust_column_width_in_excel_sheet(sheet: dict, data_list: list,
@@ -348,13 +391,13 @@ def _data_to_xls(statDict: dict, resultDict: dict, filePath: str,
                     tR.write(row, 0, test, style_center)
                     tR.write(row, 1, nature, style_center)
                     tR.write(row, 2, volType, style_center)
-                    tR.write(row, 3, volData['testResult'], style_center)
-                    timeVal = _time_rollover_conversion(volData['timeTaken'])
+                    tR.write(row, 3, volData.result, style_center)
+                    timeVal = _time_rollover_conversion(volData.time_taken)
                     tR.write(row, 4, timeVal, style_center)
-                    tR.write(row, 5, volData['skipReason'], style_center)
+                    tR.write(row, 5, volData.skip_reason, style_center)
                     (_adjust_column_width_in_excel_sheet(tR, [test, nature,
-                     volType, volData['testResult'], timeVal,
-                     volData['skipReason']], max_col_width_list))
+                     volType, volData.result, timeVal,
+                     volData.skip_reason], max_col_width_list))
                     row += 1
     # Push the changes to the file.
     try:
@@ -403,9 +446,9 @@ def _data_to_pretty_tables(statDict: dict, resultDict: dict,
                                       'Time Taken (hh:mm:ss)', 'Skip Reason'])
                 for volType in testDict[test]:
                     volData = testDict[test][volType]
-                    time_val = _time_rollover_conversion(volData['timeTaken'])
-                    tTable.add_row([volType, volData['testResult'], time_val,
-                                    volData['skipReason']])
+                    time_val = _time_rollover_conversion(volData.time_taken)
+                    tTable.add_row([volType, volData.result, time_val,
+                                    volData.skip_reason])
                 print(tTable)
 
     # Print the summary.
@@ -419,8 +462,79 @@ def _data_to_pretty_tables(statDict: dict, resultDict: dict,
     print(f"Total Time Taken : {totalTime}")
 
 
+def _cmd_profile_to_pretty_table(cmdProfiler: CmdProfiler,
+                                 count: int) -> PrettyTable:
+    """
+    Function to provide the costliest command families of the run as a
+    pretty table.
+
+    Args:
+        cmdProfiler (CmdProfiler): The command profile of the run.
+        count (int): Number of command families to report.
+    """
+    pTable = PrettyTable(['Command', 'Runs', 'Total (s)', 'p50 (ms)',
+                          'p99 (ms)', 'Max (ms)', 'Connect/Exec/Read (s)'])
+    for entry in cmdProfiler.get_top_families(count):
+        phaseSec = entry['phase_sec']
+        phases = "/".join(f"{phaseSec.get(phase, 0):.1f}"
+                          for phase in ('connect', 'exec', 'read'))
+        pTable.add_row([entry['family'], entry['runs'],
+                        f"{entry['total_sec']:.1f}", f"{entry['p50_ms']:.1f}",
+                        f"{entry['p99_ms']:.1f}", f"{entry['max_ms']:.1f}",
+                        phases])
+    return pTable
+
+
+def _resource_usage_to_pretty_table(resourceUsage: dict,
+                                    resourceScope: dict) -> PrettyTable:
+    """
+    Function to provide the resource usage of the gluster processes
+    during every test as a pretty table.
+
+    Args:
+        resourceUsage (dict): The usage figures per test, node and
+                              process.
+        resourceScope (dict): Per test, "test" if the figures are of the
+                              test alone or "node-wide" if other tests
+                              ran on the nodes concurrently.
+    """
+    rTable = PrettyTable(['Test', 'Scope', 'Node', 'Process',
+                          'Peak RSS (MB)', 'Mean RSS (MB)',
+                          'RSS Growth (MB)', 'Peak CPU %', 'Mean CPU %'])
+    for test in sorted(resourceUsage):
+        for (node, procs) in sorted(resourceUsage[test].items()):
+            for (proc, usage) in sorted(procs.items()):
+                rTable.add_row([test, resourceScope.get(test, "test"),
+                                node, proc, usage['rss_peak_mb'],
+                                usage['rss_mean_mb'],
+                                usage['rss_growth_mb'],
+                                usage['cpu_peak_pct'],
+                                usage['cpu_mean_pct']])
+    return rTable
+
+
+def _record_durations(resultDict: dict, durationHistory):
+    """
+    Function to add the time taken by the run TCs to the duration
+    history. The skipped TCs aren't accounted.
+
+    Args:
+        resultDict (dict): The classification of the tests.
+        durationHistory (DurationHistory)
+    """
+    for natureDict in resultDict.values():
+        for testsDict in natureDict.values():
+            for (tName, volDict) in testsDict.items():
+                for (volType, record) in volDict.items():
+                    if record.result != "SKIP" and record.time_taken > 0:
+                        durationHistory.record(tName, volType,
+                                               record.time_taken)
+    durationHistory.save()
+
+
 def handle_results(resultQueue, totalTime: float, logger,
-                   filePath: str = None):
+                   filePath: str = None, profileCount: int = 10,
+                   durationHistory=None):
     """
     Function to handle the results for redant.
 
@@ -432,13 +546,18 @@ def handle_results(resultQueue, totalTime: float, logger,
     Optional:
         filePath (str): The path wherein the result is to be stored
         if the output format is for xls.
+        profileCount (int): Number of the costliest command families to
+        report.
+        durationHistory (DurationHistory): History to add the time taken
+        by the TCs to, for planning the later runs.
     """
     logger.debug("Initializing result handling.")
     # Transform queue data to dictionary.
-    resultDict = _transform_queue_to_dict(resultQueue)
+    aggregator = _transform_queue_to_dict(resultQueue)
+    resultDict = aggregator.resultDict
 
     # Obtain the statistics for further use.
-    statDict = _obtain_stat(resultDict)
+    statDict = _obtain_stat(aggregator.counters)
 
     # Check for exclude test run.
     if statDict == {'Total': {}}:
@@ -446,6 +565,9 @@ def handle_results(resultQueue, totalTime: float, logger,
               "exclude list.")
         return
 
+    if durationHistory is not None:
+        _record_durations(resultDict, durationHistory)
+
     # Convert the pass values to percentage.
     statDict = _transform_to_percent(statDict)
 
@@ -456,3 +578,17 @@ def handle_results(resultQueue, totalTime: float, logger,
     else:
         logger.info("Results to be put to stdout")
         _data_to_pretty_tables(statDict, resultDict, totalTime)
+
+    if aggregator.cmdProfiler.profile:
+        pTable = _cmd_profile_to_pretty_table(aggregator.cmdProfiler,
+                                              profileCount)
+        logger.info(f"Costliest commands of the run :\n{pTable}")
+        if filePath is None:
+            print(f"Costliest commands of the run :\n{pTable}")
+
+    if aggregator.resourceUsage:
+        rTable = _resource_usage_to_pretty_table(aggregator.resourceUsage,
+                                                 aggregator.resourceScope)
+        logger.info(f"Resource usage of the gluster processes :\n{rTable}")
+        if filePath is None:
+            print(f"Resource usage of the gluster processes :\n{rTable}")
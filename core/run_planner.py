@@ -0,0 +1,238 @@
+"""
+This component plans a run without touching the cluster. The schedule
+the test runner would follow is worked out from the built test list,
+i.e. which worker picks up which volume type and Generic TCs in the non
+disruptive stage and the order of the disruptive stage, along with the
+durations predicted from the earlier runs.
+
+The durations of the TCs are kept in an on-disk history, updated at the
+end of every run.
+"""
+import os
+import json
+import heapq
+import statistics
+
+
+DEFAULT_HISTORY_PATH = "~/.cache/redant/test_durations.json"
+
+
+class DurationHistory:
+    """
+    The duration history stores, per TC and volume type, an exponentially
+    weighted moving average of the time taken by its runs, so that the
+    predictions follow the recent runs.
+    """
+    HISTORY_VERSION = 1
+    # Weight of the latest run in the average.
+    ALPHA = 0.3
+
+    def __init__(self, history_path: str = DEFAULT_HISTORY_PATH):
+        """
+        Loads the history from the disk if present.
+        Args:
+            history_path (str): Path of the history file.
+        """
+        self.history_path = os.path.expanduser(history_path)
+        self.entries = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        """
+        Loads the entries from the history file. A missing, corrupted or
+        outdated history is simply treated as an empty one.
+        """
+        try:
+            with open(self.history_path, 'r') as history_fd:
+                history_data = json.load(history_fd)
+        except (OSError, ValueError):
+            return
+        if (not isinstance(history_data, dict)
+           or history_data.get("version") != self.HISTORY_VERSION):
+            return
+        self.entries = history_data.get("entries", {})
+
+    def record(self, tname: str, vol_type: str, seconds: float):
+        """
+        Records the time taken by a run of a TC.
+        Args:
+            tname (str): Name of the TC module, without the extension.
+            vol_type (str)
+            seconds (float)
+        """
+        key = f"{tname}-{vol_type}"
+        entry = self.entries.get(key)
+        if entry is None:
+            self.entries[key] = {"mean_sec": round(seconds, 2), "runs": 1}
+        else:
+            entry["mean_sec"] = round(self.ALPHA * seconds
+                                      + (1 - self.ALPHA) * entry["mean_sec"],
+                                      2)
+            entry["runs"] += 1
+        self.dirty = True
+
+    def predict(self, tname: str, vol_type: str) -> float:
+        """
+        Method to predict the time a run of a TC takes. A TC which hasn't
+        run on the volume type yet is predicted from its runs on the other
+        volume types.
+        Args:
+            tname (str): Name of the TC module, without the extension.
+            vol_type (str)
+        Returns:
+            float seconds or None if the TC hasn't run before.
+        """
+        entry = self.entries.get(f"{tname}-{vol_type}")
+        if entry is not None:
+            return entry["mean_sec"]
+        others = [entry["mean_sec"] for (key, entry) in self.entries.items()
+                  if key.startswith(f"{tname}-")]
+        if others:
+            return statistics.mean(others)
+        return None
+
+    def save(self):
+        """
+        Writes the history back to the disk if it was modified.
+        """
+        if not self.dirty:
+            return
+        history_dir = os.path.dirname(self.history_path)
+        if history_dir and not os.path.isdir(history_dir):
+            os.makedirs(history_dir)
+        tmp_path = f"{self.history_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as history_fd:
+            json.dump({"version": self.HISTORY_VERSION,
+                       "entries": self.entries}, history_fd)
+        os.replace(tmp_path, self.history_path)
+        self.dirty = False
+
+
+def _get_nd_vol_jobs(TestListBuilder, spec_test: bool) -> list:
+    """
+    Function to obtain the non disruptive jobs per volume type, in the
+    order the test runner queues them, i.e. the volume creation, the TCs
+    and the volume deletion.
+    Returns:
+        list of (volume type, list of test dicts) tuples.
+    """
+    special_test_dict = TestListBuilder.get_special_tests_dict()
+    if special_test_dict == []:
+        return []
+    vol_types = ['rep', 'dist', 'disp', 'arb', 'dist-rep', 'dist-disp',
+                 'dist-arb']
+    if spec_test:
+        vol_types = TestListBuilder.get_spec_vol_types()
+    return [(vol_type, [special_test_dict[0]]
+             + TestListBuilder.get_ndtest_list(vol_type)
+             + [special_test_dict[1]])
+            for vol_type in vol_types]
+
+
+def build_plan(TestListBuilder, concur_count: int, spec_test: bool,
+               history: DurationHistory) -> dict:
+    """
+    Function to work out the schedule of a run. The non disruptive stage
+    is simulated the way the workers pick their jobs, i.e. a free worker
+    picks the next volume type and runs all its TCs, and once the volume
+    types are exhausted, picks the Generic TCs one at a time. The
+    disruptive TCs run one after the other once the stage ends.
+    The TCs without history are taken to run for the median of the
+    predicted durations.
+    Args:
+        TestListBuilder (class): With the test list already built.
+        concur_count (int): Number of the non disruptive workers.
+        spec_test (bool): True if only one test is run.
+        history (DurationHistory)
+    Returns:
+        dict with the schedule of every worker, as a list of
+        (start second, predicted seconds or None, test name) tuples, the
+        expected end of the stages and the count of the TCs without
+        history.
+    """
+    vol_jobs = _get_nd_vol_jobs(TestListBuilder, spec_test)
+    gen_jobs = TestListBuilder.get_ndtest_list('Generic')
+    d_jobs = TestListBuilder.get_dtest_list()
+
+    def predict(test: dict, vol_type: str) -> tuple:
+        tname = f"{test['moduleName'][:-3]}-{vol_type}"
+        return (tname, history.predict(test['moduleName'][:-3], vol_type))
+
+    predictions = ([predict(test, vol_type)
+                    for (vol_type, tests) in vol_jobs for test in tests]
+                   + [predict(test, "Generic") for test in gen_jobs]
+                   + [predict(test, test['volType']) for test in d_jobs])
+    known = [sec for (_, sec) in predictions if sec is not None]
+    fallback = statistics.median(known) if known else 0
+    unknown = len(predictions) - len(known)
+    predictions = iter(predictions)
+
+    schedule = {f"nd-{ind}": [] for ind in range(concur_count)}
+    (vol_ind, gen_ind) = (0, 0)
+    nd_end = 0
+    if vol_jobs or gen_jobs:
+        free_at = [(0, ind) for ind in range(concur_count)]
+        heapq.heapify(free_at)
+        while free_at:
+            (clock, ind) = heapq.heappop(free_at)
+            if vol_ind < len(vol_jobs):
+                tests = vol_jobs[vol_ind][1]
+                vol_ind += 1
+            elif gen_ind < len(gen_jobs):
+                tests = [gen_jobs[gen_ind]]
+                gen_ind += 1
+            else:
+                nd_end = max(nd_end, clock)
+                continue
+            for _ in tests:
+                (tname, sec) = next(predictions)
+                schedule[f"nd-{ind}"].append((clock, sec, tname))
+                clock += fallback if sec is None else sec
+            heapq.heappush(free_at, (clock, ind))
+
+    clock = nd_end
+    schedule["d"] = []
+    for _ in d_jobs:
+        (tname, sec) = next(predictions)
+        schedule["d"].append((clock, sec, tname))
+        clock += fallback if sec is None else sec
+
+    return {"schedule": schedule, "nd_end_sec": nd_end,
+            "end_sec": clock, "unknown_count": unknown,
+            "fallback_sec": fallback}
+
+
+def format_plan(plan: dict) -> str:
+    """
+    Function to render a plan as text.
+    Args:
+        plan (dict): As returned by build_plan.
+    Returns:
+        str
+    """
+    def fmt(sec: float) -> str:
+        (mins, sec) = divmod(int(round(sec)), 60)
+        (hrs, mins) = divmod(mins, 60)
+        return f"{hrs}:{mins:02}:{sec:02}"
+
+    lines = []
+    for (worker, jobs) in plan["schedule"].items():
+        if not jobs:
+            continue
+        lines.append(f"Worker {worker} : {len(jobs)} TCs")
+        for (start, sec, tname) in jobs:
+            pred = "?" if sec is None else fmt(sec)
+            lines.append(f"  {fmt(start):>9}  {pred:>9}  {tname}")
+    tests_count = sum(len(jobs) for jobs in plan["schedule"].values())
+    lines.append(f"{tests_count} TCs planned. Non disruptive stage ends at "
+                 f"{fmt(plan['nd_end_sec'])}, the run at "
+                 f"{fmt(plan['end_sec'])}.")
+    if plan["unknown_count"] == tests_count:
+        lines.append("None of the TCs have history yet, the times will be "
+                     "predicted once they have run.")
+    elif plan["unknown_count"]:
+        lines.append(f"{plan['unknown_count']} TCs have no history and are "
+                     f"taken to run for {fmt(plan['fallback_sec'])} "
+                     "( marked ? ).")
+    return "\n".join(lines)
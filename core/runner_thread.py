@@ -2,7 +2,11 @@
 The thread runner is responsible for the execution of a given TC.
 """
 
+import sys
 import traceback
+sys.path.insert(1, ".")
+from utility.tracing import trace_span
+from resource_sampler import ResourceSampler
 
 
 class RunnerThread:
@@ -14,9 +18,11 @@ class RunnerThread:
 
     def __init__(self, tc_class, param_obj, volume_type: str,
                  mname: str, logger_obj, env_obj, log_path: str,
-                 log_level: str):
+                 log_level: str, volume_pool=None,
+                 resource_interval: int = None):
         # Creating the test case object from the test case.
         self.skip_run_thread = False
+        self.resource_interval = resource_interval
         self.logger = logger_obj
         self.tname = (f"{mname}-{volume_type}")
         self.test_stats = {
@@ -27,6 +33,8 @@ class RunnerThread:
         try:
             self.tc_obj = tc_class(
                 mname, param_obj, volume_type, env_obj, log_path, log_level)
+            if volume_pool is not None:
+                self.tc_obj.volume_pool = volume_pool
             self.run_test_func = getattr(self.tc_obj, "parent_run_test")
             self.terminate_test_func = getattr(self.tc_obj, "terminate")
         except Exception as error:
@@ -45,8 +53,16 @@ class RunnerThread:
 
         self.logger.info(f"Running {self.tname}")
         try:
-            self.run_test_func()
-            self.terminate_test_func()
+            sampler = self._start_resource_sampling()
+            try:
+                with trace_span("parent_run_test"):
+                    self.run_test_func()
+            finally:
+                # The samplers are stopped before the cleanup of the TC.
+                if sampler is not None:
+                    self.test_stats['resourceUsage'] = sampler.stop()
+            with trace_span("terminate"):
+                self.terminate_test_func()
             self.test_stats['testResult'] = self.tc_obj.TEST_RES
             if self.test_stats['testResult'][0] is None:
                 self.test_stats['skipReason'] = self.tc_obj.SKIP_REASON
@@ -55,4 +71,43 @@ class RunnerThread:
             self.logger.error(f"{self.tname} : {error}")
             self.logger.error(f"{self.tname} : {tb}")
             self.test_stats['testResult'] = [False]
+        self._collect_cmd_profile()
+        self._close_test_logger()
         return self.test_stats
+
+    def _start_resource_sampling(self):
+        """
+        Starts sampling the resource usage of the gluster processes on all
+        the nodes for the duration of the TC, if enabled.
+        Returns:
+            ResourceSampler or None.
+        """
+        if self.resource_interval is None:
+            return None
+        sampler = ResourceSampler(self.tc_obj.redant,
+                                  (self.tc_obj.server_list
+                                   + self.tc_obj.client_list),
+                                  self.tname, self.resource_interval)
+        sampler.start()
+        return sampler
+
+    def _collect_cmd_profile(self):
+        """
+        Adds the latency histograms of the commands run by the TC to the
+        test stats, in case the mixin of the TC profiles them.
+        """
+        redant = getattr(self.tc_obj, "redant", None)
+        get_cmd_profile = getattr(redant, "get_cmd_profile", None)
+        if get_cmd_profile is not None:
+            self.test_stats['cmdProfile'] = get_cmd_profile()
+
+    def _close_test_logger(self):
+        """
+        Closes the logger of the TC once it is done, so that its log file
+        is compressed if asked for, in case the mixin of the TC supports
+        it.
+        """
+        redant = getattr(self.tc_obj, "redant", None)
+        close_logger = getattr(redant, "close_logger", None)
+        if close_logger is not None:
+            close_logger()
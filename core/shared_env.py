@@ -0,0 +1,74 @@
+"""
+This component shares a single FrameworkEnv between the framework and
+the worker processes running the tests. The store lives in a manager
+process and the others work on it through proxies, so every process
+has the same, authoritative view of the volumes, options and snapshots.
+
+The manager serves the calls of every worker in a thread of its own and
+the FrameworkEnv locks per volume, hence the workers working on
+different volumes don't serialize on each other.
+
+The values returned through a proxy are copies pickled across the
+processes, hence mutating them doesn't change the store. The changes
+are always to be made through the setters.
+"""
+from multiprocessing.managers import BaseManager, BaseProxy
+from environ import FrameworkEnv
+
+
+class EnvProxy(BaseProxy):
+    """
+    Proxy of the shared FrameworkEnv. Every call is made on behalf of the
+    test running in the calling process, so that the env records the
+    changes made by a test only in the journal of that test. A worker
+    process runs one test at a time, hence the helper threads of the test
+    are attributed to it too.
+    """
+    # Name of the test running in this process.
+    owner = None
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            return self._callmethod('call_as', (EnvProxy.owner, name, args,
+                                                kwargs))
+        return call
+
+    def start_journal(self, owner: str = None):
+        """
+        Starts the journal of a test and attributes the calls from this
+        process to it.
+        """
+        EnvProxy.owner = owner
+        return self._callmethod('start_journal', (owner,))
+
+    def end_journal(self, owner: str = None):
+        """
+        Drops the journal of a test.
+        """
+        EnvProxy.owner = None
+        return self._callmethod('end_journal', (owner,))
+
+
+class EnvManager(BaseManager):
+    """
+    Manager serving the FrameworkEnv singleton.
+    """
+
+
+EnvManager.register('FrameworkEnv', callable=FrameworkEnv.getInstance,
+                    proxytype=EnvProxy)
+
+
+def start_shared_env():
+    """
+    Starts the manager process and creates the shared FrameworkEnv in it.
+    The FrameworkEnv shouldn't have been created in the calling process.
+    Returns:
+        tuple of the started manager and the proxy of the FrameworkEnv.
+    """
+    manager = EnvManager()
+    manager.start()
+    return (manager, manager.FrameworkEnv())
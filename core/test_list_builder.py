@@ -10,9 +10,10 @@ to be executed in the current session.
 import os
 import inspect
 import importlib
-import copy
 import sys
-from comment_parser.comment_parser import extract_comments
+from parsing.flag_parser import FlagParser
+from discovery_index import DiscoveryIndex, DEFAULT_INDEX_PATH
+from test_selector import TestSelector
 
 
 valid_vol_types = ['rep', 'dist', 'arb', 'disp', 'dist-rep', 'dist-arb',
@@ -43,9 +44,14 @@ class TestListBuilder:
                    'dist-rep': dtr_ndtest_list, 'dist-arb': dta_ndtest_list,
                    'dist-disp': dtds_ndtest_list, 'Generic': gen_ndtest_list}
 
+    discovery_index = None
+    test_class_cache = {}
+
     @classmethod
     def create_test_dict(cls, path: str, excluded_tests: list,
-                         volume_types_config: dict, single_tc: bool = False):
+                         volume_types_config: dict, single_tc: bool = False,
+                         index_path: str = DEFAULT_INDEX_PATH,
+                         selector: TestSelector = None):
         """
         This method creates a dict of TCs wrt the given directory
         path.
@@ -57,62 +63,81 @@ class TestListBuilder:
                                         config file
             single_tc (bool): If the user wants to run a single TC instead
                               of the complete suite.
+            index_path (str): Path of the on-disk discovery index. Only
+                              the TCs changed since the index was last
+                              written are parsed again.
+            selector (TestSelector): Selects a slice of the TCs by keyword
+                                     expression, volume type and component.
+                                     None selects all the TCs.
         Returns:
         """
         def path_error_handler(exception_instance):
             raise FileNotFoundError
 
         global valid_vol_types
+        excluded_set = {os.path.normpath(excluded)
+                        for excluded in excluded_tests}
+        discovered_paths = []
         # Obtaining list of paths to the TCs under given directory.
         if not single_tc:
-            if path.endswith("/"):
-                path = path[:-1]
-            if path not in excluded_tests:
-                for root, _, files in os.walk(path,
-                                              onerror=path_error_handler):
-                    if root not in excluded_tests:
-                        for tfile in files:
-                            if tfile.endswith(".py") and \
-                               tfile.startswith("test"):
-                                test_case_path = os.path.join(root, tfile)
-                                if test_case_path not in excluded_tests:
-                                    cls.tests_path_list.append(test_case_path)
-
-        elif path not in excluded_tests:
-            cls.tests_path_list.append(path)
+            path = os.path.normpath(path)
+            if path not in excluded_set:
+                for root, dirs, files in os.walk(path,
+                                                 onerror=path_error_handler):
+                    # Pruning the excluded dirs skips their subdirs too.
+                    dirs[:] = [tdir for tdir in dirs
+                               if os.path.join(root, tdir)
+                               not in excluded_set]
+                    for tfile in files:
+                        if tfile.endswith(".py") and \
+                           tfile.startswith("test"):
+                            test_case_path = os.path.join(root, tfile)
+                            if test_case_path not in excluded_set:
+                                discovered_paths.append(test_case_path)
+
+        elif os.path.normpath(path) not in excluded_set:
+            discovered_paths.append(path)
+
+        cls.discovery_index = DiscoveryIndex(index_path)
+        cls.discovery_index.refresh(discovered_paths, cls._get_test_info)
 
         # Extracting the test case flags and adding module level info.
-        for test_case_path in cls.tests_path_list:
-            test_flags = cls._get_test_module_info(test_case_path)
+        for test_case_path in discovered_paths:
+            test_flags = cls.discovery_index.lookup(test_case_path,
+                                                    cls._get_test_info)
             test_dict = {}
             test_dict["modulePath"] = test_case_path
             test_dict["moduleName"] = test_case_path.split("/")[-1]
             test_dict["componentName"] = test_case_path.split("/")[-2]
-            test_dict["testClass"] = cls._get_test_class(test_case_path)
+            test_dict["className"] = test_flags["className"]
             test_dict["testType"] = test_case_path.split("/")[-3]
             test_dict["tcNature"] = test_flags["tcNature"]
-            if test_flags["tcNature"] == "disruptive":
-                for vol_type in test_flags["volType"]:
-                    if vol_type not in valid_vol_types:
-                        raise Exception(f"{test_dict['modulePath']} has"
-                                        f" invalid volume type {vol_type}")
-                    if ((vol_type == "Generic")
-                       or (vol_type in volume_types_config)):
-                        temp_test_dict = copy.deepcopy(test_dict)
-                        temp_test_dict["volType"] = copy.deepcopy(vol_type)
-                        cls.dtest_list.append(temp_test_dict)
-            elif test_flags["tcNature"] == "nonDisruptive":
-                for vol_type in test_flags["volType"]:
-                    if vol_type not in valid_vol_types:
-                        raise Exception(f"{test_dict['modulePath']} has"
-                                        f" invalid volume type {vol_type}")
-                    if ((vol_type == "Generic")
-                       or (vol_type in volume_types_config)):
-                        temp_test_dict = copy.deepcopy(test_dict)
-                        cls.nd_category[vol_type].append(temp_test_dict)
-            else:
+            test_dict["timeout"] = test_flags["timeout"]
+            test_dict["tags"] = test_flags["tags"]
+            test_dict["resources"] = test_flags["resources"]
+            if selector is not None and \
+               not selector.is_test_selected(test_dict):
+                continue
+            cls.tests_path_list.append(test_case_path)
+            if test_flags["tcNature"] not in ("disruptive", "nonDisruptive"):
                 raise Exception(f"Invalid test nature : "
                                 f" {test_flags['tcNature']}")
+            for vol_type in test_flags["volType"]:
+                if vol_type not in valid_vol_types:
+                    raise Exception(f"{test_dict['modulePath']} has"
+                                    f" invalid volume type {vol_type}")
+                if ((vol_type != "Generic")
+                   and (vol_type not in volume_types_config)):
+                    continue
+                if selector is not None and \
+                   not selector.is_vol_type_selected(vol_type):
+                    continue
+                if test_flags["tcNature"] == "disruptive":
+                    temp_test_dict = dict(test_dict)
+                    temp_test_dict["volType"] = vol_type
+                    cls.dtest_list.append(temp_test_dict)
+                else:
+                    cls.nd_category[vol_type].append(dict(test_dict))
 
         cls.spec_vol = []
         nd_tests_count = 0
@@ -124,6 +149,7 @@ class TestListBuilder:
                 cls.spec_vol.append(vol_t)
         if nd_tests_count > 0:
             cls._create_nd_special_tests()
+        cls.discovery_index.save()
 
     @classmethod
     def get_spec_vol_types(cls):
@@ -148,7 +174,9 @@ class TestListBuilder:
             special_nd = {}
             special_nd['modulePath'] = path
             special_nd['moduleName'] = path.split("/")[-1]
-            special_nd['testClass'] = cls._get_test_class(path)
+            special_info = cls.discovery_index.lookup(path,
+                                                      cls._get_test_info)
+            special_nd['className'] = special_info["className"]
             special_nd['tcNature'] = 's'
             if cls.test_nd_volc_dict == {}:
                 cls.test_nd_volc_dict = special_nd
@@ -220,31 +248,77 @@ class TestListBuilder:
         Returns:
            test_flags (dict): This dictionary contains the volume types
                               for which the TC is to be run and the nature
-                              of the TC, i.e. Disruptive / Non-Disruptive.
+                              of the TC, i.e. Disruptive / Non-Disruptive,
+                              along with the optional timeout, tags and
+                              resource needs.
            For example,
                       {
                         "tcNature" : "disruptive",
-                        "volType" : [replicated, ...]
+                        "volType" : [replicated, ...],
+                        "timeout" : None,
+                        "tags" : [],
+                        "resources" : {}
+                      }
+        """
+        return FlagParser.parse(tc_path)
+
+    @classmethod
+    def _get_test_info(cls, tc_path: str) -> dict:
+        """
+        Method to parse all the details of a test module which are
+        stored in the discovery index.
+        Args:
+           tc_path (str): The path of the test case.
+        Returns:
+           dict with the test flags and the class name, i.e.
+                      {
+                        "tcNature" : "disruptive",
+                        "volType" : [replicated, ...],
+                        "className" : "TestCase"
                       }
         """
-        flags = str(extract_comments(tc_path, mime="text/x-python")[0])
-        tc_flags = {}
-        tc_flags["tcNature"] = flags.split(';')[0].strip()
-        tc_flags["volType"] = flags.split(';')[1].split(',')
-        if tc_flags["volType"] == ['']:
-            tc_flags["volType"] = ["Generic"]
-        return tc_flags
+        if tc_path.split("/")[-1].startswith("test"):
+            test_info = cls._get_test_module_info(tc_path)
+        else:
+            # The special tests don't carry the flags.
+            test_info = {}
+        test_info["className"] = DiscoveryIndex.get_test_class_name(tc_path)
+        return test_info
 
     @classmethod
-    def _get_test_class(cls, tc_path: str):
+    def get_test_class(cls, tc_path: str, tc_class_str: str = None):
+        """
+        Method to obtain the test class of a test module. The test modules
+        aren't imported while building the list, rather the import is
+        deferred till a worker picks up the test. The classes are cached
+        per process so that a worker imports a module only once.
+        Args:
+            tc_path (str): The path of the test case.
+            tc_class_str (str): Name of the test class if already known.
+        Returns:
+            The test class.
+        """
+        cache_key = (tc_path, tc_class_str)
+        if cache_key not in cls.test_class_cache:
+            cls.test_class_cache[cache_key] = cls._get_test_class(
+                tc_path, tc_class_str)
+        return cls.test_class_cache[cache_key]
+
+    @classmethod
+    def _get_test_class(cls, tc_path: str, tc_class_str: str = None):
         """
         Method to import the module and inspect the class to be stored
         for creating objects later.
+        Args:
+            tc_path (str): The path of the test case.
+            tc_class_str (str): Name of the test class if already known.
         """
         tc_module_str = tc_path.replace("/", ".")[:-3]
-        sys.path.insert(1, ".")
+        if "." not in sys.path:
+            sys.path.insert(1, ".")
         tc_module = importlib.import_module(tc_module_str)
-        tc_class_str = inspect.getmembers(tc_module,
-                                          inspect.isclass)[1][0]
+        if tc_class_str is None:
+            tc_class_str = inspect.getmembers(tc_module,
+                                              inspect.isclass)[1][0]
         tc_class = getattr(tc_module, tc_class_str)
         return tc_class
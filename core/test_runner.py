@@ -2,10 +2,17 @@
 The test runner is responsible for handling the list of TCs
 to be run and invoking them.
 """
+import sys
 import time
+import traceback
 from multiprocessing import Process, Queue
 from halo import Halo
 from runner_thread import RunnerThread
+from volume_pool import VolumePool
+sys.path.insert(1, ".")
+from utility.tracing import add_span, trace_span
+from utility.metrics import enable_metrics, get_metrics, MetricsExporter
+from utility.relog import TestIdentityFilter
 
 
 class TestRunner:
@@ -14,10 +21,15 @@ class TestRunner:
     to the invocation of the runner threads with respect to the list
     created by the test list builder.
     """
+    # Name of the worker running the tests in the current process. The
+    # disruptive tests are run by the main process.
+    worker_name = "d"
 
     @classmethod
     def init(cls, TestListBuilder, param_obj, fmwk_obj, base_log_path: str,
-             log_level: str, multiprocess_count: int, spec_test: bool):
+             log_level: str, multiprocess_count: int, spec_test: bool,
+             use_volume_pool: bool = False, metrics_file: str = None,
+             metrics_port: int = None, resource_interval: int = None):
         """
         Test runner intialization.
         Args:
@@ -27,20 +39,44 @@ class TestRunner:
             log_level (str)
             multiprocess_count (int)
             spec_test (bool) True if only one test is run.
+            use_volume_pool (bool) True if the disruptive tests are to be
+                                   given warm volumes from a volume pool.
+            metrics_file (str) Path of the textfile to export the run
+                               metrics to, in the Prometheus format.
+            metrics_port (int) Port on localhost to serve the run metrics
+                               on, in the Prometheus format.
+            resource_interval (int) Seconds between the samples of the
+                                    gluster processes' resource usage
+                                    taken during every test. None disables
+                                    the sampling.
         """
         cls.param_obj = param_obj
         cls.concur_count = multiprocess_count
         cls.base_log_path = base_log_path
         cls.log_level = log_level
         cls.threadList = []
+        cls.use_volume_pool = use_volume_pool
+        cls.resource_interval = resource_interval
+        cls.volume_pool = None
         cls.get_dtest_fn = TestListBuilder.get_dtest_list
         cls.get_ndtest_fn = TestListBuilder.get_ndtest_list
         cls.get_snd_test_fn = TestListBuilder.get_special_tests_dict
         cls.get_spec_vol_types_fn = TestListBuilder.get_spec_vol_types
+        cls.get_test_class_fn = TestListBuilder.get_test_class
         cls.nd_tests_count = TestListBuilder.get_nd_tests_count()
         cls.logger = fmwk_obj.get_framework_logger()
         cls.logger.info("Creating thread queues for the tests")
         cls._prepare_thread_queues(spec_test)
+        cls.metrics_exporter = None
+        if metrics_file is not None or metrics_port is not None:
+            tests_total = (sum(job_q.qsize()
+                               for job_q in cls.queue_map.values())
+                           + cls.gen_nd_jobq.qsize()
+                           + len(cls.get_dtest_fn()))
+            workers = [f"nd-{ind}" for ind in range(cls.concur_count)]
+            metrics = enable_metrics(workers + ["d"], tests_total)
+            cls.metrics_exporter = MetricsExporter(metrics, metrics_file,
+                                                   metrics_port)
 
     @classmethod
     def _prepare_thread_queues(cls, spec_test: bool):
@@ -94,7 +130,8 @@ class TestRunner:
             cls.gen_nd_jobq.put(test)
 
     @classmethod
-    def _nd_worker_process(cls, vol_queue, queue_map, gen_nd_jobq, ):
+    def _nd_worker_process(cls, vol_queue, queue_map, gen_nd_jobq,
+                           worker_id: int = 0):
         """
         Worker process has two set of queue hierarchy to deal with.
         It picks up a volume type from the volume queue and then
@@ -108,23 +145,26 @@ class TestRunner:
                                for given volume type.
             gen_nd_jobq (Queue) : Queue containing jobs for Generic
                                   non disruptive cases.
+            worker_id (int) : Index of the worker, for its metrics.
         """
-        while not vol_queue.empty():
-            job_vol = vol_queue.get()
-            cls.logger.info(f"Worker picked up job_volume {job_vol}")
-            job_queue = queue_map[job_vol]
-            while not job_queue.empty():
-                job_data = job_queue.get()
-                cls.logger.info(f"Worker picked up job {job_data}")
-                job_data['volType'] = job_vol
-                cls._run_test(job_data)
-
-        if gen_nd_jobq.qsize() != 0:
-            while not gen_nd_jobq.empty():
-                job_data = gen_nd_jobq.get()
-                cls.logger.info(f"Worker picked up job {job_data}")
-                job_data['volType'] = "Generic"
-                cls._run_test(job_data)
+        cls.worker_name = f"nd-{worker_id}"
+        with trace_span("nd_worker", "stage"):
+            while not vol_queue.empty():
+                job_vol = vol_queue.get()
+                cls.logger.info(f"Worker picked up job_volume {job_vol}")
+                job_queue = queue_map[job_vol]
+                while not job_queue.empty():
+                    job_data = job_queue.get()
+                    cls.logger.info(f"Worker picked up job {job_data}")
+                    job_data['volType'] = job_vol
+                    cls._run_test(job_data)
+
+            if gen_nd_jobq.qsize() != 0:
+                while not gen_nd_jobq.empty():
+                    job_data = gen_nd_jobq.get()
+                    cls.logger.info(f"Worker picked up job {job_data}")
+                    job_data['volType'] = "Generic"
+                    cls._run_test(job_data)
 
     @classmethod
     def run_tests(cls, env_obj):
@@ -136,46 +176,79 @@ class TestRunner:
         3. Stage 2 is the run of Disruptive test cases.
         """
         cls.env_obj = env_obj
+        if cls.metrics_exporter is not None:
+            cls.metrics_exporter.start()
         # Stage 1
         jobs = []
         if bool(cls.nd_tests_count):
             cls.logger.info("Starting Non Disruptive test case runs.")
-            for _ in range(cls.concur_count):
-                proc = Process(target=cls._nd_worker_process,
-                               args=(cls.nd_vol_queue, cls.queue_map,
-                                     cls.gen_nd_jobq,))
-                jobs.append(proc)
-                proc.start()
+            with trace_span("nd_stage", "stage",
+                            workers=cls.concur_count):
+                for worker_id in range(cls.concur_count):
+                    proc = Process(target=cls._nd_worker_process,
+                                   args=(cls.nd_vol_queue, cls.queue_map,
+                                         cls.gen_nd_jobq, worker_id))
+                    jobs.append(proc)
+                    proc.start()
 
-            # TODO replace sleep with a signalling and lock.
-            while len(jobs) > 0:
-                jobs = [job for job in jobs if job.is_alive()]
-                time.sleep(1)
+                # TODO replace sleep with a signalling and lock.
+                while len(jobs) > 0:
+                    jobs = [job for job in jobs if job.is_alive()]
+                    time.sleep(1)
 
-            for _ in range(cls.concur_count):
-                proc.join()
+                for _ in range(cls.concur_count):
+                    proc.join()
 
         # Stage 2
         if cls.get_dtest_fn():
-            cls.logger.info("Starting Disruptive test case runs.")
-            for test in cls.get_dtest_fn():
-                cls._run_test(test)
+            with trace_span("d_stage", "stage"):
+                cls._run_dtests(env_obj)
 
         # Because of the infinitesimal delay in value being reflected in Queue
         # it was found that sometimes the Queue which was empty had been given
         # some value, it still showed itself as empty.
         # TODO: Handle it without sleep.
-        itr = 0
-        while itr < 5:
-            if cls.job_result_queue.empty():
-                time.sleep(1)
-            else:
-                break
-            itr += 1
+        with trace_span("result_drain", "stage"):
+            itr = 0
+            while itr < 5:
+                if cls.job_result_queue.empty():
+                    time.sleep(1)
+                else:
+                    break
+                itr += 1
 
+        if cls.metrics_exporter is not None:
+            cls.metrics_exporter.stop()
         cls.logger.info("Finished test executions.")
         return cls.job_result_queue
 
+    @classmethod
+    def _run_dtests(cls, env_obj):
+        """
+        Runs the disruptive tests one after the other, with their volumes
+        prepared by the volume pool, if enabled.
+        """
+        cls.logger.info("Starting Disruptive test case runs.")
+        if cls.use_volume_pool:
+            cls.volume_pool = VolumePool(
+                cls.param_obj, env_obj,
+                f"{cls.base_log_path}/volume_pool.log", cls.log_level)
+        dtest_list = cls.get_dtest_fn()
+        for (ind, test) in enumerate(dtest_list):
+            if cls.volume_pool is not None:
+                # Warm up the volume of the next test while this one
+                # runs.
+                wanted = {}
+                for next_test in dtest_list[ind:ind + 2]:
+                    voltype = next_test['volType']
+                    wanted[voltype] = wanted.get(voltype, 0) + 1
+                for (voltype, count) in wanted.items():
+                    cls.volume_pool.prefetch(voltype, count)
+            cls._run_test(test)
+        if cls.volume_pool is not None:
+            cls.volume_pool.shutdown()
+            cls.volume_pool = None
+
     @classmethod
     def _run_test(cls, test_dict: dict):
         """
@@ -184,7 +257,6 @@ class TestRunner:
         """
 
         spinner = Halo(spinner='dots', text_color='yellow')
-        tc_class = test_dict["testClass"]
         volume_type = test_dict["volType"]
         mname = test_dict["moduleName"][:-3]
 
@@ -193,16 +265,49 @@ class TestRunner:
 
         # to calculate time spent to execute the test
         start = time.time()
+        span_start = time.perf_counter()
+        metrics = get_metrics()
+        if metrics is not None:
+            metrics.test_started(cls.worker_name)
 
         spinner.succeed(text=f"Running test case : {mname}-{volume_type}")
-        runner_thread_obj = RunnerThread(tc_class, cls.param_obj, volume_type,
-                                         mname, cls.logger, cls.env_obj,
-                                         tc_log_path, cls.log_level)
+        # The framework's records are stamped with the test while it runs,
+        # a worker process runs one test at a time.
+        stamp = TestIdentityFilter(mname, volume_type)
+        cls.logger.addFilter(stamp)
+        try:
+            # The test module is imported only by the worker running it.
+            try:
+                tc_class = cls.get_test_class_fn(test_dict["modulePath"],
+                                                 test_dict["className"])
+            except Exception as error:
+                tb = traceback.format_exc()
+                cls.logger.error(f"{mname}-{volume_type} : Import failure "
+                                 f": {error}")
+                cls.logger.error(f"{mname}-{volume_type} : {tb}")
+                tc_class = None
 
-        test_stats = runner_thread_obj.run_thread()
+            if tc_class is None:
+                test_stats = {'timeTaken': 0, 'volType': volume_type,
+                              'skipReason': "NA", 'testResult': [False]}
+            else:
+                runner_thread_obj = RunnerThread(
+                    tc_class, cls.param_obj, volume_type, mname, cls.logger,
+                    cls.env_obj, tc_log_path, cls.log_level, cls.volume_pool,
+                    cls.resource_interval)
+                test_stats = runner_thread_obj.run_thread()
+        finally:
+            cls.logger.removeFilter(stamp)
 
         test_stats['timeTaken'] = time.time() - start
         test_stats['tcNature'] = test_dict['tcNature']
+        if test_stats.get('resourceUsage'):
+            # The non disruptive tests run concurrently share the nodes,
+            # hence their figures aren't of the test alone.
+            test_stats['resourceScope'] = "test"
+            if (test_dict['tcNature'] != "disruptive"
+               and cls.concur_count > 1):
+                test_stats['resourceScope'] = "node-wide"
         spinner.clear()
         result_text = f"{test_dict['moduleName'][:-3]}-{test_dict['volType']}"
         if test_stats['testResult'][0] is True:
@@ -221,6 +326,11 @@ class TestRunner:
             spinner = Halo(spinner='dots', text_color='cyan')
             spinner.info(f"{mname}-{volume_type} SKIP")
         test_stats['component'] = tc_log_path.split('/')[-4]
+        if metrics is not None:
+            metrics.test_finished(cls.worker_name, test_stats['testResult'])
+        add_span(f"{mname}-{volume_type}", "test", span_start,
+                 time.perf_counter(), result=test_stats['testResult'],
+                 component=test_stats['component'])
 
         result_value = {test_dict["moduleName"][:-3]: test_stats}
         cls.job_result_queue.put(result_value)
@@ -0,0 +1,162 @@
+"""
+This component is responsible for selecting a slice of the discovered
+tests based on,
+1. A keyword expression, e.g. "snap and not scheduler",
+2. The volume types,
+3. The components,
+4. The impact of the changes since a git revision.
+
+The selection is evaluated against the info already present in the
+discovery index, hence the unselected test modules are never imported.
+"""
+import re
+
+
+class TestSelector:
+    """
+    The keyword expression supports `and`, `or`, `not` and parentheses.
+    A keyword matches a test if it is a substring of any of the test's
+    keywords, i.e. the module name, class name, component, test type
+    and tags of the test.
+    """
+    token_regex = re.compile(r"\s*(\(|\)|[^\s()]+)")
+
+    def __init__(self, keyword_expr: str = None, vol_types: list = None,
+                 components: list = None, impact_analyzer=None):
+        """
+        Args:
+            keyword_expr (str): The keyword expression. None selects all.
+            vol_types (list): Volume types to run the tests on. None
+                              selects all.
+            components (list): Components whose tests are to be run. None
+                               selects all.
+            impact_analyzer (ImpactAnalyzer): Selects only the tests
+                                              impacted by the changes. None
+                                              selects all.
+        """
+        self.impact_analyzer = impact_analyzer
+        self.keyword_fn = None
+        if keyword_expr is not None and keyword_expr.strip() != '':
+            self.keyword_fn = self._compile(keyword_expr)
+        self.vol_types = None
+        if vol_types:
+            self.vol_types = set(vol_types)
+        self.components = None
+        if components:
+            self.components = set(components)
+
+    def _compile(self, keyword_expr: str):
+        """
+        Compiles the keyword expression into a callable which takes the
+        keywords of a test and returns whether the test is selected.
+        Args:
+            keyword_expr (str)
+        Returns:
+            callable
+        """
+        tokens = self.token_regex.findall(keyword_expr)
+        pos = 0
+
+        def peek():
+            return tokens[pos] if pos < len(tokens) else None
+
+        def take():
+            nonlocal pos
+            pos += 1
+            return tokens[pos - 1]
+
+        def either(left, right):
+            return lambda kw: left(kw) or right(kw)
+
+        def both(left, right):
+            return lambda kw: left(kw) and right(kw)
+
+        def parse_or():
+            expr_fn = parse_and()
+            while peek() == "or":
+                take()
+                expr_fn = either(expr_fn, parse_and())
+            return expr_fn
+
+        def parse_and():
+            expr_fn = parse_not()
+            while peek() == "and":
+                take()
+                expr_fn = both(expr_fn, parse_not())
+            return expr_fn
+
+        def parse_not():
+            token = peek()
+            if token is None:
+                raise ValueError(f"Unexpected end of expression "
+                                 f"'{keyword_expr}'")
+            if token == "not":
+                take()
+                operand = parse_not()
+                return lambda kw: not operand(kw)
+            if token == "(":
+                take()
+                inner = parse_or()
+                if peek() != ")":
+                    raise ValueError(f"Missing ')' in expression "
+                                     f"'{keyword_expr}'")
+                take()
+                return inner
+            if token in ("and", "or", ")"):
+                raise ValueError(f"Unexpected '{token}' in expression "
+                                 f"'{keyword_expr}'")
+            take()
+            return lambda kw: any(token in keyword for keyword in kw)
+
+        keyword_fn = parse_or()
+        if pos != len(tokens):
+            raise ValueError(f"Unexpected '{tokens[pos]}' in expression "
+                             f"'{keyword_expr}'")
+        return keyword_fn
+
+    @staticmethod
+    def get_test_keywords(test_dict: dict) -> list:
+        """
+        Method to obtain the keywords of a test against which the keyword
+        expression is matched.
+        Args:
+            test_dict (dict): The test dict built by the test list builder.
+        Returns:
+            list of keywords.
+        """
+        keywords = [test_dict["moduleName"][:-3],
+                    test_dict["componentName"], test_dict["testType"]]
+        if test_dict.get("className"):
+            keywords.append(test_dict["className"])
+        keywords.extend(test_dict.get("tags", []))
+        return keywords
+
+    def is_test_selected(self, test_dict: dict) -> bool:
+        """
+        Method to check if the test is selected by the component, keyword
+        and change impact criteria.
+        Args:
+            test_dict (dict): The test dict built by the test list builder.
+        Returns:
+            bool
+        """
+        if (self.components is not None
+           and test_dict["componentName"] not in self.components):
+            return False
+        if (self.keyword_fn is not None
+           and not self.keyword_fn(self.get_test_keywords(test_dict))):
+            return False
+        if self.impact_analyzer is not None:
+            return self.impact_analyzer.is_test_impacted(
+                test_dict["modulePath"])
+        return True
+
+    def is_vol_type_selected(self, vol_type: str) -> bool:
+        """
+        Method to check if the volume type is selected.
+        Args:
+            vol_type (str)
+        Returns:
+            bool
+        """
+        return self.vol_types is None or vol_type in self.vol_types
@@ -0,0 +1,292 @@
+"""
+This component maintains a pool of warm volumes for the disruptive
+tests. The volumes are created and mounted in the background while the
+previous test runs, handed out to the tests which use the default volume
+setup and recycled or destroyed asynchronously once the test ends.
+
+As a disruptive test might disrupt the pooled volumes as well, the test
+sanitizes a volume before using it and falls back to creating its own
+volume if that fails. While a test runs, the pool only creates the
+volumes of the next tests, keeping the volume setup off the critical
+path. The creation can race with the test restarting glusterd or
+rebooting the nodes, in which case it fails and the volume is destroyed,
+or the next test finds the volume unusable and creates its own. The
+recycling of the released volumes waits till the test is done, as it
+works on the volumes the test may have left behind. The pool tasks are
+traced as the "pool" spans ( see --trace ), showing how much of them
+overlap the tests.
+"""
+import sys
+import threading
+import traceback
+from queue import Queue
+sys.path.insert(1, ".")
+from common.mixin import RedantMixin
+from utility.tracing import trace_span
+from tests.setup_helpers import mount_on_clients
+
+
+class VolumePool:
+    """
+    The pool has a single background worker, with its own connections to
+    the nodes, which serially performs the creation and recycling of the
+    pooled volumes.
+    """
+
+    def __init__(self, param_obj, env_obj, log_path: str, log_level: str):
+        """
+        Args:
+            param_obj (object): The params handler object.
+            env_obj (object): The framework environment object.
+            log_path (str): Path of the pool's log file.
+            log_level (str)
+        """
+        self.server_list = param_obj.get_server_ip_list()
+        self.client_list = param_obj.get_client_ip_list()
+        self.brick_roots = param_obj.get_brick_roots()
+        self.vol_type_inf = param_obj.get_volume_types()
+        self.redant = RedantMixin(param_obj.get_server_config(),
+                                  param_obj.get_client_config(), env_obj,
+                                  [True])
+        self.redant.init_logger("volume_pool", log_path, log_level)
+        self.redant.establish_connection()
+
+        self.cond = threading.Condition()
+        # Volumes ready to be handed out, per volume type.
+        self.available = {}
+        # Number of volumes being created or recycled, per volume type.
+        self.pending = {}
+        # All the volumes owned by the pool, i.e. not in use by a test.
+        self.pooled = set()
+        self.vol_count = 0
+        self.voltype_map = {}
+        # The recycle tasks picked up while paused are deferred till the
+        # pool is resumed.
+        self.paused = False
+        self.deferred = []
+        self.task_queue = Queue()
+        self.worker = threading.Thread(target=self._worker, daemon=True)
+        self.worker.start()
+
+    def _worker(self):
+        """
+        The background worker processing the pool tasks till it gets the
+        stop task.
+        """
+        while True:
+            (task, volname) = self.task_queue.get()
+            if task == "stop":
+                return
+            if task == "recycle":
+                with self.cond:
+                    if self.paused:
+                        self.deferred.append((task, volname))
+                        continue
+            voltype = self.voltype_map[volname]
+            with trace_span(f"pool_{task}", "pool", volname=volname):
+                if task == "create":
+                    ready = self._create_volume(volname, voltype)
+                else:
+                    ready = self._recycle_volume(volname, voltype)
+            with self.cond:
+                self.pending[voltype] -= 1
+                if ready:
+                    self.available.setdefault(voltype, []).append(volname)
+                else:
+                    self.pooled.discard(volname)
+                self.cond.notify_all()
+
+    def _get_mountpoint(self, volname: str) -> str:
+        """
+        Method to obtain the mountpoint of a pooled volume.
+        """
+        return f"/mnt/{volname}"
+
+    def _create_volume(self, volname: str, voltype: str) -> bool:
+        """
+        Creates, starts and mounts a volume on all the clients.
+        Returns:
+            bool: True if the volume is ready to be used.
+        """
+        try:
+            self.redant.setup_volume(volname, self.server_list[0],
+                                     self.vol_type_inf[voltype],
+                                     self.server_list, self.brick_roots,
+                                     force=True)
+            mount_on_clients(self.redant, self.server_list[0], volname,
+                             self._get_mountpoint(volname),
+                             self.client_list)
+            self.redant.logger.info(f"Pooled volume {volname} is ready")
+            return True
+        except Exception as error:
+            tb = traceback.format_exc()
+            self.redant.logger.error(f"Pool creation of {volname} failed "
+                                     f": {error}")
+            self.redant.logger.error(tb)
+            self._destroy_volume(volname)
+            return False
+
+    def _recycle_volume(self, volname: str, voltype: str) -> bool:
+        """
+        Brings a released volume back to its pristine state. A volume
+        whose type or options were changed by the test is destroyed
+        instead.
+        Returns:
+            bool: True if the volume is ready to be used again.
+        """
+        try:
+            env_obj = self.redant.es
+            if not env_obj.does_volume_exists(volname):
+                return False
+            expected = self.vol_type_inf[voltype]
+            actual = env_obj.get_volume_dict(volname)['voltype']
+            voltype_changed = any(
+                str(actual.get(key)) != str(val)
+                for (key, val) in expected.items()
+                if key != "transport" and key in actual)
+            if voltype_changed or \
+               env_obj.is_volume_options_populated(volname):
+                self.redant.logger.info(f"{volname} was modified, "
+                                        "destroying it")
+                self._destroy_volume(volname)
+                return False
+            self.redant.sanitize_volume(volname, self.server_list,
+                                        self.client_list, self.brick_roots,
+                                        expected)
+            mountpoint = self._get_mountpoint(volname)
+            self.redant.execute_abstract_op_multinode(
+                f"rm -rf {mountpoint}/*", self.client_list)
+            self.redant.logger.info(f"Pooled volume {volname} recycled")
+            return True
+        except Exception as error:
+            tb = traceback.format_exc()
+            self.redant.logger.error(f"Recycling {volname} failed : {error}")
+            self.redant.logger.error(tb)
+            self._destroy_volume(volname)
+            return False
+
+    def _destroy_volume(self, volname: str):
+        """
+        Destroys a pooled volume, ignoring the failures as the env
+        teardown takes care of the leftovers.
+        """
+        try:
+            if self.redant.es.does_volume_exists(volname):
+                self.redant.cleanup_volumes(self.server_list, volname)
+        except Exception as error:
+            self.redant.logger.error(f"Destroying {volname} failed : "
+                                     f"{error}")
+
+    def _submit(self, task: str, volname: str, voltype: str):
+        """
+        Queues a task for the worker. Has to be called with cond held.
+        """
+        self.voltype_map[volname] = voltype
+        self.pooled.add(volname)
+        self.pending[voltype] = self.pending.get(voltype, 0) + 1
+        self.task_queue.put((task, volname))
+
+    def prefetch(self, voltype: str, count: int = 1):
+        """
+        Makes sure the given number of volumes of a type are either ready
+        or being prepared, so that the next tests can pick them up without
+        waiting for the volume setup.
+        Args:
+            voltype (str)
+            count (int): Number of the volumes needed.
+        """
+        if voltype not in self.vol_type_inf:
+            return
+        with self.cond:
+            while (len(self.available.get(voltype, []))
+                   + self.pending.get(voltype, 0)) < count:
+                self.vol_count += 1
+                self._submit("create", f"redant-pool-{voltype}-"
+                             f"{self.vol_count}", voltype)
+
+    def pause(self):
+        """
+        Makes the worker defer the recycle tasks. It is called before a
+        test runs. The creation of the volumes goes on, so that
+        the next test's volume is prepared while this test runs.
+        """
+        with self.cond:
+            self.paused = True
+
+    def resume(self):
+        """
+        Requeues the deferred recycle tasks, once the test is done
+        disrupting the cluster.
+        """
+        with self.cond:
+            self.paused = False
+            for task in self.deferred:
+                self.task_queue.put(task)
+            self.deferred = []
+
+    def acquire(self, voltype: str, timeout: int = None) -> tuple:
+        """
+        Hands out a warm volume of the given type. In case one is being
+        prepared, it waits for it.
+        Args:
+            voltype (str)
+            timeout (int): Seconds to wait for a volume being prepared.
+                           None waits till it is ready.
+        Returns:
+            tuple of volume name and mountpoint, or (None, None) in case
+            no volume is available.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: (self.available.get(voltype)
+                                        or not self.pending.get(voltype)),
+                               timeout)
+            if not self.available.get(voltype):
+                return (None, None)
+            volname = self.available[voltype].pop(0)
+            self.pooled.discard(volname)
+        return (volname, self._get_mountpoint(volname))
+
+    def release(self, volname: str, voltype: str):
+        """
+        Returns a volume to the pool once the test is done with it. The
+        volume is recycled in the background.
+        Args:
+            volname (str)
+            voltype (str)
+        """
+        with self.cond:
+            self._submit("recycle", volname, voltype)
+
+    def discard(self, volname: str):
+        """
+        Forgets a handed out volume which turned out to be unusable.
+        Args:
+            volname (str)
+        """
+        with self.cond:
+            self.pooled.discard(volname)
+
+    def is_pooled(self, volname: str) -> bool:
+        """
+        Method to check if a volume is owned by the pool, in which case
+        the tests shouldn't clean it up.
+        Args:
+            volname (str)
+        Returns:
+            bool
+        """
+        with self.cond:
+            return volname in self.pooled
+
+    def shutdown(self):
+        """
+        Waits for the pending tasks and destroys all the pooled volumes.
+        """
+        self.resume()
+        self.task_queue.put(("stop", None))
+        self.worker.join()
+        for volname in list(self.pooled):
+            self._destroy_volume(volname)
+        self.pooled = set()
+        self.available = {}
+        self.redant.deconstruct_connection()
@@ -3,6 +3,11 @@ This module takes care of:
 1) Config file parsing (by gluster_test_parser).
 2) Tests-to-run list preparation (by test_list_builder).
 3) Invocation of the test_runner.
+
+The heavy dependencies, i.e. the ssh, templating, http and spinner
+libraries, are imported only when the run needs them, so that `--help`
+and the argument errors return instantly. Check the startup cost with
+tools/benchmarks/startup_bench.py after adding imports here.
 """
 import os
 import sys
@@ -10,13 +15,9 @@ import time
 import datetime
 import traceback
 import argparse
-import pyfiglet
-from halo import Halo
-from environ import Environ, FrameworkEnv
 from params_handler import ParamsHandler
 # from test_runner import TestRunner
 # from result_handler import handle_results
-from utility.relog import Logger
 sys.path.insert(1, ".")
 sys.path.insert(1, "./common")
 
@@ -42,6 +43,36 @@ def pars_args():
     parser.add_argument("-ll", "--log-level",
                         help="The log level. Default log level is Info",
                         dest="log_level", default="I", type=str)
+    parser.add_argument("--async-logging",
+                        help="Write the logs from a background thread, so "
+                        "that the command execution never waits on the "
+                        "disk.",
+                        dest="async_logging", action='store_true')
+    parser.add_argument("--structured-logs",
+                        help="Write the logs as JSON lines, with the timing "
+                        "of every command run. Query them with "
+                        "tools/log_query.py",
+                        dest="structured_logs", action='store_true')
+    parser.add_argument("--log-size-cap",
+                        help="Cap on the size of every log file in MB. "
+                        "Beyond it only the errors are logged.",
+                        dest="log_size_cap", default=None, type=float)
+    parser.add_argument("--compress-logs",
+                        help="Gzip the log files once they are complete.",
+                        dest="compress_logs", action='store_true')
+    parser.add_argument("--index-logs",
+                        help="Write an offset index alongside every log, "
+                        "for tools/log_view.py to print the slice of a "
+                        "test.",
+                        dest="index_logs", action='store_true')
+    parser.add_argument("--keep-runs",
+                        help="Number of run log directories to retain "
+                        "under the log dir, including the current one.",
+                        dest="keep_runs", default=None, type=int)
+    parser.add_argument("--max-log-age",
+                        help="Remove the run log directories older than "
+                        "the given number of days.",
+                        dest="max_log_age", default=None, type=float)
     return parser.parse_args()
 
 
@@ -57,6 +88,17 @@ def main():
     start = time.time()
     args = pars_args()
 
+    import pyfiglet
+    from halo import Halo
+    from utility.relog import Logger
+    print(pyfiglet.figlet_format("REDANT", font="slant"))
+    Logger.set_async_logging(args.async_logging)
+    Logger.set_structured_logging(args.structured_logs)
+    Logger.set_log_compression(args.compress_logs)
+    Logger.set_log_indexing(args.index_logs)
+    if args.log_size_cap is not None:
+        Logger.set_log_size_cap(int(args.log_size_cap * 1024 * 1024))
+
     if args.show_backtrace:
         def errer(exc, msg=None):
             raise exc
@@ -105,6 +147,12 @@ def main():
     spinner.start("Creating log dirs")
     # Creating log dirs.
     current_time_rep = str(datetime.datetime.now())
+    if args.keep_runs is not None or args.max_log_age is not None:
+        # The new run dir isn't created yet, make room for it.
+        keep_runs = args.keep_runs
+        if keep_runs is not None:
+            keep_runs = max(keep_runs - 1, 0)
+        Logger.prune_log_dirs(args.log_dir, keep_runs, args.max_log_age)
     log_dir_current = f"{args.log_dir}/{current_time_rep}"
     if not os.path.isdir(log_dir_current):
         os.makedirs(log_dir_current)
@@ -121,6 +169,7 @@ def main():
     # env_obj.init_ds()
 
     # Environment setup.
+    from environ import Environ
     env_set = Environ(param_obj, errer, f"{log_dir_current}/main.log",
                       args.log_level)
     logger_obj = env_set.get_framework_logger()
@@ -147,10 +196,10 @@ def main():
 
     logger_obj.debug("Starting env teardown.")
     env_set.teardown_env()
+    env_set.redant.close_logger()
 
 
 if __name__ == '__main__':
-    print(pyfiglet.figlet_format("REDANT", font="slant"))
     failure = False
     try:
         main()
@@ -1,6 +1,9 @@
 import traceback
 import abc
 from common.mixin import RedantMixin
+from tests.setup_helpers import (mount_on_clients, restore_cluster,
+                                 setup_cluster)
+from utility.tracing import trace_span
 
 
 class DParentTest(metaclass=abc.ABCMeta):
@@ -10,8 +13,10 @@ class DParentTest(metaclass=abc.ABCMeta):
     disruptive testss
 
     TEST_RES: states the result of the test case
+    volume_pool: pool of warm volumes set by the runner, if enabled.
 
     """
+    volume_pool = None
 
     def __init__(self, mname: str, param_obj, volume_type: str,
                  env_obj, log_path: str, log_level: str = 'I'):
@@ -26,6 +31,7 @@ class DParentTest(metaclass=abc.ABCMeta):
 
         self.TEST_RES = [True]
         self.setup_done = False
+        self.pooled_vol = False
         self.volume_type = volume_type
         self.vol_type_inf = param_obj.get_volume_types()
         self.test_name = mname
@@ -64,28 +70,36 @@ class DParentTest(metaclass=abc.ABCMeta):
         which is overridden by every TC.
         """
         try:
-            self.redant.start_glusterd(self.server_list)
-            self.redant.create_cluster(self.server_list)
-            self.redant.wait_till_all_peers_connected(self.server_list)
-
-            # Call setup in case you want to override volume creation,
-            # start, mounting in the TC
-            self.setup_test()
-
-            if not self.setup_done and self.volume_type != "Generic":
-                self.redant.setup_volume(self.vol_name, self.server_list[0],
-                                         self.vol_type_inf[self.volume_type],
-                                         self.server_list, self.brick_roots,
-                                         force=True)
-                self.mountpoint = (f"/mnt/{self.vol_name}")
-                for client in self.client_list:
-                    self.redant.execute_abstract_op_node(f"mkdir -p "
-                                                         f"{self.mountpoint}",
-                                                         client)
-                    self.redant.volume_mount(self.server_list[0],
-                                             self.vol_name,
-                                             self.mountpoint, client)
-            self.run_test(self.redant)
+            with trace_span("cluster_setup"):
+                setup_cluster(self.redant, self.server_list)
+
+            with trace_span("volume_setup"):
+                # Call setup in case you want to override volume creation,
+                # start, mounting in the TC
+                self.setup_test()
+
+                if not self.setup_done and self.volume_type != "Generic":
+                    if not self._use_pooled_volume():
+                        self.redant.setup_volume(self.vol_name,
+                                                 self.server_list[0],
+                                                 self.vol_type_inf[
+                                                     self.volume_type],
+                                                 self.server_list,
+                                                 self.brick_roots,
+                                                 force=True)
+                        self.mountpoint = (f"/mnt/{self.vol_name}")
+                        mount_on_clients(self.redant, self.server_list[0],
+                                         self.vol_name, self.mountpoint,
+                                         self.client_list)
+            self.redant.es.start_journal(self.test_name)
+            # The test can disrupt the cluster without recording it.
+            self.redant.es.invalidate_cluster_health()
+            # The pool goes on preparing the volume of the next test
+            # alongside this one.
+            if self.volume_pool is not None:
+                self.volume_pool.pause()
+            with trace_span("run_test"):
+                self.run_test(self.redant)
 
         except Exception as error:
             tb = traceback.format_exc()
@@ -96,35 +110,77 @@ class DParentTest(metaclass=abc.ABCMeta):
             else:
                 self.TEST_RES[0] = False
 
+    def _use_pooled_volume(self) -> bool:
+        """
+        Picks up a warm volume from the volume pool, if enabled. The
+        volume is sanitized first as the previous test might have
+        disrupted it.
+        Returns:
+            bool: True if a pooled volume is to be used by the test.
+        """
+        if self.volume_pool is None:
+            return False
+        volname, mountpoint = self.volume_pool.acquire(self.volume_type)
+        if volname is None:
+            return False
+        try:
+            if not self.redant.es.does_volume_exists(volname):
+                raise Exception(f"Pooled volume {volname} doesn't exist")
+            self.redant.sanitize_volume(volname, self.server_list,
+                                        self.client_list, self.brick_roots,
+                                        self.vol_type_inf[self.volume_type])
+        except Exception as error:
+            self.redant.logger.error(f"Can't use pooled volume {volname} "
+                                     f": {error}")
+            self.volume_pool.discard(volname)
+            return False
+        self.redant.logger.info(f"Using pooled volume {volname}")
+        self.vol_name = volname
+        self.mountpoint = mountpoint
+        self.pooled_vol = True
+        return True
+
+    def _cleanup(self):
+        """
+        Resets the cluster options and cleans up the volumes of the test,
+        leaving the volumes owned by the volume pool untouched.
+        """
+        for (opt, _) in self.redant.es.get_vol_options_all().items():
+            self.redant.reset_volume_option('all', opt,
+                                            self.server_list[0])
+        if self.volume_pool is None:
+            self.redant.cleanup_volumes(self.server_list)
+            return
+        if self.pooled_vol:
+            self.volume_pool.release(self.vol_name, self.volume_type)
+        for volname in self.redant.es.get_volnames():
+            if not self.volume_pool.is_pooled(volname):
+                self.redant.cleanup_volumes(self.server_list, volname)
+
     def terminate(self):
         """
         Closes connection for now.
         """
-        # Check if all nodes are up and running.
-        for machine in self.server_list + self.client_list:
-            ret = self.redant.wait_node_power_up(machine)
-            if not ret:
-                self.redant.logger.error(f"{machine} is offline.")
-
-        # Validate that glusterd is up and running in the servers.
-        self.redant.start_glusterd(self.server_list)
-        if not self.redant.wait_for_glusterd_to_start(self.server_list):
-            raise Exception("Glusterd start failed.")
-
+        # Disruptive tests can bring down the nodes and services without
+        # the env knowing about it, hence the cluster health is always
+        # probed afresh.
         try:
-            # Peer probe and validate all peers are in connected state.
-            self.redant.peer_probe_servers(self.server_list,
-                                           self.server_list[0])
-        except Exception as error:
-            tb = traceback.format_exc()
-            self.redant.logger.error(error)
-            self.redant.logger.error(tb)
+            with trace_span("restore_cluster"):
+                restore_cluster(self.redant, self.server_list,
+                                self.client_list)
+            # A failed test might have left a disruption, e.g. a reboot,
+            # still in progress, which the probe didn't catch yet.
+            if self.TEST_RES[0] is False:
+                self.redant.es.invalidate_cluster_health()
+        finally:
+            # The pool prepares the next volume while this one is cleaned
+            # up.
+            if self.volume_pool is not None:
+                self.volume_pool.resume()
 
         try:
-            for (opt, _) in self.redant.es.get_vol_options_all().items():
-                self.redant.reset_volume_option('all', opt,
-                                                self.server_list[0])
-            self.redant.cleanup_volumes(self.server_list)
+            with trace_span("cleanup"):
+                self._cleanup()
         except Exception as error:
             tb = traceback.format_exc()
             self.redant.logger.error(error)
@@ -132,4 +188,5 @@ class DParentTest(metaclass=abc.ABCMeta):
             self.redant.hard_terminate(self.server_list, self.client_list,
                                        self.brick_roots)
         finally:
+            self.redant.es.end_journal(self.test_name)
             self.redant.deconstruct_connection()
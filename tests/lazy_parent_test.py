@@ -1,6 +1,7 @@
 import traceback
 import abc
 from common.mixin import RedantMixin
+from utility.tracing import trace_span
 
 
 class LazyParentTest(metaclass=abc.ABCMeta):
@@ -52,7 +53,8 @@ class LazyParentTest(metaclass=abc.ABCMeta):
         try:
             self.vol_name = (f"redant-{self.volume_type}")
             self.mountpoint = (f"/mnt/redant-{self.volume_type}")
-            self.run_test(self.redant)
+            with trace_span("run_test"):
+                self.run_test(self.redant)
         except Exception as error:
             tb = traceback.format_exc()
             self.redant.logger.error(error)
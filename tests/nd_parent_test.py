@@ -1,6 +1,8 @@
 import traceback
 import abc
 from common.mixin import RedantMixin
+from tests.setup_helpers import restore_cluster
+from utility.tracing import trace_span
 
 
 class NdParentTest(metaclass=abc.ABCMeta):
@@ -53,7 +55,9 @@ class NdParentTest(metaclass=abc.ABCMeta):
         which is overridden by every TC.
         """
         try:
-            self.run_test(self.redant)
+            self.redant.es.start_journal(self.test_name)
+            with trace_span("run_test"):
+                self.run_test(self.redant)
         except Exception as error:
             tb = traceback.format_exc()
             self.redant.logger.error(error)
@@ -65,37 +69,53 @@ class NdParentTest(metaclass=abc.ABCMeta):
 
     def terminate(self):
         """
-        Closes connection and checks the env
+        Closes connection after restoring the cluster and sanitizing the
+        volume, if the test might have changed it.
         """
-        # Check if all nodes are up and running.
-        for machine in self.server_list + self.client_list:
-            ret = self.redant.wait_node_power_up(machine)
-            if not ret:
-                self.redant.logger.error(f"{machine} is offline.")
-
-        # Validate that glusterd is up and running in the servers.
-        self.redant.start_glusterd(self.server_list)
-        if not self.redant.wait_for_glusterd_to_start(self.server_list):
-            raise Exception("Glusterd start failed.")
-
         try:
-            # Peer probe and validate all peers are in connected state.
-            self.redant.peer_probe_servers(self.server_list,
-                                           self.server_list[0])
-        except Exception as error:
-            tb = traceback.format_exc()
-            self.redant.logger.error(error)
-            self.redant.logger.error(tb)
+            # Only the node reboots are recorded in the journal, whereas
+            # the glusterd and peer disruptions aren't, hence the cluster
+            # is always restored.
+            with trace_span("restore_cluster"):
+                health = restore_cluster(self.redant, self.server_list,
+                                         self.client_list)
+            # A failed test might have left a disruption, e.g. a reboot,
+            # still in progress, which the probe didn't catch yet.
+            if self.TEST_RES[0] is False:
+                self.redant.es.invalidate_cluster_health()
 
-        if self.volume_type != "Generic":
-            try:
-                # Volume started state.
-                vol_param = self.vol_type_inf[self.volume_type]
-                self.redant.sanitize_volume(self.vol_name, self.server_list,
-                                            self.client_list, self.brick_roots,
-                                            vol_param)
-            except Exception as e:
-                tb = traceback.format_exc()
-                self.redant.logger.error(e)
-                self.redant.logger.error(tb)
-        self.redant.deconstruct_connection()
+            if self.volume_type != "Generic" and \
+               self._needs_sanitizing(health):
+                try:
+                    # Volume started state.
+                    vol_param = self.vol_type_inf[self.volume_type]
+                    with trace_span("sanitize_volume"):
+                        self.redant.sanitize_volume(self.vol_name,
+                                                    self.server_list,
+                                                    self.client_list,
+                                                    self.brick_roots,
+                                                    vol_param)
+                except Exception as e:
+                    tb = traceback.format_exc()
+                    self.redant.logger.error(e)
+                    self.redant.logger.error(tb)
+        finally:
+            self.redant.es.end_journal(self.test_name)
+            self.redant.deconstruct_connection()
+
+    def _needs_sanitizing(self, health: dict) -> bool:
+        """
+        Checks if the volume is to be sanitized after the test. The
+        journal only records the changes made through the env, whereas
+        the raw commands run by the test, e.g. killing the bricks, go
+        unrecorded. Hence the volume is sanitized as well when the test
+        failed or the cluster had to be repaired.
+        Args:
+            health (dict): Cluster health found by restore_cluster.
+        Returns:
+            bool
+        """
+        if self.TEST_RES[0] is False or not health["healthy"]:
+            return True
+        return self.redant.es.is_volume_changed(self.vol_name,
+                                                self.test_name)
@@ -0,0 +1,194 @@
+"""
+This module contains the helpers shared by the parent tests and the
+framework for setting up the volumes used by the tests and restoring
+the cluster after them.
+"""
+import traceback
+import concurrent.futures
+
+HEALTH_PROBE_TTL = 30
+HEALTH_PROBE_CMD = ("echo glusterd=$(systemctl is-active glusterd); "
+                    "echo peers=$(gluster peer status 2>/dev/null "
+                    "| grep -c 'Peer in Cluster (Connected)')")
+
+
+def mount_on_clients(redant, server: str, volname: str, mountpoint: str,
+                     client_list: list):
+    """
+    Prepares the mountpoint and mounts the volume on all the clients
+    concurrently, so that the setup time doesn't grow with the number
+    of clients.
+    Args:
+        redant (object): The redant mixin object.
+        server (str): Server to mount the volume from.
+        volname (str)
+        mountpoint (str)
+        client_list (list)
+    Raises:
+        Exception listing every client on which the mount failed.
+    """
+    def mount_on_client(client: str):
+        redant.execute_abstract_op_node(f"mkdir -p {mountpoint}", client)
+        redant.volume_mount(server, volname, mountpoint, client)
+
+    if not client_list:
+        return
+    errors = {}
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(client_list)) as executor:
+        future_mount = {executor.submit(mount_on_client, client): client
+                        for client in client_list}
+        for future_handle in concurrent.futures.as_completed(future_mount):
+            try:
+                future_handle.result()
+            except Exception as error:
+                errors[future_mount[future_handle]] = error
+
+    if errors:
+        err_msg = ", ".join(f"{client} ({error})"
+                            for (client, error) in errors.items())
+        redant.logger.error(f"Mounting {volname} failed on {err_msg}")
+        raise Exception(f"Mounting {volname} failed on {err_msg}")
+
+
+def wait_for_nodes_power_up(redant, nodes: list) -> list:
+    """
+    Waits for all the nodes to be up concurrently.
+    Args:
+        redant (object): The redant mixin object.
+        nodes (list)
+    Returns:
+        list of the nodes which are offline.
+    """
+    if not nodes:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(nodes)) as executor:
+        power_up = dict(zip(nodes, executor.map(redant.wait_node_power_up,
+                                                nodes)))
+    offline = [node for (node, ret) in power_up.items() if not ret]
+    for node in offline:
+        redant.logger.error(f"{node} is offline.")
+    return offline
+
+
+def _probe_node(redant, node: str) -> dict:
+    """
+    Runs the batched health probe command on a node.
+    Returns:
+        dict of the probed state of the node.
+    """
+    try:
+        ret = redant.execute_abstract_op_node(HEALTH_PROBE_CMD, node, False)
+    except Exception as error:
+        redant.logger.error(f"Health probe on {node} failed : {error}")
+        return {"online": False}
+    state = {"online": ret['error_code'] == 0}
+    for line in ret['msg']:
+        (key, _, value) = line.strip().partition("=")
+        state[key] = value
+    return state
+
+
+def probe_cluster_health(redant, server_list: list,
+                         client_list: list) -> dict:
+    """
+    Probes the power, glusterd and peer state of the cluster with
+    a single command per node, run on all the nodes concurrently. The
+    result is cached in the env, for the setup of the next test to skip
+    the cluster checks, till the cached result expires or gets
+    invalidated by a test which may disrupt the cluster.
+    Args:
+        redant (object): The redant mixin object.
+        server_list (list)
+        client_list (list)
+    Returns:
+        dict with the following keys,
+        - healthy : True if no repair is needed.
+        - offline : list of the nodes which are offline.
+        - glusterd_down : list of the servers where glusterd isn't active.
+        - peers_disconnected : list of the servers not seeing all the
+                               other servers as connected peers.
+    """
+    nodes = list(dict.fromkeys(server_list + client_list))
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(len(nodes), 1)) as executor:
+        states = dict(zip(nodes, executor.map(
+            lambda node: _probe_node(redant, node), nodes)))
+
+    online_servers = [server for server in server_list
+                      if states[server]["online"]]
+    health = {
+        "offline": [node for node in nodes if not states[node]["online"]],
+        "glusterd_down": [server for server in online_servers
+                          if states[server].get("glusterd") != "active"],
+        "peers_disconnected": [
+            server for server in online_servers
+            if int(states[server].get("peers") or 0) < len(server_list) - 1]
+    }
+    health["healthy"] = not (health["offline"] or health["glusterd_down"]
+                             or health["peers_disconnected"])
+    redant.es.set_cluster_health(health)
+    return health
+
+
+def setup_cluster(redant, server_list: list):
+    """
+    Makes sure that glusterd is running on the servers and that they form
+    a cluster, before a test. The checks are skipped if the cluster was
+    found healthy by the probe at the end of the previous test, as long
+    as the cached result is valid.
+    Args:
+        redant (object): The redant mixin object.
+        server_list (list)
+    """
+    health = redant.es.get_cluster_health(HEALTH_PROBE_TTL)
+    if health is not None and health["healthy"]:
+        return
+    redant.start_glusterd(server_list)
+    redant.create_cluster(server_list)
+    redant.wait_till_all_peers_connected(server_list)
+
+
+def restore_cluster(redant, server_list: list, client_list: list):
+    """
+    Brings the cluster back to a usable state after a test, i.e. waits
+    for the offline nodes to be up, starts glusterd on the servers and
+    makes sure that the peers are connected. Only the steps needed as per
+    the cluster health probe are run. The cluster is always probed afresh,
+    as the test might have disrupted it without the env knowing about it.
+    Args:
+        redant (object): The redant mixin object.
+        server_list (list)
+        client_list (list)
+    Returns:
+        dict of the cluster health found by the probe, before the repair,
+        as returned by probe_cluster_health.
+    Raises:
+        Exception if glusterd couldn't be started.
+    """
+    health = probe_cluster_health(redant, server_list, client_list)
+    if health["healthy"]:
+        return health
+    redant.logger.info(f"Restoring the cluster, health : {health}")
+    redant.es.invalidate_cluster_health()
+
+    if health["offline"]:
+        wait_for_nodes_power_up(redant, health["offline"])
+
+    # Validate that glusterd is up and running in the servers.
+    glusterd_down = health["glusterd_down"] + [
+        server for server in health["offline"] if server in server_list]
+    if glusterd_down:
+        redant.start_glusterd(glusterd_down)
+        if not redant.wait_for_glusterd_to_start(glusterd_down):
+            raise Exception("Glusterd start failed.")
+
+    try:
+        # Peer probe and validate all peers are in connected state.
+        redant.peer_probe_servers(server_list, server_list[0])
+    except Exception as error:
+        tb = traceback.format_exc()
+        redant.logger.error(error)
+        redant.logger.error(tb)
+    return health
@@ -20,6 +20,7 @@ Description:
 """
 
 from .lazy_parent_test import LazyParentTest
+from .setup_helpers import mount_on_clients
 
 
 class VolCreate(LazyParentTest):
@@ -32,7 +33,5 @@ class VolCreate(LazyParentTest):
         vol_param = self.vol_type_inf[self.volume_type]
         redant.setup_volume(self.vol_name, self.server_list[0], vol_param,
                             self.server_list, self.brick_roots, force=True)
-        redant.execute_abstract_op_node(f"mkdir -p {self.mountpoint}",
-                                        self.client_list[0])
-        redant.volume_mount(self.server_list[0], self.vol_name,
-                            self.mountpoint, self.client_list[0])
+        mount_on_clients(redant, self.server_list[0], self.vol_name,
+                         self.mountpoint, self.client_list)
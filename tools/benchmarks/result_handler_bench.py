@@ -0,0 +1,227 @@
+"""
+Benchmark harness for the result handler.
+
+It generates a synthetic result queue shaped like the one filled by the
+test runner and times every stage of the result handling and report
+writing, along with the peak memory allocated in each stage.
+
+The measurements can be saved as a baseline and later runs can be
+compared against it, failing if any stage regressed beyond the allowed
+tolerance.
+
+Usage (from the redant directory):
+    python3 tools/benchmarks/result_handler_bench.py -n 100000
+    python3 tools/benchmarks/result_handler_bench.py -n 20000 \
+        --save /tmp/rh_baseline.json
+    python3 tools/benchmarks/result_handler_bench.py -n 20000 \
+        --baseline /tmp/rh_baseline.json --tolerance 25
+"""
+import os
+import io
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+from queue import SimpleQueue
+sys.path.insert(1, "./core")
+from result_handler import (_transform_queue_to_dict, _obtain_stat,
+                            _transform_to_percent, _data_to_xls,
+                            _data_to_pretty_tables)
+
+
+VOL_TYPES = ['rep', 'dist', 'arb', 'disp', 'dist-rep', 'dist-arb',
+             'dist-disp', 'Generic']
+
+
+def generate_results(count: int, components: int = 16,
+                     vol_types: int = 8, fail_ratio: float = 0.1,
+                     skip_ratio: float = 0.05,
+                     seed: int = 0) -> SimpleQueue:
+    """
+    Generates a queue of synthetic test results.
+
+    Args:
+        count (int): Number of results to be generated.
+        components (int): Number of components the tests are spread over.
+        vol_types (int): Number of volume types each test runs on.
+        fail_ratio (float): Fraction of the results which fail.
+        skip_ratio (float): Fraction of the results which are skipped.
+        seed (int): Seed for the random generator.
+    Returns:
+        SimpleQueue populated with the results.
+    """
+    rand = random.Random(seed)
+    vol_types = VOL_TYPES[:max(1, min(vol_types, len(VOL_TYPES)))]
+    result_queue = SimpleQueue()
+    for itr in range(count):
+        test_num = itr // len(vol_types)
+        draw = rand.random()
+        if draw < skip_ratio:
+            result, skip_reason = "SKIP", "Insufficient servers"
+        elif draw < skip_ratio + fail_ratio:
+            result, skip_reason = "FAIL", "NA"
+        else:
+            result, skip_reason = "PASS", "NA"
+        result_queue.put({f"test_{test_num}": {
+            'component': f"component_{test_num % components}",
+            'tcNature': ('disruptive' if test_num % 3 == 0
+                         else 'nonDisruptive'),
+            'volType': vol_types[itr % len(vol_types)],
+            'testResult': result,
+            'timeTaken': rand.uniform(1, 3600),
+            'skipReason': skip_reason}})
+    return result_queue
+
+
+def _measure(stage_stats: dict, stage: str, func, *args):
+    """
+    Runs the function as a stage while recording the time taken and the
+    peak memory allocated by it.
+
+    Args:
+        stage_stats (dict): Dictionary wherein the stage stats are put.
+        stage (str): Name of the stage.
+        func: The callable for the stage.
+    Returns:
+        The value returned by the callable.
+    """
+    tracemalloc.reset_peak()
+    base_mem = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    ret = func(*args)
+    time_taken = time.perf_counter() - start
+    peak_mem = tracemalloc.get_traced_memory()[1] - base_mem
+    stage_stats[stage] = {'timeMs': time_taken * 1000,
+                          'peakKiB': peak_mem / 1024}
+    return ret
+
+
+def run_benchmark(result_queue, write_xls: bool = True,
+                  write_tables: bool = True) -> dict:
+    """
+    Runs the result handling stages over the queue.
+
+    Args:
+        result_queue: Queue containing the synthetic results.
+        write_xls (bool): Whether to time the spreadsheet generation.
+        write_tables (bool): Whether to time the stdout tables generation.
+    Returns:
+        dict of stage name to the time and peak memory of that stage.
+    """
+    stage_stats = {}
+    logger = logging.getLogger("result_handler_bench")
+    tracemalloc.start()
+    try:
+        aggregator = _measure(stage_stats, 'aggregate',
+                              _transform_queue_to_dict, result_queue)
+        stat_dict = _measure(stage_stats, 'stats', _obtain_stat,
+                             aggregator.counters)
+        stat_dict = _measure(stage_stats, 'percent', _transform_to_percent,
+                             stat_dict)
+        if write_xls:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                _measure(stage_stats, 'xls', _data_to_xls, stat_dict,
+                         aggregator.resultDict,
+                         os.path.join(tmp_dir, "result.xls"), 3600, logger)
+        if write_tables:
+            with contextlib.redirect_stdout(io.StringIO()):
+                _measure(stage_stats, 'tables', _data_to_pretty_tables,
+                         stat_dict, aggregator.resultDict, 3600)
+    finally:
+        tracemalloc.stop()
+    return stage_stats
+
+
+def compare_with_baseline(stage_stats: dict, baseline: dict,
+                          tolerance: float) -> list:
+    """
+    Compares the stage timings with those of the baseline.
+
+    Args:
+        stage_stats (dict): Stats of the current run.
+        baseline (dict): Stats of the baseline run.
+        tolerance (float): Allowed slowdown in percentage.
+    Returns:
+        list of the stages which regressed.
+    """
+    regressions = []
+    for stage, stats in stage_stats.items():
+        if stage not in baseline:
+            continue
+        allowed = baseline[stage]['timeMs'] * (1 + tolerance / 100)
+        if stats['timeMs'] > allowed:
+            regressions.append(stage)
+    return regressions
+
+
+def main():
+    """
+    Benchmarks the result handling and optionally checks for regressions.
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark harness for the result handler.')
+    parser.add_argument("-n", "--num-results",
+                        help="Number of synthetic results. Default is 100000",
+                        dest="num_results", default=100000, type=int)
+    parser.add_argument("--components",
+                        help="Number of components. Default is 16",
+                        dest="components", default=16, type=int)
+    parser.add_argument("--vol-types",
+                        help="Number of volume types per test. Default is 8",
+                        dest="vol_types", default=8, type=int)
+    parser.add_argument("--fail-ratio",
+                        help="Fraction of failed results. Default is 0.1",
+                        dest="fail_ratio", default=0.1, type=float)
+    parser.add_argument("--skip-ratio",
+                        help="Fraction of skipped results. Default is 0.05",
+                        dest="skip_ratio", default=0.05, type=float)
+    parser.add_argument("--seed", help="Random seed. Default is 0",
+                        dest="seed", default=0, type=int)
+    parser.add_argument("--skip-xls", help="Don't time the xls writing",
+                        dest="skip_xls", action='store_true')
+    parser.add_argument("--skip-tables",
+                        help="Don't time the stdout tables writing",
+                        dest="skip_tables", action='store_true')
+    parser.add_argument("--save", help="Save the stats as a baseline file",
+                        dest="save", default=None, type=str)
+    parser.add_argument("--baseline",
+                        help="Baseline file to compare the stats against",
+                        dest="baseline", default=None, type=str)
+    parser.add_argument("--tolerance",
+                        help="Allowed slowdown in percentage over the "
+                        "baseline. Default is 20",
+                        dest="tolerance", default=20.0, type=float)
+    args = parser.parse_args()
+
+    result_queue = generate_results(args.num_results, args.components,
+                                    args.vol_types, args.fail_ratio,
+                                    args.skip_ratio, args.seed)
+    stage_stats = run_benchmark(result_queue, not args.skip_xls,
+                                not args.skip_tables)
+
+    print(f"Results : {args.num_results}")
+    for stage, stats in stage_stats.items():
+        print(f"{stage:<10}: {stats['timeMs']:>10.2f} ms "
+              f"{stats['peakKiB']:>12.1f} KiB peak")
+
+    if args.save is not None:
+        with open(args.save, 'w') as baseline_fd:
+            json.dump(stage_stats, baseline_fd, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline, 'r') as baseline_fd:
+            baseline = json.load(baseline_fd)
+        regressions = compare_with_baseline(stage_stats, baseline,
+                                            args.tolerance)
+        if regressions:
+            print(f"Regression in stages : {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Startup budget check for the redant entry points.
+
+It runs an entry point, by default `core/redant_main.py --help`, under
+`python -X importtime` a few times and reports the wall-clock time and
+the modules costing the most import time. It fails if any run exits with
+an error, if the median time exceeds the budget or if any of the heavy
+dependencies, which are to be imported lazily, gets imported on that
+path in any of the runs.
+
+Usage (from the redant directory):
+    python3 tools/benchmarks/startup_bench.py
+    python3 tools/benchmarks/startup_bench.py --entry core1/main.py
+    python3 tools/benchmarks/startup_bench.py --budget-ms 300 -n 10
+"""
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+HEAVY_MODULES = ['pyfiglet', 'halo', 'paramiko', 'xlwt', 'prettytable',
+                 'jinja2', 'requests', 'xmltodict', 'multipledispatch']
+
+
+def run_entry(entry: str, entry_args: list) -> tuple:
+    """
+    Runs the entry point once under -X importtime.
+    Args:
+        entry (str): Path of the entry point script.
+        entry_args (list): Arguments of the entry point.
+    Returns:
+        tuple of the wall-clock seconds, the exit code and the import
+        time records as (module, self us, cumulative us, nesting level).
+    """
+    start = time.perf_counter()
+    ret = subprocess.run([sys.executable, "-X", "importtime", entry,
+                          *entry_args], stdout=subprocess.DEVNULL,
+                         stderr=subprocess.PIPE, universal_newlines=True)
+    wall = time.perf_counter() - start
+    records = []
+    for line in ret.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        (self_us, cumulative_us, package) = line[12:].split("|", 2)
+        name = package[1:]
+        level = (len(name) - len(name.lstrip(" "))) // 2
+        records.append((name.strip(), int(self_us), int(cumulative_us),
+                        level))
+    return (wall, ret.returncode, records)
+
+
+def main():
+    """
+    Measures the startup of an entry point against the budget.
+    """
+    parser = argparse.ArgumentParser(
+        description='Check the startup time of a redant entry point.')
+    parser.add_argument("--entry",
+                        help="The entry point script. Default is "
+                        "core/redant_main.py",
+                        dest="entry", default="core/redant_main.py",
+                        type=str)
+    parser.add_argument("-n", "--runs",
+                        help="Number of runs. Default is 5",
+                        dest="runs", default=5, type=int)
+    parser.add_argument("--budget-ms",
+                        help="Budget of the median wall-clock time. "
+                        "Default is 500",
+                        dest="budget_ms", default=500, type=float)
+    parser.add_argument("--top",
+                        help="Number of the costliest imports to report. "
+                        "Default is 10",
+                        dest="top", default=10, type=int)
+    parser.add_argument("entry_args", nargs="*",
+                        help="Arguments of the entry point, given after "
+                        "--. Default is --help")
+    args = parser.parse_args()
+    entry_args = args.entry_args or ["--help"]
+
+    walls = []
+    exit_codes = []
+    imported = set()
+    for _ in range(args.runs):
+        (wall, exit_code, records) = run_entry(args.entry, entry_args)
+        walls.append(wall)
+        exit_codes.append(exit_code)
+        imported.update(rec[0].split(".")[0] for rec in records)
+    median_ms = statistics.median(walls) * 1000
+    failed_runs = [code for code in exit_codes if code != 0]
+
+    print(f"{args.entry} {' '.join(entry_args)} : exit codes "
+          f"{', '.join(str(code) for code in sorted(set(exit_codes)))}, "
+          f"median {median_ms:.1f} ms over {args.runs} runs "
+          f"(budget {args.budget_ms:.0f} ms)")
+    top_level = sorted((rec for rec in records if rec[3] == 0),
+                       key=lambda rec: rec[2], reverse=True)
+    print(f"{'cumulative_ms':>14}  module")
+    for (name, _, cumulative_us, _) in top_level[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {name}")
+
+    failures = []
+    if failed_runs:
+        failures.append(f"{len(failed_runs)} of {args.runs} runs exited "
+                        f"with a non zero code")
+    if median_ms > args.budget_ms:
+        failures.append(f"median startup {median_ms:.1f} ms exceeds the "
+                        f"budget of {args.budget_ms:.0f} ms")
+    heavy = [mod for mod in HEAVY_MODULES if mod in imported]
+    if heavy:
+        failures.append(f"heavy modules imported eagerly : "
+                        f"{', '.join(heavy)}")
+    for failure in failures:
+        print(f"FAIL : {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Query tool for the structured ( JSON lines ) logs of a run.
+
+It walks the log directory of a run, collects the records of the commands
+run by the tests and reports the slowest commands per test, or the
+commands which took the most time overall across the tests.
+
+Usage (from the redant directory):
+    python3 tools/log_query.py /var/log/redant/latest
+    python3 tools/log_query.py /var/log/redant/latest -n 5 --test test_snap
+    python3 tools/log_query.py /var/log/redant/latest --by-cmd
+"""
+import os
+import sys
+import gzip
+import json
+import argparse
+
+
+def read_cmd_records(log_dir: str):
+    """
+    Generator of the command records in the structured logs under the
+    directory, be they plain or gzipped. The lines which aren't structured
+    records are skipped.
+    Args:
+        log_dir (str)
+    Yields:
+        dict of the command record.
+    """
+    for (root, _, files) in os.walk(log_dir):
+        for fname in files:
+            if fname.endswith(".log"):
+                opener = open
+            elif fname.endswith(".log.gz"):
+                opener = gzip.open
+            else:
+                continue
+            with opener(os.path.join(root, fname), 'rt') as log_fd:
+                for line in log_fd:
+                    if not line.startswith("{"):
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "duration_ms" in record:
+                        yield record
+
+
+def slowest_per_test(records, count: int, test_filter: str = None) -> dict:
+    """
+    Function to find the slowest commands of every test.
+    Args:
+        records (iterable): The command records.
+        count (int): Number of commands to report per test.
+        test_filter (str): Report only the tests containing it.
+    Returns:
+        dict of test-voltype to the total time, the command count and the
+        list of the slowest command records.
+    """
+    tests = {}
+    for record in records:
+        if test_filter is not None and test_filter not in record["test"]:
+            continue
+        test = record["test"]
+        if record.get("voltype"):
+            test = f"{test}-{record['voltype']}"
+        stats = tests.setdefault(test, {"total_ms": 0, "count": 0,
+                                        "slowest": []})
+        stats["total_ms"] += record["duration_ms"]
+        stats["count"] += 1
+        stats["slowest"].append(record)
+        if len(stats["slowest"]) > count * 4:
+            stats["slowest"].sort(key=lambda rec: rec["duration_ms"],
+                                  reverse=True)
+            del stats["slowest"][count:]
+    for stats in tests.values():
+        stats["slowest"].sort(key=lambda rec: rec["duration_ms"],
+                              reverse=True)
+        del stats["slowest"][count:]
+    return tests
+
+
+def slowest_overall(records, count: int) -> list:
+    """
+    Function to find the commands which took the most time in total,
+    across all the tests and nodes.
+    Args:
+        records (iterable): The command records.
+        count (int): Number of commands to report.
+    Returns:
+        list of tuples of the command, total time, runs and max time.
+    """
+    cmds = {}
+    for record in records:
+        (total, runs, max_ms) = cmds.get(record["cmd"], (0, 0, 0))
+        cmds[record["cmd"]] = (total + record["duration_ms"], runs + 1,
+                               max(max_ms, record["duration_ms"]))
+    ranked = sorted(cmds.items(), key=lambda item: item[1][0], reverse=True)
+    return [(cmd, *stats) for (cmd, stats) in ranked[:count]]
+
+
+def main():
+    """
+    Reports the slowest commands of a run.
+    """
+    parser = argparse.ArgumentParser(
+        description='Query the structured logs of a redant run.')
+    parser.add_argument("log_dir", help="The log directory of the run.",
+                        type=str)
+    parser.add_argument("-n", "--count",
+                        help="Number of commands to report. Default is 10",
+                        dest="count", default=10, type=int)
+    parser.add_argument("--test",
+                        help="Report only the tests whose name contains it.",
+                        dest="test", default=None, type=str)
+    parser.add_argument("--by-cmd",
+                        help="Rank the commands by their total time across "
+                        "all the tests instead.",
+                        dest="by_cmd", action='store_true')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.log_dir):
+        print(f"No such log directory {args.log_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    records = read_cmd_records(args.log_dir)
+    if args.by_cmd:
+        print(f"{'total_ms':>12} {'runs':>6} {'max_ms':>10}  cmd")
+        for (cmd, total, runs, max_ms) in slowest_overall(records,
+                                                          args.count):
+            print(f"{total:>12.1f} {runs:>6} {max_ms:>10.1f}  {cmd}")
+        return
+
+    tests = slowest_per_test(records, args.count, args.test)
+    for (test, stats) in sorted(tests.items(),
+                                key=lambda item: item[1]["total_ms"],
+                                reverse=True):
+        print(f"{test} : {stats['count']} commands, "
+              f"{stats['total_ms'] / 1000:.2f}s")
+        for record in stats["slowest"]:
+            print(f"    {record['duration_ms']:>10.1f}ms "
+                  f"[{record['exit_code']}] {record['node']} : "
+                  f"{record['cmd']}")
+
+
+if __name__ == '__main__':
+    main()
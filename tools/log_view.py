@@ -0,0 +1,184 @@
+"""
+Indexed viewer for the redant logs.
+
+It uses the sidecar offset index written alongside a log ( <log>.idx,
+see --index-logs ) to find the byte ranges of the records of a test,
+volume type, level or time window and prints just those slices of the
+log, which is memory mapped, so that even very large logs are never
+scanned. The records of the framework's main.log are indexed by the test
+running at the time.
+
+Usage (from the redant directory):
+    python3 tools/log_view.py /var/log/redant/latest/main.log \\
+        --test test_snap --voltype rep
+    python3 tools/log_view.py main.log --level ERROR
+    python3 tools/log_view.py main.log --since "2026-10-19 10:00:00" \\
+        --until "2026-10-19 10:05:00"
+"""
+import os
+import sys
+import mmap
+import gzip
+import logging
+import argparse
+import datetime
+
+
+def read_index(index_path: str) -> list:
+    """
+    Function to read the entries of an offset index. A torn last line,
+    left by a run which is still logging, is skipped.
+    Args:
+        index_path (str)
+    Returns:
+        list of tuples of offset, timestamp, level, test and volume type.
+    """
+    entries = []
+    with open(index_path, 'r') as index_fd:
+        for line in index_fd:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) != 5 or not line.endswith("\n"):
+                continue
+            entries.append((int(fields[0]), float(fields[1]), fields[2],
+                            fields[3], fields[4]))
+    entries.sort()
+    return entries
+
+
+def select_slices(entries: list, log_size: int, test: str = None,
+                  vol_type: str = None, level: str = None,
+                  since: float = None, until: float = None) -> list:
+    """
+    Function to find the byte ranges of the log matching the filters. Every
+    index entry spans till the next one, and the adjacent matching spans
+    are merged.
+    Args:
+        entries (list): The index entries.
+        log_size (int): Size of the log, where the last span ends.
+        test (str): Select the records of the tests containing it.
+        vol_type (str): Select the records of the volume type.
+        level (str): Select the records of this level or above.
+        since (float): Select the records logged after this epoch time.
+        until (float): Select the records logged before this epoch time.
+    Returns:
+        list of tuples of start and end offsets.
+    """
+    min_level = None
+    if level is not None:
+        min_level = logging.getLevelName(level.upper())
+    slices = []
+    for (pos, (offset, ts, rec_level, rec_test, rec_vol)) in \
+            enumerate(entries):
+        if pos + 1 < len(entries):
+            (end, end_ts) = entries[pos + 1][:2]
+        else:
+            (end, end_ts) = (log_size, float("inf"))
+        if test is not None and test not in rec_test:
+            continue
+        if vol_type is not None and vol_type != rec_vol:
+            continue
+        if min_level is not None and \
+           logging.getLevelName(rec_level) < min_level:
+            continue
+        if (since is not None and end_ts < since) or \
+           (until is not None and ts > until):
+            continue
+        if slices and slices[-1][1] == offset:
+            slices[-1] = (slices[-1][0], end)
+        else:
+            slices.append((offset, end))
+    return slices
+
+
+def write_slices(log_path: str, slices: list, out=None):
+    """
+    Function to write the slices of the log to the output. The plain logs
+    are memory mapped, while the gzipped ones are read by seeking in the
+    decompressed stream.
+    Args:
+        log_path (str)
+        slices (list): Tuples of start and end offsets.
+        out (file): Binary output, stdout by default.
+    """
+    if out is None:
+        out = sys.stdout.buffer
+    if log_path.endswith(".gz"):
+        with gzip.open(log_path, 'rb') as log_fd:
+            for (start, end) in slices:
+                log_fd.seek(start)
+                out.write(log_fd.read(end - start))
+        return
+    if os.path.getsize(log_path) == 0:
+        return
+    with open(log_path, 'rb') as log_fd, \
+            mmap.mmap(log_fd.fileno(), 0, access=mmap.ACCESS_READ) as log_map:
+        for (start, end) in slices:
+            out.write(log_map[start:end])
+
+
+def get_log_size(log_path: str) -> int:
+    """
+    Function to obtain the size of the log content, which for a gzipped
+    log is the size recorded in its trailer.
+    """
+    if not log_path.endswith(".gz"):
+        return os.path.getsize(log_path)
+    with open(log_path, 'rb') as log_fd:
+        log_fd.seek(-4, os.SEEK_END)
+        return int.from_bytes(log_fd.read(4), "little")
+
+
+def parse_time(time_str: str) -> float:
+    """
+    Function to convert a time given as in the logs to epoch time.
+    """
+    return datetime.datetime.fromisoformat(
+        time_str.replace(",", ".")).timestamp()
+
+
+def main():
+    """
+    Prints the slices of a log matching the filters.
+    """
+    parser = argparse.ArgumentParser(
+        description='Print the slice of a redant log using its index.')
+    parser.add_argument("log_file", help="The log file, plain or gzipped.",
+                        type=str)
+    parser.add_argument("--test",
+                        help="Print the records of the tests whose name "
+                        "contains it.",
+                        dest="test", default=None, type=str)
+    parser.add_argument("--voltype",
+                        help="Print the records of the volume type.",
+                        dest="vol_type", default=None, type=str)
+    parser.add_argument("--level",
+                        help="Print the records of the level or above, "
+                        "e.g. ERROR.",
+                        dest="level", default=None, type=str)
+    parser.add_argument("--since",
+                        help="Print the records logged after the time, "
+                        "e.g. '2026-10-19 10:00:00'.",
+                        dest="since", default=None, type=str)
+    parser.add_argument("--until",
+                        help="Print the records logged before the time.",
+                        dest="until", default=None, type=str)
+    args = parser.parse_args()
+
+    log_path = args.log_file
+    index_path = f"{log_path[:-3] if log_path.endswith('.gz') else log_path}"\
+                 ".idx"
+    if not os.path.isfile(log_path) or not os.path.isfile(index_path):
+        print(f"No log {log_path} with an index {index_path}",
+              file=sys.stderr)
+        sys.exit(1)
+
+    since = None if args.since is None else parse_time(args.since)
+    until = None if args.until is None else parse_time(args.until)
+    slices = select_slices(read_index(index_path), get_log_size(log_path),
+                           args.test, args.vol_type, args.level, since,
+                           until)
+    write_slices(log_path, slices)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Command latency profiling for the remote executioner.
+
+The time taken by every command run is split into phases, i.e. the ssh
+(re)connect, the command execution till its exit status, the read of its
+output and any local parsing of the output, and recorded into
+HDR-style histograms keyed by the command family, the node and the phase.
+The profiles are plain dicts, so that they can be put in the test stats,
+sent across the worker processes and merged per run.
+"""
+import re
+
+# Every power of two range is split into 2 ** SUB_BUCKET_BITS buckets,
+# i.e. the recorded values are accurate within ~3%.
+SUB_BUCKET_BITS = 5
+PHASES = ("connect", "exec", "read", "parse", "total")
+_ARG_REGEX = re.compile(r"^-|[/=$\d'\"{<>|;&]")
+
+
+def get_cmd_family(cmd: str, depth: int = 3) -> str:
+    """
+    Function to obtain the family of a command, i.e. its leading words up
+    to the first option or argument, so that the runs of a command on
+    different volumes, paths or values are grouped together. For example,
+    `gluster volume start vol1 force` belongs to `gluster volume start`.
+    Args:
+        cmd (str)
+        depth (int): Maximum number of words of the family.
+    Returns:
+        str
+    """
+    words = []
+    for word in cmd.split(None, depth)[:depth]:
+        if words and _ARG_REGEX.search(word):
+            break
+        words.append(word)
+    return " ".join(words)
+
+
+def _bucket_of(value: int) -> int:
+    """
+    Maps a value to its bucket. The buckets are ordered by the values.
+    """
+    shift = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+    return (shift << SUB_BUCKET_BITS) | (value >> shift)
+
+
+def _bucket_range(bucket: int) -> tuple:
+    """
+    Returns the lowest and the highest value of a bucket.
+    """
+    shift = bucket >> SUB_BUCKET_BITS
+    mantissa = bucket & ((1 << SUB_BUCKET_BITS) - 1)
+    return (mantissa << shift, ((mantissa + 1) << shift) - 1)
+
+
+def new_histogram() -> dict:
+    """
+    Function to create an empty latency histogram. The values are in
+    microseconds.
+    """
+    return {"count": 0, "total_us": 0, "min_us": None, "max_us": 0,
+            "buckets": {}}
+
+
+def record_value(hist: dict, value_us: int):
+    """
+    Function to record a latency in a histogram.
+    Args:
+        hist (dict)
+        value_us (int): The latency in microseconds.
+    """
+    value_us = max(int(value_us), 0)
+    hist["count"] += 1
+    hist["total_us"] += value_us
+    if hist["min_us"] is None or value_us < hist["min_us"]:
+        hist["min_us"] = value_us
+    hist["max_us"] = max(hist["max_us"], value_us)
+    bucket = _bucket_of(value_us)
+    hist["buckets"][bucket] = hist["buckets"].get(bucket, 0) + 1
+
+
+def merge_histogram(hist: dict, other: dict):
+    """
+    Function to merge a histogram into another.
+    Args:
+        hist (dict): The histogram merged into.
+        other (dict)
+    """
+    if not other["count"]:
+        return
+    hist["count"] += other["count"]
+    hist["total_us"] += other["total_us"]
+    if hist["min_us"] is None or other["min_us"] < hist["min_us"]:
+        hist["min_us"] = other["min_us"]
+    hist["max_us"] = max(hist["max_us"], other["max_us"])
+    for (bucket, count) in other["buckets"].items():
+        hist["buckets"][bucket] = hist["buckets"].get(bucket, 0) + count
+
+
+def get_percentile(hist: dict, percentile: float) -> int:
+    """
+    Function to obtain a percentile of the recorded latencies.
+    Args:
+        hist (dict)
+        percentile (float): In the range 0 to 100.
+    Returns:
+        int: The latency in microseconds, or 0 if nothing is recorded.
+    """
+    if not hist["count"]:
+        return 0
+    rank = max(percentile * hist["count"] / 100, 1)
+    seen = 0
+    for bucket in sorted(hist["buckets"]):
+        seen += hist["buckets"][bucket]
+        if seen >= rank:
+            (low, high) = _bucket_range(bucket)
+            return min(max((low + high) // 2, hist["min_us"]),
+                       hist["max_us"])
+    return hist["max_us"]
+
+
+class CmdProfiler:
+    """
+    Holds the latency histograms of the commands, as a dict of,
+    command family -> node -> phase -> histogram.
+    """
+
+    def __init__(self, profile: dict = None):
+        """
+        Args:
+            profile (dict): An existing profile to add to.
+        """
+        self.profile = {} if profile is None else profile
+
+    def record(self, cmd: str, node: str, phase: str, seconds: float):
+        """
+        Records the time taken by a phase of a command.
+        Args:
+            cmd (str)
+            node (str)
+            phase (str): One of the PHASES.
+            seconds (float)
+        """
+        node_prof = self.profile.setdefault(get_cmd_family(cmd), {})
+        hist = node_prof.setdefault(node, {}).get(phase)
+        if hist is None:
+            hist = new_histogram()
+            node_prof[node][phase] = hist
+        record_value(hist, seconds * 1000000)
+
+    def merge(self, profile: dict):
+        """
+        Merges another profile, e.g. that of a test into the run's.
+        Args:
+            profile (dict)
+        """
+        for (family, node_prof) in profile.items():
+            for (node, phases) in node_prof.items():
+                own = self.profile.setdefault(family, {}).setdefault(node,
+                                                                     {})
+                for (phase, hist) in phases.items():
+                    if phase not in own:
+                        own[phase] = new_histogram()
+                    merge_histogram(own[phase], hist)
+
+    def get_top_families(self, count: int = 10) -> list:
+        """
+        Method to obtain the command families costing the most time
+        across all the nodes.
+        Args:
+            count (int)
+        Returns:
+            list of dicts with the family, the number of runs, the total
+            seconds, the p50, p99 and max milliseconds and the seconds
+            spent per phase, costliest first.
+        """
+        report = []
+        for (family, node_prof) in self.profile.items():
+            total = new_histogram()
+            phase_sec = {}
+            for phases in node_prof.values():
+                for (phase, hist) in phases.items():
+                    if phase == "total":
+                        merge_histogram(total, hist)
+                    else:
+                        phase_sec[phase] = (phase_sec.get(phase, 0)
+                                            + hist["total_us"] / 1000000)
+            report.append({
+                "family": family, "runs": total["count"],
+                "total_sec": total["total_us"] / 1000000,
+                "p50_ms": get_percentile(total, 50) / 1000,
+                "p99_ms": get_percentile(total, 99) / 1000,
+                "max_ms": total["max_us"] / 1000,
+                "phase_sec": phase_sec})
+        report.sort(key=lambda entry: entry["total_sec"], reverse=True)
+        return report[:count]
@@ -0,0 +1,270 @@
+"""
+Live metrics of a redant run in the Prometheus text format.
+
+The counters and gauges of the run, i.e. the test progress, the per worker
+utilisation, the commands run and the ssh reconnects, are kept in shared
+memory allocated before the worker processes are forked, so that every
+worker updates the same values. The exporter thread of the main process
+writes them to a textfile ( for the node exporter's textfile collector )
+and/or serves them over a local HTTP endpoint, for Grafana to chart the
+throughput of a run and spot the stalled workers. The throughput is left
+to the queries over the counters, e.g. rate(redant_commands_total[1m]),
+as the textfile and the scrapes read the values independently.
+"""
+import os
+import time
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_metrics = None
+
+
+class RunMetrics:
+    """
+    The values are laid out in a shared array as the counters followed by
+    the busy flag, busy seconds and current test start time of every
+    worker.
+    """
+    COUNTERS = ("tests_started", "tests_passed", "tests_failed",
+                "tests_skipped", "commands", "ssh_reconnects")
+    WORKER_SLOTS = 3
+
+    def __init__(self, workers: list, tests_total: int):
+        """
+        Args:
+            workers (list): Names of the workers running the tests.
+            tests_total (int): Number of tests queued for the run.
+        """
+        self.workers = workers
+        self.tests_total = tests_total
+        self.start_time = time.time()
+        self.index = {name: ind for (ind, name) in enumerate(self.COUNTERS)}
+        self.values = multiprocessing.Array(
+            'd', len(self.COUNTERS) + self.WORKER_SLOTS * len(workers))
+
+    def _worker_base(self, worker: str) -> int:
+        return (len(self.COUNTERS)
+                + self.WORKER_SLOTS * self.workers.index(worker))
+
+    def inc(self, name: str, value: float = 1):
+        """
+        Increments a counter.
+        Args:
+            name (str): One of the COUNTERS.
+            value (float)
+        """
+        with self.values.get_lock():
+            self.values[self.index[name]] += value
+
+    def test_started(self, worker: str):
+        """
+        Accounts the start of a test by a worker.
+        Args:
+            worker (str)
+        """
+        base = self._worker_base(worker)
+        with self.values.get_lock():
+            self.values[self.index["tests_started"]] += 1
+            self.values[base] = 1
+            self.values[base + 2] = time.time()
+
+    def test_finished(self, worker: str, result: str):
+        """
+        Accounts the end of a test by a worker.
+        Args:
+            worker (str)
+            result (str): PASS, FAIL or SKIP.
+        """
+        base = self._worker_base(worker)
+        counter = {"PASS": "tests_passed",
+                   "SKIP": "tests_skipped"}.get(result, "tests_failed")
+        with self.values.get_lock():
+            self.values[self.index[counter]] += 1
+            self.values[base + 1] += time.time() - self.values[base + 2]
+            self.values[base] = 0
+
+    def render(self) -> str:
+        """
+        Method to render the metrics in the Prometheus text format.
+        Returns:
+            str
+        """
+        now = time.time()
+        with self.values.get_lock():
+            values = self.values[:]
+        counters = dict(zip(self.COUNTERS, values))
+        finished = (counters["tests_passed"] + counters["tests_failed"]
+                    + counters["tests_skipped"])
+
+        lines = []
+
+        def metric(name: str, mtype: str, doc: str, samples: list):
+            lines.append(f"# HELP redant_{name} {doc}")
+            lines.append(f"# TYPE redant_{name} {mtype}")
+            for (labels, value) in samples:
+                value = f"{value:.6f}".rstrip("0").rstrip(".")
+                lines.append(f"redant_{name}{labels} {value}")
+
+        metric("tests_queued", "gauge", "Tests waiting to be run.",
+               [("", max(self.tests_total - counters["tests_started"], 0))])
+        metric("tests_running", "gauge", "Tests being run.",
+               [("", counters["tests_started"] - finished)])
+        metric("tests_finished_total", "counter",
+               "Tests finished, per result.",
+               [('{result="pass"}', counters["tests_passed"]),
+                ('{result="fail"}', counters["tests_failed"]),
+                ('{result="skip"}', counters["tests_skipped"])])
+        metric("commands_total", "counter", "Remote commands run.",
+               [("", counters["commands"])])
+        metric("ssh_reconnects_total", "counter",
+               "Reconnections to the nodes on a failed command.",
+               [("", counters["ssh_reconnects"])])
+
+        busy = []
+        busy_sec = []
+        utilisation = []
+        test_start = []
+        for (ind, worker) in enumerate(self.workers):
+            base = len(self.COUNTERS) + self.WORKER_SLOTS * ind
+            label = f'{{worker="{worker}"}}'
+            worker_sec = values[base + 1]
+            if values[base]:
+                # Account the test in progress as well.
+                worker_sec += now - values[base + 2]
+            busy.append((label, values[base]))
+            busy_sec.append((label, worker_sec))
+            utilisation.append((label, worker_sec
+                                / max(now - self.start_time, 1)))
+            test_start.append((label, values[base + 2]))
+        metric("worker_busy", "gauge", "1 if the worker is running a test.",
+               busy)
+        metric("worker_busy_seconds_total", "counter",
+               "Seconds the worker spent running tests.", busy_sec)
+        metric("worker_utilisation", "gauge",
+               "Fraction of the run time the worker spent running tests.",
+               utilisation)
+        metric("worker_test_start_timestamp_seconds", "gauge",
+               "Start time of the last test picked up by the worker.",
+               test_start)
+        metric("run_start_timestamp_seconds", "gauge",
+               "Start time of the run.", [("", self.start_time)])
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Exports the metrics of the run from a thread of the main process, to
+    a textfile rewritten every interval and/or a local HTTP endpoint.
+    """
+
+    def __init__(self, metrics: RunMetrics, textfile: str = None,
+                 port: int = None, interval: int = 15):
+        """
+        Args:
+            metrics (RunMetrics)
+            textfile (str): Path of the textfile. None disables it.
+            port (int): Port of the HTTP endpoint on localhost. None
+                        disables it.
+            interval (int): Seconds between the textfile updates.
+        """
+        self.metrics = metrics
+        self.textfile = textfile
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.server = None
+        if port is not None:
+            self.server = ThreadingHTTPServer(("127.0.0.1", port),
+                                              self._get_handler())
+            self.server.daemon_threads = True
+
+    def _get_handler(self):
+        metrics = self.metrics
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type",
+                                 "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return MetricsHandler
+
+    def write_textfile(self):
+        """
+        Rewrites the textfile atomically, so that the collector never
+        reads a partial file.
+        """
+        tmp_path = f"{self.textfile}.tmp"
+        with open(tmp_path, 'w') as tmp_fd:
+            tmp_fd.write(self.metrics.render())
+        os.replace(tmp_path, self.textfile)
+
+    def _monitor(self):
+        while not self.stop_event.wait(self.interval):
+            self.write_textfile()
+
+    def start(self):
+        """
+        Starts exporting the metrics.
+        """
+        if self.server is not None:
+            threading.Thread(target=self.server.serve_forever, daemon=True,
+                             name="redant-metrics-http").start()
+        if self.textfile is not None:
+            self.write_textfile()
+            self.thread = threading.Thread(target=self._monitor, daemon=True,
+                                           name="redant-metrics")
+            self.thread.start()
+
+    def stop(self):
+        """
+        Writes the final values and stops exporting.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.write_textfile()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+def enable_metrics(workers: list, tests_total: int) -> RunMetrics:
+    """
+    Function to enable the metrics of the run. It has to be called before
+    forking the workers, for them to share the values.
+    Args:
+        workers (list): Names of the workers running the tests.
+        tests_total (int): Number of tests queued for the run.
+    Returns:
+        RunMetrics
+    """
+    global _metrics
+    _metrics = RunMetrics(workers, tests_total)
+    return _metrics
+
+
+def get_metrics() -> RunMetrics:
+    """
+    Function to obtain the metrics of the run.
+    Returns:
+        RunMetrics or None if the metrics aren't enabled.
+    """
+    return _metrics
+
+
+def inc_metric(name: str, value: float = 1):
+    """
+    Function to increment a counter of the run, if the metrics are
+    enabled.
+    """
+    if _metrics is not None:
+        _metrics.inc(name, value)
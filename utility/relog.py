@@ -5,8 +5,393 @@ relog is responsible for wrapping around the base logging object and extending
 it's functions to be used by the Redant framework.
 """
 import os
+import sys
+import copy
+import gzip
+import datetime
+import json
+import time
+import queue
+import shutil
 import logging
+import threading
 import logging.handlers
+import multiprocessing.util
+
+# The run directories are named after the str() of their start time.
+RUN_DIR_TIME_FORMATS = ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S")
+
+
+class SizeCappedMixin:
+    """
+    Caps the size of a log file. Once the cap is reached, a truncation
+    marker is written and only the error records are logged further, so
+    that a runaway test can't fill the disk while its failure still makes
+    it to the log.
+    """
+    TRUNCATION_MARKER = ("[redant] Log truncated at {size} bytes, only the "
+                         "errors are logged further.\n")
+    DROPPED_MARKER = "[redant] {dropped} records dropped by the size cap.\n"
+
+    def __init__(self, filename: str, max_bytes: int = None, **kwargs):
+        """
+        Args:
+            filename (str): Path of the log file.
+            max_bytes (int): Size cap of the log file. None means no cap.
+        """
+        super().__init__(filename, **kwargs)
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self.written = 0
+        if os.path.isfile(self.baseFilename):
+            self.written = os.path.getsize(self.baseFilename)
+
+    def _count(self, text: str):
+        """
+        Accounts the bytes of the text written to the file.
+        """
+        if text.isascii():
+            self.written += len(text)
+        else:
+            self.written += len(text.encode(errors='replace'))
+
+    def format(self, record: logging.LogRecord) -> str:
+        msg = super().format(record)
+        self._count(msg)
+        self.written += 1
+        return msg
+
+    def emit(self, record: logging.LogRecord):
+        if (self.max_bytes is None or self.written < self.max_bytes
+           or record.levelno >= logging.ERROR):
+            super().emit(record)
+            return
+        if self.stream is None:
+            self.stream = self._open()
+        if self.dropped == 0:
+            marker = self.TRUNCATION_MARKER.format(size=self.written)
+            self.stream.write(marker)
+            self._count(marker)
+        self.dropped += 1
+
+    def close(self):
+        self.acquire()
+        try:
+            if self.dropped and self.stream is not None:
+                self.stream.write(self.DROPPED_MARKER.format(
+                    dropped=self.dropped))
+                self.dropped = 0
+        finally:
+            self.release()
+        super().close()
+
+
+class OffsetIndexMixin:
+    """
+    Writes a sidecar index of a log file, i.e. <log>.idx, mapping the test,
+    volume type, level and timestamp of the records to their byte offset,
+    so that the slice of a large log relevant to a failure can be read
+    without scanning it. An index entry is written whenever the test,
+    volume type or level changes from the previous record and otherwise
+    once every INDEX_INTERVAL bytes.
+
+    The entries are tab separated lines of,
+    offset, epoch timestamp, level, test and volume type.
+
+    It relies on the byte accounting of the SizeCappedMixin.
+    """
+    INDEX_INTERVAL = 64 * 1024
+
+    def __init__(self, filename: str, max_bytes: int = None,
+                 index: bool = False, test_name: str = None,
+                 vol_type: str = None, **kwargs):
+        """
+        Args:
+            filename (str): Path of the log file.
+            max_bytes (int): Size cap of the log file. None means no cap.
+            index (bool): Whether the sidecar index is to be written.
+            test_name (str): Test name recorded for the records which
+                             don't carry a `test` attribute.
+            vol_type (str): Volume type recorded for the records which
+                            don't carry a `voltype` attribute.
+        """
+        super().__init__(filename, max_bytes, **kwargs)
+        self.index_fd = None
+        self.test_name = test_name
+        self.vol_type = vol_type
+        self.last_key = None
+        self.last_offset = None
+        if index:
+            self.index_fd = open(f"{self.baseFilename}.idx", 'a')
+
+    def emit(self, record: logging.LogRecord):
+        if self.index_fd is None:
+            super().emit(record)
+            return
+        offset = self.written
+        dropped = self.dropped
+        super().emit(record)
+        if self.dropped != dropped:
+            return
+        key = (record.levelname, getattr(record, "test", self.test_name),
+               getattr(record, "voltype", self.vol_type))
+        if (key == self.last_key
+           and offset - self.last_offset < self.INDEX_INTERVAL):
+            return
+        self.last_key = key
+        self.last_offset = offset
+        self.index_fd.write(f"{offset}\t{record.created:.3f}\t{key[0]}\t"
+                            f"{key[1] or ''}\t{key[2] or ''}\n")
+
+    def flush(self):
+        super().flush()
+        if self.index_fd is not None:
+            self.index_fd.flush()
+
+    def close(self):
+        super().close()
+        if self.index_fd is not None:
+            self.index_fd.close()
+            self.index_fd = None
+
+
+class CappedWatchedFileHandler(OffsetIndexMixin, SizeCappedMixin,
+                               logging.handlers.WatchedFileHandler):
+    """
+    Watched file handler with an optional size cap and offset index.
+    """
+
+
+class BufferedFileHandler(OffsetIndexMixin, SizeCappedMixin,
+                          logging.FileHandler):
+    """
+    File handler which doesn't flush on every record. The async log writer
+    flushes it once per batch of records.
+    """
+
+    def flush(self):
+        """
+        The flush is deferred to the end of the batch.
+        """
+
+    def flush_batch(self):
+        """
+        Flushes the records written in the batch to the disk.
+        """
+        super().flush()
+
+
+class JsonLineFormatter(logging.Formatter):
+    """
+    Formats the records as JSON lines, so that the logs can be queried as
+    a dataset. The records of the commands run carry their timing fields.
+    """
+
+    def __init__(self, test_name: str, vol_type: str = None):
+        """
+        Args:
+            test_name (str): Name of the test or the framework component.
+            vol_type (str): Volume type the test runs on, if any.
+        """
+        super().__init__()
+        self.test_name = test_name
+        self.vol_type = vol_type
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = {"ts": self.formatTime(record), "level": record.levelname,
+                "test": getattr(record, "test", self.test_name),
+                "voltype": getattr(record, "voltype", self.vol_type),
+                "src": f"{record.filename}:{record.lineno}:"
+                       f"{record.funcName}",
+                "msg": record.getMessage()}
+        cmd_stats = getattr(record, "cmd_stats", None)
+        if cmd_stats is not None:
+            line.update(cmd_stats)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line["exc"] = record.exc_text
+        return json.dumps(line, default=str)
+
+
+class TestIdentityFilter(logging.Filter):
+    """
+    Stamps the test and the volume type on the records of a shared logger,
+    such as the framework's, while a test runs, so that its records in the
+    shared log can be told apart and indexed.
+    """
+
+    def __init__(self, test_name: str, vol_type: str = None):
+        """
+        Args:
+            test_name (str): Name of the running test.
+            vol_type (str): Volume type the test runs on, if any.
+        """
+        super().__init__()
+        self.test_name = test_name
+        self.vol_type = vol_type
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.test = self.test_name
+        record.voltype = self.vol_type
+        return True
+
+
+class InProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler for the writer thread of the same process. The message
+    and the traceback of a record are rendered before it is queued, as
+    its arguments may change by the time the writer thread gets to it.
+    The rest of the formatting is left to the writer thread.
+    """
+    exc_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.exc_formatter.formatException(
+                    record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _RouteClose:
+    """
+    Queued in order with the records to detach a route from the writer,
+    once all the records logged before it are written.
+    """
+
+    def __init__(self, logger_name: str):
+        self.logger_name = logger_name
+        self.handler = None
+        self.done = threading.Event()
+
+
+class AsyncLogWriter:
+    """
+    Writes the records of all the async loggers of a process from a single
+    thread, so that the logging callers never block on the disk. The
+    queued records are written in batches and every file is flushed once
+    per batch.
+    """
+    _writer = None
+    BATCH_SIZE = 512
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.queue = queue.SimpleQueue()
+        self.routes = {}
+        self.unrouted = set()
+        self.thread = threading.Thread(target=self._monitor, daemon=True,
+                                       name="redant-log-writer")
+        self.thread.start()
+        # Drain the queue when the process, be it a forked worker, exits.
+        multiprocessing.util.Finalize(self, self.stop, exitpriority=10)
+
+    @classmethod
+    def get_writer(cls):
+        """
+        Method to obtain the writer of the current process, creating it if
+        needed, as the writer thread of the parent doesn't survive a fork.
+        Returns:
+            AsyncLogWriter
+        """
+        if cls._writer is None or cls._writer.pid != os.getpid():
+            cls._writer = cls()
+        return cls._writer
+
+    def add_route(self, logger_name: str, handler: logging.Handler):
+        """
+        Routes the records of a logger to its file handler.
+        Args:
+            logger_name (str)
+            handler (logging.Handler)
+        """
+        self.routes[logger_name] = handler
+
+    def remove_route(self, logger_name: str) -> logging.Handler:
+        """
+        Detaches the file handler of a logger after writing out the records
+        queued for it.
+        Args:
+            logger_name (str)
+        Returns:
+            logging.Handler which was routed to, or None.
+        """
+        if not self.thread.is_alive():
+            return self.routes.pop(logger_name, None)
+        close = _RouteClose(logger_name)
+        self.queue.put(close)
+        close.done.wait()
+        return close.handler
+
+    def _get_route(self, logger_name: str) -> logging.Handler:
+        """
+        Method to obtain the handler a record of a logger is written to.
+        The records of a child logger go to the route of its nearest
+        routed parent, as they'd propagate to its handlers otherwise.
+        Args:
+            logger_name (str)
+        Returns:
+            logging.Handler or None if no parent is routed either.
+        """
+        name = logger_name
+        while True:
+            handler = self.routes.get(name)
+            if handler is not None or "." not in name:
+                break
+            name = name.rsplit(".", 1)[0]
+        if handler is None and logger_name not in self.unrouted:
+            self.unrouted.add(logger_name)
+            sys.stderr.write(f"Log records of {logger_name} have no file "
+                             "to be written to, dropping them.\n")
+        return handler
+
+    def _monitor(self):
+        """
+        The writer thread, writing the queued records till it gets the
+        stop sentinel.
+        """
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            written = set()
+            stop = False
+            for record in batch:
+                if record is None:
+                    stop = True
+                    continue
+                if isinstance(record, _RouteClose):
+                    record.handler = self.routes.pop(record.logger_name,
+                                                     None)
+                    if record.handler in written:
+                        record.handler.flush_batch()
+                        written.discard(record.handler)
+                    record.done.set()
+                    continue
+                handler = self._get_route(record.name)
+                if handler is not None:
+                    handler.handle(record)
+                    written.add(handler)
+            for handler in written:
+                handler.flush_batch()
+            if stop:
+                return
+
+    def stop(self):
+        """
+        Writes out the queued records and stops the writer thread.
+        """
+        if self.pid == os.getpid() and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
 
 
 class Logger(logging.Logger):
@@ -14,6 +399,89 @@ class Logger(logging.Logger):
     The framework's logger class. It handles three levels of logging
     Info, Debug and Error.
     """
+    async_logging = False
+    structured_logging = False
+    max_log_bytes = None
+    compress_logs = False
+    index_logs = False
+
+    @classmethod
+    def set_async_logging(cls, enable: bool):
+        """
+        Method to opt in to the async logging, wherein the records are
+        queued by the loggers and written to the files by a single writer
+        thread per process.
+        Arg:
+            enable (bool)
+        """
+        cls.async_logging = enable
+
+    @classmethod
+    def set_structured_logging(cls, enable: bool):
+        """
+        Method to opt in to the structured logging, wherein the records are
+        written as JSON lines and every command run is logged along with
+        its node, exit code, duration and output size.
+        Arg:
+            enable (bool)
+        """
+        cls.structured_logging = enable
+
+    @classmethod
+    def set_log_size_cap(cls, max_bytes: int):
+        """
+        Method to cap the size of every log file. The records beyond the
+        cap, except for the errors, are dropped after a truncation marker.
+        Arg:
+            max_bytes (int): None removes the cap.
+        """
+        cls.max_log_bytes = max_bytes
+
+    @classmethod
+    def set_log_compression(cls, enable: bool):
+        """
+        Method to opt in to gzipping the log files once they are closed.
+        Arg:
+            enable (bool)
+        """
+        cls.compress_logs = enable
+
+    @classmethod
+    def set_log_indexing(cls, enable: bool):
+        """
+        Method to opt in to writing the sidecar offset index of every log
+        file, used by tools/log_view.py to print the slice of a test.
+        Arg:
+            enable (bool)
+        """
+        cls.index_logs = enable
+
+    def get_test_identity(self, mname: str, log_file_path: str) -> tuple:
+        """
+        Method to derive the test name and the volume type from the logger
+        name, i.e. <test>-<voltype>, as the test logs are placed under a
+        directory named after the volume type.
+        Returns:
+            tuple of test name and volume type, which is None for the
+            framework components.
+        """
+        vol_type = os.path.basename(self.get_test_log_dir(log_file_path))
+        if mname.endswith(f"-{vol_type}"):
+            return (mname[:-len(vol_type) - 1], vol_type)
+        return (mname, None)
+
+    def get_log_format(self, mname: str,
+                       log_file_path: str) -> logging.Formatter:
+        """
+        Method to obtain the formatter of the logs. The structured logs
+        carry the test name and the volume type in every record.
+        """
+        if not self.structured_logging:
+            return logging.Formatter("[%(asctime)s] %(levelname)s "
+                                     "[%(filename)s:%(lineno)d:"
+                                     "%(funcName)s] - %(message)s")
+        return JsonLineFormatter(*self.get_test_identity(mname,
+                                                         log_file_path))
 
     def get_test_log_dir(self, log_file_path: str) -> str:
         """
@@ -32,9 +500,7 @@ class Logger(logging.Logger):
         valid_log_level = ['I', 'D', 'E']
         log_level_dict = {'I': logging.INFO, 'D': logging.DEBUG,
                           'E': logging.ERROR}
-        log_format = logging.Formatter("[%(asctime)s] %(levelname)s "
-                                       "[%(filename)s:%(lineno)d:"
-                                       "%(funcName)s] - %(message)s")
+        log_format = self.get_log_format(mname, log_file_path)
         if log_file_level not in valid_log_level:
             print("Log level indicator should be one of %s, "
                   "falling back to I (Info)." % ','.join(valid_log_level))
@@ -43,10 +509,115 @@ class Logger(logging.Logger):
         test_log_dir = self.get_test_log_dir(log_file_path)
         if not os.path.isdir(test_log_dir):
             os.makedirs(test_log_dir)
-        log_file_handler = logging.handlers.WatchedFileHandler(log_file_path)
+        if self.async_logging:
+            writer = AsyncLogWriter.get_writer()
+            log_file_handler = BufferedFileHandler(
+                log_file_path, self.max_log_bytes, self.index_logs,
+                *self.get_test_identity(mname, log_file_path))
+            log_file_handler.setFormatter(log_format)
+            writer.add_route(mname, log_file_handler)
+            self.logger.addHandler(InProcessQueueHandler(writer.queue))
+            return
+        log_file_handler = CappedWatchedFileHandler(
+            log_file_path, self.max_log_bytes, self.index_logs,
+            *self.get_test_identity(mname, log_file_path))
         log_file_handler.setFormatter(log_format)
         self.logger.addHandler(log_file_handler)
 
+    def close_logger(self):
+        """
+        Method to close the log file of the logger once the test is done
+        with it. With the compression opted in, the completed log is
+        gzipped in place.
+        """
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            if isinstance(handler, InProcessQueueHandler):
+                handler = AsyncLogWriter.get_writer().remove_route(
+                    self.logger.name)
+            if not isinstance(handler, logging.FileHandler):
+                continue
+            handler.close()
+            if self.compress_logs:
+                self.compress_log_file(handler.baseFilename)
+
+    @staticmethod
+    def compress_log_file(log_file_path: str) -> str:
+        """
+        Method to gzip a completed log file, replacing the original.
+        Args:
+            log_file_path (str)
+        Returns:
+            str: Path of the compressed log file.
+        """
+        if not os.path.isfile(log_file_path):
+            return None
+        gz_path = f"{log_file_path}.gz"
+        with open(log_file_path, 'rb') as log_fd, \
+                gzip.open(f"{gz_path}.tmp", 'wb') as gz_fd:
+            shutil.copyfileobj(log_fd, gz_fd)
+        os.replace(f"{gz_path}.tmp", gz_path)
+        os.remove(log_file_path)
+        return gz_path
+
+    @staticmethod
+    def _is_run_dir_name(name: str) -> bool:
+        """
+        Method to check if a directory name is that of a run, i.e. the
+        time the run started at.
+        """
+        for time_format in RUN_DIR_TIME_FORMATS:
+            try:
+                datetime.datetime.strptime(name, time_format)
+                return True
+            except ValueError:
+                continue
+        return False
+
+    @staticmethod
+    def prune_log_dirs(base_log_dir: str, keep: int = None,
+                       max_age_days: float = None) -> list:
+        """
+        Method to apply the retention policy to the run directories under
+        the base log directory. A run directory is removed if it isn't
+        amongst the newest `keep` ones or is older than `max_age_days`.
+        The run pointed to by the `latest` link is always kept.
+        Args:
+            base_log_dir (str)
+            keep (int): Number of run directories to retain.
+            max_age_days (float): Age beyond which the runs are removed.
+        Returns:
+            list of the removed directories.
+        """
+        if not os.path.isdir(base_log_dir):
+            return []
+        latest = os.path.realpath(os.path.join(base_log_dir, "latest"))
+        runs = []
+        for entry in os.scandir(base_log_dir):
+            if entry.is_symlink() or not entry.is_dir():
+                continue
+            # Only the run directories, named after their start time, are
+            # subject to the policy.
+            if not Logger._is_run_dir_name(entry.name):
+                continue
+            if os.path.realpath(entry.path) == latest:
+                continue
+            runs.append((entry.stat().st_mtime, entry.path))
+        runs.sort(reverse=True)
+        # The latest run counts against the number of retained runs.
+        if keep is not None and os.path.isdir(latest):
+            keep = max(keep - 1, 0)
+        expiry = None
+        if max_age_days is not None:
+            expiry = time.time() - max_age_days * 86400
+        removed = []
+        for (index, (mtime, path)) in enumerate(runs):
+            if ((keep is not None and index >= keep)
+               or (expiry is not None and mtime < expiry)):
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path)
+        return removed
+
     @classmethod
     def log_dir_creation(cls, parent_path: str, test_path_list: list):
         """
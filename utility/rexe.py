@@ -1,15 +1,24 @@
 import os
 import time
 import random
+import contextlib
 import concurrent.futures
 import json
 import socket
+import threading
 import paramiko
 import xmltodict
 from multipledispatch import dispatch
+from .cmd_profile import CmdProfiler, get_cmd_family
+from .tracing import add_span
+from .metrics import inc_metric
 
 
 class Rexe:
+    _profile_lock = threading.Lock()
+    # Marks the threads running commands which aren't to be profiled.
+    _unprofiled = threading.local()
+
     def __init__(self):
         self.node_dict = {}
         self.connect_flag = False
@@ -33,6 +42,7 @@ class Rexe:
         node_ssh_client = paramiko.SSHClient()
         node_ssh_client.load_host_keys(
             os.path.expanduser('~/.ssh/known_hosts'))
+        start_time = time.perf_counter()
         try:
             node_ssh_client.connect(
                 hostname=node,
@@ -43,6 +53,8 @@ class Rexe:
             self.logger.error(f"Connection failure. Exception: {e}")
             self.connect_flag = False
             raise e
+        self.record_cmd_phase("ssh connect", node, "connect",
+                              time.perf_counter() - start_time)
         self.node_dict[node] = node_ssh_client
         self.connect_flag = True
 
@@ -101,15 +113,21 @@ class Rexe:
         if not self.connect_flag:
             ret_dict['Flag'] = False
             return ret_dict
+        start_time = time.perf_counter()
+        exec_start = start_time
         try:
             _, stdout, stderr = self.node_dict[node].exec_command(cmd)
         except Exception:
             # Reconnection to be done.
+            inc_metric("ssh_reconnects")
             self.connect_node(node)
+            exec_start = time.perf_counter()
             # On rebooting the node
             _, stdout, stderr = self.node_dict[node].exec_command(cmd)
 
-        if stdout.channel.recv_exit_status() != 0:
+        exit_status = stdout.channel.recv_exit_status()
+        read_start = time.perf_counter()
+        if exit_status != 0:
             ret_dict['Flag'] = False
             ret_dict['msg'] = stdout.readlines()
             ret_dict['error_msg'] = stderr.readlines()
@@ -120,11 +138,100 @@ class Rexe:
             ret_dict['Flag'] = True
         ret_dict['node'] = node
         ret_dict['cmd'] = cmd
-        ret_dict['error_code'] = stdout.channel.recv_exit_status()
+        ret_dict['error_code'] = exit_status
+        end_time = time.perf_counter()
+        self._profile_cmd(cmd, node, {"exec": read_start - exec_start,
+                                      "read": end_time - read_start,
+                                      "total": end_time - start_time})
+        add_span(get_cmd_family(cmd), "cmd", start_time, end_time,
+                 cmd=cmd[:256], node=node, exit_code=exit_status)
+        inc_metric("commands")
 
         self.logger.debug(ret_dict)
+        self._log_cmd_stats(ret_dict, end_time - start_time)
         return ret_dict
 
+    def _profile_cmd(self, cmd: str, node: str, phases: dict):
+        """
+        Records the time taken by the phases of a command run.
+        Args:
+            cmd (str)
+            node (str)
+            phases (dict): Seconds taken per phase.
+        """
+        if getattr(self._unprofiled, "active", False):
+            return
+        with self._profile_lock:
+            if getattr(self, "cmd_profiler", None) is None:
+                self.cmd_profiler = CmdProfiler()
+            for (phase, seconds) in phases.items():
+                self.cmd_profiler.record(cmd, node, phase, seconds)
+
+    @contextlib.contextmanager
+    def unprofiled(self):
+        """
+        Context manager to run commands from the calling thread without
+        recording them in the command profile, e.g. the commands the
+        framework runs around a test on its own behalf.
+        """
+        self._unprofiled.active = True
+        try:
+            yield
+        finally:
+            self._unprofiled.active = False
+
+    def record_cmd_phase(self, cmd: str, node: str, phase: str,
+                         seconds: float):
+        """
+        Records the time taken by a phase of a command, e.g. the ops
+        parsing the output of a command record it as the parse phase.
+        Args:
+            cmd (str)
+            node (str)
+            phase (str): One of connect, exec, read, parse or total.
+            seconds (float)
+        """
+        self._profile_cmd(cmd, node, {phase: seconds})
+
+    def get_cmd_profile(self) -> dict:
+        """
+        Method to obtain the latency histograms of the commands run so far,
+        per command family, node and phase.
+        Returns:
+            dict
+        """
+        with self._profile_lock:
+            if getattr(self, "cmd_profiler", None) is None:
+                return {}
+            return self.cmd_profiler.profile
+
+    def reset_cmd_profile(self):
+        """
+        Method to discard the latency histograms of the commands run so
+        far.
+        """
+        with self._profile_lock:
+            self.cmd_profiler = None
+
+    def _log_cmd_stats(self, ret_dict: dict, duration: float):
+        """
+        Logs the node, exit code, duration and output size of a command
+        run as a structured record, when the structured logging is enabled.
+        Args:
+            ret_dict (dict): The result of the command.
+            duration (float): Seconds taken by the command.
+        """
+        if not self.structured_logging:
+            return
+        output_bytes = sum(len(line.encode()) for line in ret_dict['msg'])
+        output_bytes += len(ret_dict.get('error_msg', '').encode())
+        cmd_stats = {"node": ret_dict['node'], "cmd": ret_dict['cmd'],
+                     "exit_code": ret_dict['error_code'],
+                     "duration_ms": round(duration * 1000, 3),
+                     "output_bytes": output_bytes}
+        self.logger.info(f"Ran {ret_dict['cmd']} on {ret_dict['node']}",
+                         extra={"cmd_stats": cmd_stats})
+
     @dispatch(str)
     def remote_exec_cmd_async(self, cmd: str) -> dict:
         """
@@ -156,16 +263,19 @@ class Rexe:
 
         if not self.connect_flag:
             return async_obj
+        start_time = time.perf_counter()
         try:
             stdin, stdout, stderr = self.node_dict[node].exec_command(cmd)
         except Exception:
             # Reconnection to be done.
+            inc_metric("ssh_reconnects")
             self.connect_node(node)
             # On rebooting the node
             stdin, stdout, stderr = self.node_dict[node].exec_command(cmd)
 
         async_obj = {"cmd": cmd, "node": node, "stdout": stdout,
-                     "stderr": stderr, "stdin": stdin}
+                     "stderr": stderr, "stdin": stdin,
+                     "start_time": start_time}
         return async_obj
 
     def check_async_command_status(self, async_obj: dict) -> bool:
@@ -190,6 +300,7 @@ class Rexe:
             dict: Returns the resultant dictionary
         """
         ret_dict = {}
+        read_start = time.perf_counter()
         if async_obj['stdout'].channel.recv_exit_status() != 0:
             ret_dict['Flag'] = False
             ret_dict['msg'] = async_obj['stdout'].readlines()
@@ -204,6 +315,20 @@ class Rexe:
         ret_dict['error_code'] = async_obj['stdout'].channel.recv_exit_status()
 
         self.logger.debug(ret_dict)
+        if 'start_time' in async_obj:
+            # The async command is taken to run till its result is
+            # collected.
+            end_time = time.perf_counter()
+            self._profile_cmd(ret_dict['cmd'], ret_dict['node'],
+                              {"exec": read_start - async_obj['start_time'],
+                               "read": end_time - read_start,
+                               "total": end_time - async_obj['start_time']})
+            add_span(get_cmd_family(ret_dict['cmd']), "cmd",
+                     async_obj['start_time'], end_time,
+                     cmd=ret_dict['cmd'][:256], node=ret_dict['node'],
+                     exit_code=ret_dict['error_code'], run_async=True)
+            inc_metric("commands")
+            self._log_cmd_stats(ret_dict, end_time - async_obj['start_time'])
         return ret_dict
 
     def wait_till_async_command_ends(self, async_obj: dict,
@@ -318,4 +443,8 @@ class Rexe:
         if stdout:
             stdout.channel.close()
 
+        # The parent tests repair the rebooted nodes as per the env
+        # journal.
+        if getattr(self, "es", None) is not None:
+            self.es.record_change('nodes', node)
         return True
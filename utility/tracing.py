@@ -0,0 +1,185 @@
+"""
+Offline tracing of a redant run.
+
+Spans are recorded for the stages of the test runner, the tests, the
+phases of the parent tests and the remote commands, and exported as a
+Chrome trace-event JSON file, which can be opened in chrome://tracing or
+https://ui.perfetto.dev to see where the wall-clock time of a run goes.
+
+Every process, be it the main one or a forked worker, buffers its spans
+and appends them to a part file of its own under the trace directory.
+The parts are merged into the trace file once the run ends. The tracing
+is a no-op unless enabled.
+"""
+import os
+import json
+import time
+import threading
+import contextlib
+import multiprocessing
+import multiprocessing.util
+
+_tracer = None
+_trace_dir = None
+
+
+class Tracer:
+    """
+    Buffers the trace events of a process and writes them to the part
+    file of the process.
+    """
+    FLUSH_COUNT = 10000
+
+    def __init__(self, trace_dir: str):
+        """
+        Args:
+            trace_dir (str): Directory of the part files.
+        """
+        self.pid = os.getpid()
+        self.part_path = os.path.join(trace_dir, f"trace-{self.pid}.jsonl")
+        self.lock = threading.Lock()
+        self.events = []
+        self.tids = set()
+        self._add_metadata("process_name", 0,
+                           multiprocessing.current_process().name)
+        # Write out the buffered spans when the process, be it a forked
+        # worker, exits.
+        multiprocessing.util.Finalize(self, self.flush, exitpriority=10)
+
+    def _add_metadata(self, name: str, tid: int, value: str):
+        self.events.append({"name": name, "ph": "M", "pid": self.pid,
+                            "tid": tid, "args": {"name": value}})
+
+    def add_span(self, name: str, cat: str, start: float, end: float,
+                 args: dict = None):
+        """
+        Records a complete span.
+        Args:
+            name (str)
+            cat (str): Category of the span, e.g. stage, test, cmd.
+            start (float): perf_counter value at the start of the span.
+            end (float): perf_counter value at the end of the span.
+            args (dict): Details shown along with the span.
+        """
+        tid = threading.get_ident()
+        event = {"name": name, "cat": cat, "ph": "X", "pid": self.pid,
+                 "tid": tid, "ts": round(start * 1000000, 1),
+                 "dur": round((end - start) * 1000000, 1)}
+        if args:
+            event["args"] = args
+        with self.lock:
+            if tid not in self.tids:
+                self.tids.add(tid)
+                self._add_metadata("thread_name", tid,
+                                   threading.current_thread().name)
+            self.events.append(event)
+            if len(self.events) < self.FLUSH_COUNT:
+                return
+        self.flush()
+
+    def flush(self):
+        """
+        Appends the buffered events to the part file of the process.
+        """
+        if self.pid != os.getpid():
+            return
+        with self.lock:
+            (events, self.events) = (self.events, [])
+            if not events:
+                return
+            with open(self.part_path, 'a') as part_fd:
+                part_fd.write("".join(f"{json.dumps(event, default=str)}\n"
+                                      for event in events))
+
+
+def enable_tracing(trace_dir: str):
+    """
+    Function to enable the tracing for the run, including the worker
+    processes forked later.
+    Args:
+        trace_dir (str): Directory wherein the spans are collected.
+    """
+    global _trace_dir
+    if not os.path.isdir(trace_dir):
+        os.makedirs(trace_dir)
+    _trace_dir = trace_dir
+
+
+def get_tracer():
+    """
+    Function to obtain the tracer of the current process, as the spans
+    buffered by the parent aren't to be written by a forked worker.
+    Returns:
+        Tracer or None if the tracing isn't enabled.
+    """
+    global _tracer
+    if _trace_dir is None:
+        return None
+    if _tracer is None or _tracer.pid != os.getpid():
+        _tracer = Tracer(_trace_dir)
+    return _tracer
+
+
+def add_span(name: str, cat: str, start: float, end: float, **args):
+    """
+    Function to record a span whose timing was already measured with
+    time.perf_counter, e.g. that of a remote command.
+    """
+    tracer = get_tracer()
+    if tracer is not None:
+        tracer.add_span(name, cat, start, end, args)
+
+
+@contextlib.contextmanager
+def trace_span(name: str, cat: str = "phase", **args):
+    """
+    Context manager recording a span for the enclosed block. The yielded
+    dict of args can be updated to add details known only at the end,
+    e.g. the test result.
+    Args:
+        name (str)
+        cat (str): Category of the span.
+    """
+    if _trace_dir is None:
+        yield args
+        return
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        add_span(name, cat, start, time.perf_counter(), **args)
+
+
+def export_trace(trace_path: str) -> int:
+    """
+    Function to merge the part files of all the processes into a Chrome
+    trace-event JSON file. The part files are removed.
+    Args:
+        trace_path (str)
+    Returns:
+        int: Number of events exported.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        return 0
+    tracer.flush()
+    count = 0
+    with open(trace_path, 'w') as trace_fd:
+        trace_fd.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+        for fname in sorted(os.listdir(_trace_dir)):
+            if not (fname.startswith("trace-") and fname.endswith(".jsonl")):
+                continue
+            part_path = os.path.join(_trace_dir, fname)
+            with open(part_path, 'r') as part_fd:
+                for line in part_fd:
+                    if not line.endswith("\n"):
+                        continue
+                    if count:
+                        trace_fd.write(",\n")
+                    trace_fd.write(line[:-1])
+                    count += 1
+            os.remove(part_path)
+        trace_fd.write("\n]}\n")
+    with contextlib.suppress(OSError):
+        os.rmdir(_trace_dir)
+    return count